@@ -2,24 +2,39 @@
 
 import logging
 import threading
+import time
 import zmq
 from .bot_core import IQBotCore
 from .strategies.mt4_strategy import MT4Strategy
+from .strategies.mt4_feedback import MT4FeedbackPublisher
+from .copy_executor import CopyExecutor, carregar_contas_copia
 from .strategies.mhi_strategy import MHIStrategy
+from .strategies.mhi_scanner import MHIScanner
 from .strategies.signal_list_strategy import SignalListStrategy
+from .strategies.plugins import criar_plugins
+from .market_bus import MarketDataBus, SinaisParaBarramento
 from .management.masaniello_manager import MasanielloManager
-from ui.components.news_scraper import fetch_structured_news
+from .news_service import NewsService
 from utils.path_resolver import resource_path
+from utils.logger import add_listener_handler, remove_listener_handler, TRADE_LOGGER_NAME
+
+TIMEOUT_CONEXAO_COPIA = 60 # Segundos para as contas de cópia conectarem; as atrasadas ficam de fora
 
 class AppController:
     """A classe controladora que gerencia a lógica do aplicativo e a comunicação entre a UI e o BotCore."""
-    def __init__(self, credentials, config_manager, trade_logger):
+    def __init__(self, credentials, config_manager, trade_logger, trade_journal=None):
         self.credentials = credentials
         self.config_manager = config_manager
         self.trade_logger = trade_logger # Store trade_logger
+        self.trade_journal = trade_journal # Diário de trades persistente (SQLite)
+        self.news_service = NewsService() # Compartilhado com o bot_core e a tela de notícias
         self.bot_core = None
+        self.copy_executor = None # Espelha os sinais nas contas de 'contas_copia' (opcional)
+        self.copy_overrides = {} # nome da conta de cópia -> configurações próprias
         self.ui_callbacks = {}
         self.strategy = None
+        self.market_bus = None # Plugins de 'estrategias_plugins', sozinhos ou junto da estratégia principal
+        self.pares_abertos = [] # Última lista de ativos abertos recebida do bot_core
 
         # Adiciona um handler ao trade_logger para enviar mensagens para a UI
         class UILogHandler(logging.Handler):
@@ -29,10 +44,14 @@ class AppController:
             def emit(self, record):
                 self.ui_callback_method(self.format(record), tag="TRADE")
         
-        self.trade_logger.addHandler(UILogHandler(self._handle_log))
+        # O handler roda na thread do QueueListener, nunca nas threads de trade
+        self.ui_log_handler = UILogHandler(self._handle_log)
+        if not add_listener_handler(self.ui_log_handler, logger_name=TRADE_LOGGER_NAME):
+            self.trade_logger.addHandler(self.ui_log_handler)
         self.trade_logger.propagate = False # Garante que não duplique logs se o root logger também tiver um handler de console
         self.masaniello_manager = None
         self.zmq_context = zmq.Context()
+        self.mt4_feedback = None # Canal de retorno (ativos, payouts, acks e resultados) para os EAs
         self.robot_stats = { 'is_active': False, 'is_paused': False, 'balance': 0.0, 'today_profit': 0.0, 'wins': 0, 'losses': 0, 'cifrao': ''}
 
     def start_bot(self, strategy_name, selected_pair, signals):
@@ -48,28 +67,59 @@ class AppController:
         # Configura o gerenciamento (Masaniello ou Ciclos)
         self._setup_management()
 
+        # O scanner ordena os ativos pelo payout: só então os payouts são atualizados sem o canal do MT4
+        self.bot_core.atualizar_payouts = strategy_name == "MHI Multi-Ativos"
         self.bot_core.start_background_worker()
+        for core in self._contas_copia():
+            core.start_background_worker()
+        executor = self.copy_executor or self.bot_core # As estratégias enviam os sinais para todas as contas
 
         # Cria e inicia a estratégia
         if strategy_name == "MHI (Minoria)" and ("Conecte" in selected_pair or "Nenhum" in selected_pair):
             self.ui_callbacks.get('show_popup', lambda x, y: None)("Aviso", "Para MHI, selecione um par válido.")
             return
-        
+        scanner_args = self._args_scanner_mhi(executor) if strategy_name == "MHI Multi-Ativos" else None
+        if scanner_args and not scanner_args[1]:
+            self.ui_callbacks.get('show_popup', lambda x, y: None)("Aviso", "Nenhum ativo disponível para o scanner MHI.")
+            return
+        try:
+            plugins = criar_plugins(self.config_manager.get_all_settings().get('estrategias_plugins'))
+        except ValueError as e:
+            if strategy_name == "Plugins (Barramento)":
+                self._handle_log(str(e), "ERRO")
+                self.ui_callbacks.get('show_popup', lambda x, y: None)("Erro de Configuração", f"'estrategias_plugins' inválido: {e}")
+                return
+            # Os plugins são só um complemento: a estratégia principal segue sem eles
+            self._handle_log(f"{e}. Estratégia iniciada sem plugins.", "AVISO")
+            self.ui_callbacks.get('show_popup', lambda x, y: None)("Aviso", f"'estrategias_plugins' inválido ({e}): plugins desativados nesta sessão.")
+            plugins = []
+        if strategy_name == "Plugins (Barramento)" and not plugins:
+            self.ui_callbacks.get('show_popup', lambda x, y: None)("Aviso", "Configure 'estrategias_plugins' (ex.: mhi:EURUSD, mhi:GBPUSD).")
+            return
+        if strategy_name == "Lista de Sinais" and not signals:
+            self.ui_callbacks.get('show_popup', lambda x, y: None)("Erro", "Nenhum arquivo de sinais foi carregado.")
+            return
+
+        # Com plugins configurados, o barramento roda junto e recebe os sinais da estratégia principal
+        self.market_bus = MarketDataBus(executor, plugins) if plugins else None
+        sinais = SinaisParaBarramento(executor, self.market_bus) if self.market_bus else executor
         strategy_map = {
-            "Lista de Sinais": (SignalListStrategy, (self.bot_core, signals, self._handle_status_update)),
-            "Sinal MT4": (MT4Strategy, (self.bot_core, self.zmq_context, self._handle_status_update)),
-            "MHI (Minoria)": (MHIStrategy, (self.bot_core, selected_pair))
+            "Lista de Sinais": (SignalListStrategy, (sinais, signals, self._handle_status_update)),
+            "Sinal MT4": (MT4Strategy, (sinais, self.zmq_context, self._handle_status_update)),
+            "MHI (Minoria)": (MHIStrategy, (sinais, selected_pair)),
+            "MHI Multi-Ativos": (MHIScanner, scanner_args and (sinais,) + scanner_args[1:]),
         }
 
-        if strategy_name in strategy_map:
-            if strategy_name == "Lista de Sinais" and not signals:
-                self.ui_callbacks.get('show_popup', lambda x, y: None)("Erro", "Nenhum arquivo de sinais foi carregado.")
-                return
-            
+        if strategy_name == "Plugins (Barramento)":
+            self.strategy = self.market_bus
+        elif strategy_name in strategy_map:
             strategy_class, args = strategy_map[strategy_name]
             self.strategy = strategy_class(*args)
 
         if self.strategy:
+            executor.strategy_name = strategy_name
+            if self.market_bus and self.market_bus is not self.strategy:
+                self.market_bus.start()
             self.strategy.start()
             self._handle_log("Robô Iniciado.", "STATUS")
             self.robot_stats['is_active'] = True
@@ -77,12 +127,31 @@ class AppController:
             self.ui_callbacks.get('update_robot_status', lambda x, y: None)(True, False)
             self._update_strategy_status_bar()
 
+    def _args_scanner_mhi(self, executor):
+        """Ativos de 'mhi_scanner_ativos' (separados por vírgula) ou, se vazio, todos os abertos."""
+        config = self.config_manager.get_all_settings()
+        ativos = [a.strip().upper() for a in (config.get('mhi_scanner_ativos') or '').split(',') if a.strip()]
+        try:
+            entradas = max(1, int(config.get('mhi_scanner_entradas', 1)))
+            min_assertividade = float(config.get('mhi_scanner_min_assertividade', 0))
+        except (TypeError, ValueError):
+            entradas, min_assertividade = 1, 0.0
+        criterio = config.get('mhi_scanner_criterio', 'assertividade')
+        return (executor, ativos or self.pares_abertos, entradas, criterio, min_assertividade)
+
     def stop_bot(self, silent=False):
+        bus_separado = self.market_bus is not None and self.market_bus is not self.strategy
         if self.strategy: 
             self.strategy.stop()
             self.strategy = None
+        if bus_separado:
+            self.market_bus.stop() # Depois da estratégia principal, que publica sinais nele
+        self.market_bus = None
         if self.bot_core:
             self.bot_core.stop_background_worker()
+        for core in self._contas_copia():
+            core.stop_background_worker()
+            core.is_paused = False
         
         self.robot_stats['is_active'] = False
         self.robot_stats['is_paused'] = False
@@ -99,6 +168,8 @@ class AppController:
         new_pause_state = not self.robot_stats.get('is_paused', False)
         self.robot_stats['is_paused'] = new_pause_state
         if self.bot_core: self.bot_core.set_pause_status(new_pause_state)
+        for core in self._contas_copia():
+            core.set_pause_status(new_pause_state)
         self.ui_callbacks.get('update_robot_status', lambda x, y: None)(True, new_pause_state)
 
     def restart_bot(self):
@@ -114,6 +185,9 @@ class AppController:
         all_settings = self.config_manager.get_all_settings()
         if self.bot_core:
             self.bot_core.reload_config(all_settings)
+        for nome, overrides in self.copy_overrides.items():
+            if self.copy_executor and nome in self.copy_executor.cores:
+                self.copy_executor.cores[nome].reload_config({**all_settings, **overrides})
         self._handle_log("Lógica do robô atualizada com as novas configurações.", "CONFIG")
 
     def request_initial_dashboard_data(self):
@@ -123,14 +197,14 @@ class AppController:
         # Send current robot status
         self.ui_callbacks.get('update_robot_status', lambda x, y: None)(self.robot_stats['is_active'], self.robot_stats['is_paused'])
 
-    def fetch_news(self, callback):
+    def fetch_news(self, callback, force_refresh=False):
         """Busca notícias em uma thread separada e as retorna via callback."""
         def task():
             # Informa à UI que a busca começou, usando o próprio callback
             if callback:
                 callback([{"impact": 0, "time": "", "currency": "🔄", "event": "Buscando notícias..."}])
             
-            news_data = fetch_structured_news()
+            news_data = self.news_service.get_news(force_refresh=force_refresh)
             
             # Envia os dados (ou uma lista vazia) de volta para a UI
             if callback:
@@ -138,7 +212,23 @@ class AppController:
 
         threading.Thread(target=task, daemon=True).start()
 
+    def get_journal_stats(self, group_by='ativo', since=None):
+        """Consulta agregada do diário de trades (win rate por ativo/hora/estratégia e P&L por dia)."""
+        if not self.trade_journal:
+            return {'grupos': {}, 'pnl_por_dia': []}
+        try:
+            return {
+                'grupos': self.trade_journal.win_rate_by(group_by, since=since),
+                'pnl_por_dia': self.trade_journal.pnl_by_day()
+            }
+        except Exception as e:
+            logging.error(f"Erro ao consultar o diário de trades: {e}")
+            return {'grupos': {}, 'pnl_por_dia': []}
+
     def export_pairs_for_mt4(self, pairs_to_export, selected_filter):
+        # EAs conectados ao canal de retorno recebem a lista na hora; o arquivo fica para EAs antigos
+        if self.mt4_feedback:
+            self.mt4_feedback.publish_asset_list(pairs_to_export)
         filename = resource_path("mt4_pares.txt")
         try:
             with open(filename, 'w') as f: 
@@ -152,6 +242,13 @@ class AppController:
         self.stop_bot(silent=True)
         if self.bot_core:
             self.bot_core.disconnect()
+        for core in self._contas_copia():
+            core.disconnect()
+        if self.trade_journal:
+            self.trade_journal.stop()
+        if self.mt4_feedback:
+            self.mt4_feedback.stop()
+        remove_listener_handler(self.ui_log_handler)
         self.zmq_context.term()
 
     # --- Métodos Internos e Handlers de Callback ---
@@ -160,6 +257,9 @@ class AppController:
         self.ui_callbacks.get('log_message', lambda x, y: None)(message, tag)
 
     def _handle_trade_result(self, result_info):
+        context = result_info.get('context') or {}
+        if self.market_bus:
+            self.market_bus.publicar_resultado(result_info)
         if result_info.get("foi_executado", False):
             profit = result_info.get("profit", 0)
             self.robot_stats['today_profit'] += profit
@@ -168,7 +268,7 @@ class AppController:
 
         trade_details = {
             'ativo': result_info.get('ativo', 'N/A'),
-            'direcao': self.strategy.last_trade_direction if self.strategy else 'N/A',
+            'direcao': self._direcao_do_trade(context),
             'valor': result_info.get('entry_value', 0),
             'resultado': 'WIN' if result_info.get("profit", 0) > 0 else 'LOSS' if result_info.get("profit", 0) < 0 else 'EMPATE',
             'lucro': result_info.get("profit", 0),
@@ -183,8 +283,14 @@ class AppController:
         self.ui_callbacks.get('update_metric_cards', lambda x: None)(self._get_summary_data())
         self._update_strategy_status_bar()
 
+    def _direcao_do_trade(self, context):
+        # Trades dos plugins levam context['estrategia']; os demais são da estratégia principal
+        origem = self.market_bus if context.get('estrategia') and self.market_bus else self.strategy
+        return origem.last_trade_direction if origem else 'N/A'
+
     def _handle_pair_list_update(self, pairs):
         all_pairs = sorted(list(pairs))
+        self.pares_abertos = all_pairs
         normal_pairs = sorted([p for p in all_pairs if not p.endswith('-OTC')])
         otc_pairs = sorted([p for p in all_pairs if p.endswith('-OTC')])
         self.ui_callbacks.get('on_pair_list_update', lambda x: None)((all_pairs, normal_pairs, otc_pairs))
@@ -193,13 +299,15 @@ class AppController:
         self.ui_callbacks.get('update_connection_status', lambda a, b, c: None)(component, status, message)
 
     def _update_strategy_status_bar(self):
-        manual_active = isinstance(self.strategy, MHIStrategy)
+        manual_active = isinstance(self.strategy, (MHIStrategy, MHIScanner))
         signallist_active = isinstance(self.strategy, SignalListStrategy)
         self._handle_status_update("MANUAL", "CONECTADO" if manual_active else "PARADO", "Ativa" if manual_active else "Inativa")
         self._handle_status_update("SIGNALLIST", "CONECTADO" if signallist_active else "PARADO", "Ativa" if signallist_active else "Inativa")
 
     def _reset_stats(self):
         if self.bot_core: self.bot_core.reset_state()
+        for core in self._contas_copia():
+            core.reset_state()
         self.robot_stats['today_profit'] = 0.0
         self.robot_stats['wins'] = 0
         self.robot_stats['losses'] = 0
@@ -232,6 +340,12 @@ class AppController:
         else:
             self.bot_core.set_active_manager('cycle')
             self._handle_log("Iniciando com Gerenciamento Normal/Ciclos!", "INFO")
+        for core in self._contas_copia():
+            # Cada conta tem o seu próprio Masaniello (mesmos parâmetros, estado independente)
+            if masaniello_configs:
+                core.set_active_manager('masaniello', MasanielloManager(**masaniello_configs))
+            else:
+                core.set_active_manager('cycle')
         return True
 
     def set_ui_callbacks(self, callbacks):
@@ -240,15 +354,86 @@ class AppController:
     def connect(self):
         if self.bot_core: return
         config_dict = self.config_manager.get_all_settings()
+        feedback_endpoint = config_dict.get('mt4_feedback_endpoint')
+        if feedback_endpoint and not self.mt4_feedback:
+            self.mt4_feedback = MT4FeedbackPublisher(self.zmq_context, feedback_endpoint)
+            self.mt4_feedback.start()
         self.bot_core = IQBotCore(
             credentials=self.credentials, config=config_dict,
             log_callback=self._handle_log, trade_logger=self.trade_logger, trade_result_callback=self._handle_trade_result,
-            pair_list_callback=self._handle_pair_list_update, status_callback=self._handle_status_update
+            pair_list_callback=self._handle_pair_list_update, status_callback=self._handle_status_update,
+            trade_journal=self.trade_journal, news_service=self.news_service,
+            feedback_publisher=self.mt4_feedback
         )
+        if self.trade_journal:
+            self.trade_journal.start()
         
         if self.bot_core.connect():
             self.robot_stats['balance'] = self.bot_core.api.get_balance()
             self.robot_stats['cifrao'] = self.bot_core.cifrao
             self.ui_callbacks.get('update_metric_cards', lambda x: None)(self._get_summary_data())
             self.ui_callbacks.get('update_robot_status', lambda x, y: None)(False, False)
+            self._conectar_contas_copia(config_dict)
+
+    # --- Cópia multi-conta ---
+    def _contas_copia(self):
+        return self.copy_executor.copias() if self.copy_executor else []
+
+    def _conectar_contas_copia(self, config_dict):
+        """Cria e conecta, em paralelo, um IQBotCore para cada conta de 'contas_copia'."""
+        try:
+            contas = carregar_contas_copia(config_dict.get('contas_copia'))
+        except (ValueError, TypeError) as e:
+            self._handle_log(f"Configuração 'contas_copia' inválida: {e}", "ERRO")
+            return
+        if not contas:
+            return
+        self.copy_executor = CopyExecutor(self.bot_core, self._handle_log)
+        cores = {}
+        for nome, credenciais, overrides in contas:
+            log = lambda msg, tag="INFO", nome=nome: self._handle_log(f"[{nome}] {msg}", tag)
+            core = IQBotCore(
+                credentials=credenciais, config={**config_dict, **overrides},
+                log_callback=log, trade_logger=self.trade_logger,
+                trade_result_callback=lambda info, nome=nome: self._handle_copy_result(nome, info),
+                pair_list_callback=lambda pairs: None, status_callback=lambda *args: None,
+                trade_journal=self.trade_journal, news_service=self.news_service
+            )
+            self.copy_overrides[nome] = overrides
+            cores[nome] = core
+
+        # Uma conta travada no connect não pode segurar a conexão principal
+        lock, concluidas, atrasadas = threading.Lock(), set(), set()
+        def conectar(nome, core):
+            core.connect()
+            with lock:
+                if nome not in atrasadas:
+                    concluidas.add(nome)
+                    return
+            core.disconnect() # Conectou depois do prazo: já está fora da cópia
+
+        threads = [threading.Thread(target=conectar, args=item, daemon=True) for item in cores.items()]
+        for t in threads: t.start()
+        prazo = time.monotonic() + TIMEOUT_CONEXAO_COPIA
+        for t in threads: t.join(timeout=max(prazo - time.monotonic(), 0))
+        with lock:
+            atrasadas.update(set(cores) - concluidas)
+        for nome, core in cores.items():
+            if nome in atrasadas:
+                self._handle_log(f"Conta de cópia '{nome}' não conectou em {TIMEOUT_CONEXAO_COPIA}s e ficará fora da cópia.", "ERRO")
+            elif core.is_connected:
+                self.copy_executor.adicionar_conta(nome, core)
+            else:
+                self._handle_log(f"Conta de cópia '{nome}' não conectou e ficará fora da cópia.", "ERRO")
+        self._handle_log(f"Cópia multi-conta ativa: {len(self.copy_executor.cores)} conta(s).", "SISTEMA")
+
+    def _handle_copy_result(self, nome, result_info):
+        """Resultado de uma conta de cópia: só vai para o log, as métricas do painel são da conta principal."""
+        lucro = result_info.get("profit", 0)
+        resultado = 'WIN' if lucro > 0 else 'LOSS' if lucro < 0 else 'EMPATE'
+        self._handle_log(f"[{nome}] {result_info.get('ativo', 'N/A')}: {resultado} {lucro:+.2f}", "TRADE")
+
+    def get_copy_stats(self):
+        """Latência por conta e skew entre contas da cópia multi-conta (vazio sem contas de cópia)."""
+        return self.copy_executor.get_stats() if self.copy_executor else {'contas': {}, 'skew_ms': {}}
  
\ No newline at end of file
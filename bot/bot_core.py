@@ -6,18 +6,28 @@ import logging
 import queue
 from datetime import datetime, timedelta
 from iqoptionapi.stable_api import IQ_Option
+from iqoptionapi.async_api import AsyncIQOptionAdapter
 from websocket._exceptions import WebSocketConnectionClosedException
-from ui.components.news_scraper import fetch_structured_news
 from .management.masaniello_manager import MasanielloManager
 from .management.cycle_manager import CycleManager
+from .news_service import NewsService
+from .connection_manager import ConnectionManager
+from .signal_ingress import SignalIngress, POLITICAS
+
+GERENCIADOR_SINAL = "Stake do sinal" # Nome do "gerenciador" quando o valor vem do próprio sinal
 
 class IQBotCore:
-    def __init__(self, credentials, config, log_callback, trade_result_callback, pair_list_callback, status_callback, trade_logger):
+    def __init__(self, credentials, config, log_callback, trade_result_callback, pair_list_callback, status_callback, trade_logger, trade_journal=None, news_service=None, feedback_publisher=None, ack_callback=None):
         self.api = None
         self.credentials = credentials
         self.config = config
         self.log_callback = log_callback # For general logs (UI display)
         self.trade_logger = trade_logger # For trade-specific logs (file)
+        self.trade_journal = trade_journal # Diário de trades em SQLite (opcional)
+        self.strategy_name = None
+        self.nome_conta = "principal" # Conta no diário de trades; as de cópia recebem o nome de 'contas_copia'
+        self.feedback_publisher = feedback_publisher # Canal de retorno para os EAs do MT4 (opcional)
+        self.ack_callback = ack_callback # Recebe cada ordem aceita/recusada (ex.: CopyExecutor), opcional
         self.trade_result_callback = trade_result_callback
         self.pair_list_callback = pair_list_callback
         self.status_callback = status_callback
@@ -29,25 +39,30 @@ class IQBotCore:
 
         # --- Workers em Segundo Plano, Cache e Fila de Trades ---
         self.open_assets_cache = {}
+        self.asset_payouts = {} # ativo -> payout (%) mais recente conhecido
+        self.atualizar_payouts = False # Há consumidor local de asset_payouts (ex.: scanner MHI)
         self.cache_last_updated = None
         self.cache_lock = threading.Lock()
         self.worker_thread = None
         self.stop_worker_event = threading.Event()
         self.trade_queue = queue.Queue()
+        self.ingress = SignalIngress() # Filtro de sinais repetidos antes da fila
         self.trade_executor_thread = None
+        self.ciclos_em_lote = [] # Threads dos ciclos enviados em rajada, aguardadas no stop
+        self.last_batch_skews_ms = [] # Skew de envio (ms) de cada ordem do último lote
+        self.resultado_lock = threading.Lock() # Ciclos de um lote terminam em paralelo
         # ------------------------------------------------------
         
-        # --- Lógica de Conexão e Reconexão (Internalizada) ---
+        # --- Conexão: vida do link e reconexão ficam no ConnectionManager ---
         self.is_connected = False
-        self.reconnect_in_progress = threading.Lock()
-        self.reconnect_attempts = 0
-        self.max_reconnect_attempts = 5
-        self.reconnect_delays = [5, 15, 30, 60, 120]
+        self.connection_manager = None
         self.connection_restored_event = threading.Event()
+        self.last_time_to_ready = None # Segundos entre o início da reconexão e a sessão pronta
         # ------------------------------------
 
         self.operacoes_em_andamento = {}
         self.news_events = []
+        self.news_service = news_service or NewsService()
         
         # --- Gerenciadores de Risco ---
         self.masaniello_manager = None
@@ -62,6 +77,7 @@ class IQBotCore:
         logging.info("Estado do bot_core resetado para nova sessão.")
         self.lucro_total = 0.0
         self.is_running = True
+        self.ingress.reset()
         if self.cycle_manager:
             self.cycle_manager.reset()
 
@@ -86,7 +102,13 @@ class IQBotCore:
         self.usar_filtro_noticias = self.config.get('usar_filtro_noticias', 'S').upper() == 'S'
         self.minutos_antes_noticia = safe_int('minutos_antes_noticia', 15)
         self.minutos_depois_noticia = safe_int('minutos_depois_noticia', 15)
+        self.news_service.set_windows(self.minutos_antes_noticia, self.minutos_depois_noticia)
         self.buy_timeout = safe_int('buy_timeout', 15)
+        self.liveness_stale_after = safe_float('liveness_janela_segundos', 6.0)
+        if self.connection_manager:
+            self.connection_manager.stale_after = min(self.liveness_stale_after, 9.5)
+        politica = self.config.get('dedup_politica', 'drop')
+        self.ingress.configure(safe_int('dedup_janela', 60), politica if politica in POLITICAS else 'drop')
 
     def set_active_manager(self, mode, manager_instance=None):
         self.active_manager = mode
@@ -97,6 +119,10 @@ class IQBotCore:
             self.masaniello_manager = None
             self.log_callback(f"Modo de gerenciamento definido para: Ciclos", "CONFIG")
 
+    def get_ingress_stats(self):
+        """Sinais repetidos descartados/mesclados por fonte."""
+        return self.ingress.drops_by_source()
+
     def set_pause_status(self, is_paused: bool):
         self.is_paused = is_paused
         status_text = "Pausado" if is_paused else "Continuado"
@@ -104,12 +130,21 @@ class IQBotCore:
         logging.info(f"Status do robô alterado para: {status_text}")
 
     # --- Arquitetura de Execução de Trades com Fila ---
-    def executar_trade(self, ativo_sinal, direcao, timeframe, context={}):
+    def executar_trade(self, ativo_sinal, direcao, timeframe, context=None):
         """Adiciona uma solicitação de trade à fila para execução sequencial."""
         if not self.is_running:
             self.log_callback(f"Trade para {ativo_sinal} ignorado: Robô não está em execução.", "AVISO")
             return
-        
+
+        context = dict(context or {})
+        destino, superado = self.ingress.admit(ativo_sinal, direcao, timeframe, context)
+        if destino != 'enqueue':
+            acao = {'dropped': 'descartado', 'merged': 'mesclado ao pendente', 'replaced': 'substituiu o pendente'}[destino]
+            self.log_callback(f"Sinal repetido para {ativo_sinal} ({direcao.upper()}) {acao}.", "AVISO")
+            # O sinal que não sai por conta própria (o novo, ou o pendente em 'replaced') recebe o ack
+            self._publicar_ack(superado, ativo_sinal, direcao, False, reason="duplicate")
+            return
+
         trade_request = (ativo_sinal, direcao, timeframe, context)
         self.trade_queue.put(trade_request)
         self.log_callback(f"Sinal para {ativo_sinal} ({direcao.upper()}) adicionado à fila de execução.", "INFO")
@@ -123,55 +158,186 @@ class IQBotCore:
                     time.sleep(1)
                     continue
 
-                trade_request = self.trade_queue.get_nowait()
-                self._process_single_trade(trade_request)
-                self.trade_queue.task_done()
+                # Espera bloqueante: o sinal é despachado assim que chega, sem latência de polling
+                trade_request = self.trade_queue.get(timeout=0.1)
+                lote = self._coletar_lote(trade_request)
+                if len(lote) == 1:
+                    self._process_single_trade(trade_request)
+                else:
+                    self._process_batch(lote)
+                for _ in lote:
+                    self.trade_queue.task_done()
             except queue.Empty:
-                time.sleep(0.1) # Pequena pausa para evitar busy-waiting
                 continue
             except Exception as e:
                 self.log_callback(f"Erro no executor de trades: {e}", "ERRO")
                 time.sleep(1) # Pausa em caso de erro inesperado
         self.log_callback("Executor de Trades finalizado.", "DEBUG")
 
+    def _coletar_lote(self, primeiro):
+        """Junta ao pedido retirado os que já estão na fila: todos vencem agora e saem em rajada."""
+        lote = [primeiro]
+        while True:
+            try:
+                lote.append(self.trade_queue.get_nowait())
+            except queue.Empty:
+                return lote
+
     def _process_single_trade(self, trade_request):
         """Processa um único trade. Contém a lógica de validação e execução."""
+        ativo_real = self._validar_trade(trade_request)
+        if ativo_real:
+            _, direcao, timeframe, context = trade_request
+            self._run_trade_cycle(ativo_real, direcao, timeframe, context)
+
+    def _process_batch(self, lote):
+        """
+        Vários sinais para o mesmo instante. Entradas que não dependem do gerenciador (stake do sinal
+        ou valor fixo) saem de uma vez pelo buy_batch e cada ciclo segue na sua própria thread; as de
+        Ciclos/Masaniello rodam uma após a outra, como na fila, para o gerenciador ver cada resultado.
+        """
+        validos = []
+        for trade_request in lote:
+            ativo_real = self._validar_trade(trade_request)
+            if ativo_real and ativo_real not in [v[0] for v in validos]:
+                self.operacoes_em_andamento[ativo_real] = True # Reserva o ativo até o ciclo assumir
+                validos.append((ativo_real,) + tuple(trade_request[1:]))
+            elif ativo_real:
+                self.log_callback(f"Trade ignorado: {ativo_real} repetido no mesmo lote.", "AVISO")
+                self._publicar_ack(trade_request[3], ativo_real, trade_request[1], False, reason="busy")
+
+        rajada = [trade for trade in validos if self._stake_independente(trade[3])]
+        sequenciais = [trade for trade in validos if not self._stake_independente(trade[3])]
+        if rajada:
+            self._enviar_rajada(rajada)
+        for ativo_real, direcao, timeframe, context in sequenciais:
+            self._run_trade_cycle(ativo_real, direcao, timeframe, context)
+
+    def _stake_independente(self, context):
+        """Entrada que não lê nem altera o gerenciador (mesmos ramos de _get_entry_value)."""
+        stake = (context or {}).get('stake')
+        if stake is not None and stake > 0:
+            return True
+        return self.active_manager == 'cycle' and self.config.get('usar_ciclos', 'S') != 'S'
+
+    def _enviar_rajada(self, rajada):
+        entradas = [self._get_entry_value(ativo_real, context) for ativo_real, _, _, context in rajada]
+        if any(entry_value <= 0 for entry_value, _, _ in entradas):
+            self.log_callback("Gerenciador finalizou ou retornou valor inválido.", "INFO")
+            self.is_running = False
+            for ativo_real, direcao, _, context in rajada:
+                self.operacoes_em_andamento[ativo_real] = False
+                self._publicar_ack(context, ativo_real, direcao, False, reason="manager_stopped")
+            return
+
+        resultados = self._enviar_lote(rajada, entradas)
+        self.ciclos_em_lote = [t for t in self.ciclos_em_lote if t.is_alive()]
+        for trade, entrada, resultado in zip(rajada, entradas, resultados):
+            ativo_real, direcao, timeframe, context = trade
+            ciclo = threading.Thread(target=self._run_trade_cycle, args=(ativo_real, direcao, timeframe, context),
+                                     kwargs={'primeira_ordem': entrada + resultado}, daemon=True)
+            ciclo.start()
+            self.ciclos_em_lote.append(ciclo)
+
+    def _enviar_lote(self, validos, entradas):
+        """Envia as ordens em sequência no socket e registra o skew de envio de cada uma."""
+        pedidos = [(entry_value, ativo, direcao, timeframe) for (ativo, direcao, timeframe, _), (entry_value, _, _) in zip(validos, entradas)]
+        for (ativo, direcao, _, _), (entry_value, manager_name, _) in zip(validos, entradas):
+            self.trade_logger.info(f'[TRADE] Enviando ordem (lote): {ativo} {direcao.upper()} | {self.cifrao}{entry_value:.2f} | {manager_name}')
+        try:
+            resultados = self.api.buy_batch(pedidos, timeout=self.buy_timeout)
+        except Exception as e:
+            self.trade_logger.error(f"[ERRO] API Error on buy_batch: {e}")
+            agora = time.time()
+            return [(False, None, agora, agora) for _ in pedidos]
+
+        inicio = resultados[0][2]
+        skews = [(sent_ts - inicio) * 1000 for _, _, sent_ts, _ in resultados]
+        self.last_batch_skews_ms = skews
+        self.log_callback(f"Lote de {len(pedidos)} ordens enviado em rajada (skew máx. {max(skews):.1f} ms).", "TRADE")
+        logging.info(f"Skew de envio por ordem (ms): {[round(s, 2) for s in skews]}")
+
+        saida = []
+        for (ativo, _, _, _), (check, id_ou_motivo, sent_ts, ack_ts) in zip(validos, resultados):
+            if check:
+                self.trade_logger.info(f"[SUCCESS] Ordem ACEITA pela corretora. ID da Ordem: {id_ou_motivo}")
+            else:
+                self.trade_logger.error(f"[ERRO] Ordem REJEITADA pela corretora ({ativo}). Motivo: {id_ou_motivo}")
+            saida.append((check, id_ou_motivo if check else None, sent_ts, ack_ts or time.time()))
+        return saida
+
+    def _validar_trade(self, trade_request):
+        """Validações antes do envio. Retorna o ativo resolvido ou None (o ack de recusa já foi publicado)."""
         ativo_sinal, direcao, timeframe, context = trade_request
-        
+        self.ingress.mark_dispatched(context)
+
         if not self.is_connected:
             self.log_callback(f"Trade para {ativo_sinal} abortado: Sem conexão.", "ERRO")
-            return
+            self._publicar_ack(context, ativo_sinal, direcao, False, reason="disconnected")
+            return None
+
+        if self.usar_filtro_noticias:
+            noticia = self.news_service.blocking_event(ativo_sinal)
+            if noticia:
+                self.log_callback(f"Trade para {ativo_sinal} bloqueado pelo filtro de notícias: {noticia['currency']} {noticia['time']} - {noticia['event']}.", "AVISO")
+                self._publicar_ack(context, ativo_sinal, direcao, False, reason="news")
+                return None
 
         ativo_real = self._resolver_ativo_correto(ativo_sinal, timeframe)
         if not ativo_real:
             # Log já acontece dentro de _resolver_ativo_correto
-            return
+            self._publicar_ack(context, ativo_sinal, direcao, False, reason="asset_unavailable")
+            return None
 
         if self.operacoes_em_andamento.get(ativo_real, False):
             self.log_callback(f"Trade ignorado: Já existe uma operação em andamento para {ativo_real}.", "AVISO")
-            return
-
-        self._run_trade_cycle(ativo_real, direcao, timeframe, context)
+            self._publicar_ack(context, ativo_real, direcao, False, reason="busy")
+            return None
+        return ativo_real
 
-    def _run_trade_cycle(self, ativo_real, direcao, timeframe, context):
+    def _run_trade_cycle(self, ativo_real, direcao, timeframe, context, primeira_ordem=None):
+        """
+        Ciclo de entrada + martingale de um ativo. primeira_ordem: entrada já enviada por um lote,
+        (entry_value, manager_name, should_record, check, trade_id, order_sent_ts, order_ack_ts).
+        """
         try:
             self.operacoes_em_andamento[ativo_real] = True
+            nivel_martingale = 0
             
-            while self.is_running and not self.stop_worker_event.is_set():
-                entry_value, manager_name, should_record = self._get_entry_value(ativo_real)
-
-                if entry_value <= 0:
-                    self.log_callback(f"Gerenciador ({manager_name}) finalizou ou retornou valor inválido.", "INFO")
-                    self.is_running = False
-                    break
-
-                check, trade_id = self._enviar_ordem(entry_value, ativo_real, direcao, timeframe, manager_name)
+            # Uma entrada já enviada pelo lote é sempre acompanhada, mesmo se o robô parar no meio
+            while primeira_ordem or (self.is_running and not self.stop_worker_event.is_set()):
+                if primeira_ordem:
+                    entry_value, manager_name, should_record, check, trade_id, order_sent_ts, order_ack_ts = primeira_ordem
+                    primeira_ordem = None
+                else:
+                    entry_value, manager_name, should_record = self._get_entry_value(ativo_real, context)
+
+                    if entry_value <= 0:
+                        self.log_callback(f"Gerenciador ({manager_name}) finalizou ou retornou valor inválido.", "INFO")
+                        self.is_running = False
+                        break
+
+                    order_sent_ts = time.time()
+                    check, trade_id = self._enviar_ordem(entry_value, ativo_real, direcao, timeframe, manager_name)
+                    order_ack_ts = time.time()
+                journal_entry = {
+                    'conta': self.nome_conta, 'ativo': ativo_real, 'direcao': direcao, 'timeframe': timeframe, 'estrategia': self.strategy_name,
+                    'gerenciador': manager_name, 'nivel_martingale': nivel_martingale, 'valor_entrada': entry_value,
+                    'trade_id': trade_id, 'signal_ts': context.get('signal_ts'), 'order_sent_ts': order_sent_ts,
+                    'order_ack_ts': order_ack_ts, 'context': context
+                }
                 if not check:
+                    self._registrar_no_diario(journal_entry, resultado='REJEITADA')
+                    self._publicar_ack(context, ativo_real, direcao, False, reason="broker_rejected")
                     break
+                self._publicar_ack(context, ativo_real, direcao, True, order_id=trade_id)
 
                 lucro = self._aguardar_e_processar_resultado(trade_id, timeframe)
-                if lucro is None: # Erro crítico ou timeout
+                if lucro is None: # Timeout ou parada: resultado desconhecido, sem lucro nem martingale
+                    self._registrar_no_diario(journal_entry, resultado='TIMEOUT')
                     break
+                self._registrar_no_diario(journal_entry, lucro=lucro, result_ts=time.time())
+                self._publicar_resultado(context, ativo_real, direcao, trade_id, lucro)
 
                 if should_record:
                     self._registrar_resultado_gerenciador(lucro, entry_value)
@@ -179,10 +345,11 @@ class IQBotCore:
                 self.trade_result_callback({"profit": lucro, "entry_value": entry_value, "context": context, "foi_executado": True, "ativo": ativo_real})
                 self.check_stop()
 
-                if not self._deve_continuar_martingale(lucro):
-                    break # Sai do ciclo de martingale (WIN ou fim dos níveis)
+                if manager_name == GERENCIADOR_SINAL or not self._deve_continuar_martingale(lucro):
+                    break # Sai do ciclo de martingale (WIN, fim dos níveis ou valor definido pelo sinal)
                 
                 self.trade_logger.info(f"[INFO] Iniciando Martingale para {ativo_real}...")
+                nivel_martingale += 1
                 # O loop continuará para a próxima iteração (martingale)
 
         except WebSocketConnectionClosedException:
@@ -257,11 +424,17 @@ class IQBotCore:
             self.log_callback(f"Erro ao verificar timeframes para '{resolved_asset}': {e}. A operação será cancelada.", "ERRO")
             return None
 
-    def _get_entry_value(self, asset):
+    def _get_entry_value(self, asset, context=None):
+        # Stake enviado pelo sinal (ex.: campo "stake" do protocolo MT4): entrada única, fora do gerenciador
+        stake = (context or {}).get('stake')
+        if stake is not None and stake > 0:
+            return float(stake), GERENCIADOR_SINAL, False
         if self.active_manager == 'cycle':
             if self.config.get('usar_ciclos', 'S') == 'S':
                 # Payout é um valor de 0 a 100, dividir por 100
-                payout = (self.api.get_digital_payout(asset) or 87) / 100.0
+                payout_pct = self.api.get_digital_payout(asset) or 87
+                self._atualizar_payout(asset, payout_pct)
+                payout = payout_pct / 100.0
                 return self.cycle_manager.get_next_entry_value(payout), "Ciclos", True
             else:
                 return float(self.config.get('valor_entrada', 1.0)), "Fixo", False
@@ -286,11 +459,55 @@ class IQBotCore:
             self.trade_logger.error(f"[ERRO] API Error on buy for {ativo}: {e}")
             return False, None
 
+    def _registrar_no_diario(self, journal_entry, lucro=None, resultado=None, result_ts=None):
+        """Enfileira a ordem no diário de trades. Nunca bloqueia o ciclo de trade."""
+        if not self.trade_journal:
+            return
+        if resultado is None and lucro is not None:
+            resultado = 'WIN' if lucro > 0 else 'LOSS' if lucro < 0 else 'EMPATE'
+        try:
+            self.trade_journal.record_trade(lucro=lucro, resultado=resultado, result_ts=result_ts, **journal_entry)
+        except Exception as e:
+            logging.error(f"Erro ao registrar trade no diário: {e}")
+
+    # --- Canal de retorno para o MT4 ---
+    def _publicar_ack(self, context, ativo, direcao, aceita, order_id=None, reason=None):
+        if self.ack_callback:
+            try:
+                self.ack_callback({'context': context, 'ativo': ativo, 'direcao': direcao, 'aceita': aceita,
+                                   'order_id': order_id, 'reason': reason, 'ts': time.time()})
+            except Exception as e:
+                logging.error(f"Erro no callback de ack: {e}")
+        if not self.feedback_publisher:
+            return
+        try:
+            self.feedback_publisher.publish_ack(context, ativo, direcao, aceita, order_id=order_id, reason=reason)
+        except Exception as e:
+            logging.error(f"Erro ao publicar ack para o MT4: {e}")
+
+    def _publicar_resultado(self, context, ativo, direcao, trade_id, lucro):
+        if not self.feedback_publisher:
+            return
+        resultado = 'WIN' if lucro > 0 else 'LOSS' if lucro < 0 else 'EMPATE'
+        try:
+            self.feedback_publisher.publish_result(context, ativo, direcao, trade_id, lucro, resultado)
+        except Exception as e:
+            logging.error(f"Erro ao publicar resultado para o MT4: {e}")
+
+    def _atualizar_payout(self, ativo, payout_pct):
+        """Guarda o payout mais recente de um ativo e o repassa aos EAs se ele mudou."""
+        if self.asset_payouts.get(ativo) == payout_pct:
+            return
+        self.asset_payouts[ativo] = payout_pct
+        if self.feedback_publisher:
+            self.feedback_publisher.publish_payouts({ativo: payout_pct})
+
     def _registrar_resultado_gerenciador(self, lucro, entry_value):
-        if self.active_manager == 'cycle':
-            self.cycle_manager.record_trade(lucro, entry_value)
-        elif self.active_manager == 'masaniello' and self.masaniello_manager:
-            self.masaniello_manager.record_trade(entry_value, lucro)
+        with self.resultado_lock:
+            if self.active_manager == 'cycle':
+                self.cycle_manager.record_trade(lucro, entry_value)
+            elif self.active_manager == 'masaniello' and self.masaniello_manager:
+                self.masaniello_manager.record_trade(entry_value, lucro)
 
     def _deve_continuar_martingale(self, lucro):
         if not (self.active_manager == 'cycle' and self.cycle_manager.is_active and lucro <= 0):
@@ -304,7 +521,11 @@ class IQBotCore:
     def connect(self, *args, **kwargs):
         self.log_callback("Conectando à IQ Option...", "INFO")
         try:
-            self.api = IQ_Option(self.credentials['email'], self.credentials['senha'])
+            if self.config.get('cliente_async', 'N').upper() == 'S':
+                # Cliente assíncrono: esperas de ordem/resultado/payout viram futures num event loop compartilhado
+                self.api = AsyncIQOptionAdapter(self.credentials['email'], self.credentials['senha'], stop_event=self.stop_worker_event)
+            else:
+                self.api = IQ_Option(self.credentials['email'], self.credentials['senha'])
             check, reason = self.api.connect()
             if not check:
                 self.log_callback(f'Falha na conexão: {reason}', "ERRO")
@@ -321,6 +542,7 @@ class IQBotCore:
             self.is_connected = True
             self.status_callback("IQ", "CONECTADO", "Online")
             self.connection_restored_event.set()
+            self._iniciar_monitor_de_conexao()
             return True
         except Exception as e:
             self.log_callback(f'Exceção ao conectar: {e}', "ERRO")
@@ -328,8 +550,36 @@ class IQBotCore:
             self.connection_restored_event.clear()
             return False
 
+    def _iniciar_monitor_de_conexao(self):
+        if self.connection_manager:
+            self.connection_manager.stop()
+        self.connection_manager = ConnectionManager(
+            self.api, self.log_callback, self.status_callback, stale_after=self.liveness_stale_after,
+            on_connection_lost=self._on_connection_lost, on_connection_restored=self._on_connection_restored,
+            on_give_up=self.stop_background_worker)
+        self.connection_manager.is_connected = True
+        self.connection_manager.start()
+
+    def _on_connection_lost(self):
+        self.is_connected = False
+        self.connection_restored_event.clear()
+
+    def _on_connection_restored(self):
+        self.is_connected = True
+        self._registrar_tempo_de_retomada()
+        self.connection_restored_event.set()
+
+    def get_connection_stats(self):
+        """Idade do último frame, percentis de RTT (ms) e tentativas de reconexão."""
+        if not self.connection_manager:
+            return {'conectado': self.is_connected, 'ultimo_frame_s': None, 'rtt_ms': {}, 'tentativas_reconexao': 0}
+        return self.connection_manager.get_stats()
+
     def disconnect(self):
         self.stop_background_worker()
+        if self.connection_manager:
+            self.connection_manager.stop()
+            self.connection_manager = None
         if self.api and hasattr(self.api, 'ws') and hasattr(self.api.ws, 'wss') and self.api.ws.wss:
             try:
                 self.api.ws.wss.close()
@@ -356,6 +606,11 @@ class IQBotCore:
         self.stop_worker_event.set()
         if self.worker_thread: self.worker_thread.join(timeout=5)
         if self.trade_executor_thread: self.trade_executor_thread.join(timeout=5)
+        # Com o stop, a espera de resultado dos ciclos em rajada termina (TIMEOUT no diário)
+        prazo = time.monotonic() + 5
+        for ciclo in self.ciclos_em_lote:
+            ciclo.join(timeout=max(prazo - time.monotonic(), 0))
+        self.ciclos_em_lote = [t for t in self.ciclos_em_lote if t.is_alive()]
 
     def _background_worker_loop(self):
         self.log_callback("Worker de Manutenção iniciado. Executando primeira carga de dados...", "INFO")
@@ -364,74 +619,37 @@ class IQBotCore:
 
         WORKER_INTERVAL = 5
         NEWS_INTERVAL = 14400
+        ASSETS_INTERVAL = 60 # Ativos abertos e payouts, para os EAs do MT4 e o scanner MHI
         last_news_update = time.time()
+        last_assets_update = time.time()
 
         while not self.stop_worker_event.is_set():
             if self.stop_worker_event.wait(WORKER_INTERVAL): break
             
-            if self._health_check_and_reconnect():
+            if self.is_connected:
                 now = time.time()
                 if (now - last_news_update) >= NEWS_INTERVAL:
                     self._carregar_noticias_do_dia()
                     last_news_update = now
-
-    def _health_check_and_reconnect(self):
-        is_currently_ok = False
-        try:
-            if self.api and self.api.check_connect():
-                self.api.get_server_timestamp()
-                is_currently_ok = True
-        except Exception:
-            is_currently_ok = False
-
-        if is_currently_ok:
-            if not self.is_connected:
-                self.is_connected = True
-                self.reconnect_attempts = 0
-                self.status_callback("IQ", "CONECTADO", "Online")
-                self.log_callback("Conexão restabelecida.", "INFO")
-                self.connection_restored_event.set()
-        else:
-            if self.is_connected:
-                self.is_connected = False
-                self.connection_restored_event.clear()
-                self.log_callback("Conexão perdida. Acionando reconexão.", "AVISO")
-                self._trigger_reconnection()
-        return self.is_connected
+                if (now - last_assets_update) >= ASSETS_INTERVAL and self._precisa_de_ativos():
+                    self._update_open_assets_cache()
+                    last_assets_update = now
 
     def _trigger_reconnection(self):
-        if self.reconnect_in_progress.locked(): return
-        reconnect_thread = threading.Thread(target=self._reconnect_with_backoff, daemon=True)
-        reconnect_thread.start()
-
-    def _reconnect_with_backoff(self):
-        with self.reconnect_in_progress:
-            if self.is_connected: return
-            if self.reconnect_attempts >= self.max_reconnect_attempts:
-                self.log_callback("FALHA CRÍTICA DE CONEXÃO. REINICIE O ROBÔ.", "ERRO")
-                self.status_callback("IQ", "ERRO", "Falha Crítica")
-                self.stop_background_worker()
-                return
-
-            delay = self.reconnect_delays[min(self.reconnect_attempts, len(self.reconnect_delays) - 1)]
-            self.log_callback(f"Tentando reconectar em {delay}s...", "AVISO")
-            self.status_callback("IQ", "RECONECTANDO", f"Tentando em {delay}s")
-            if self.stop_worker_event.wait(delay): return
-
-            self.reconnect_attempts += 1
-            try:
-                check, reason = self.api.connect()
-                if check:
-                    self.is_connected = True
-                    self.status_callback("IQ", "CONECTADO", "Online")
-                    self.log_callback("Conexão reestabelecida com sucesso!", "INFO")
-                    self.connection_restored_event.set()
-                else:
-                    self.log_callback(f"Falha ao reconectar: {reason}.", "ERRO")
-            except Exception as e:
-                self.log_callback(f"Exceção na tentativa de reconexão: {e}", "ERRO")
+        if self.connection_manager:
+            self.connection_manager.trigger_reconnection()
+
+    def _registrar_tempo_de_retomada(self):
+        stats = getattr(self.api, 'last_connect_stats', None)
+        if not stats or not stats.get('resumed'):
+            return
+        self.last_time_to_ready = stats['time_to_ready']
+        self.log_callback(f"Conexão reestabelecida com sucesso em {stats['time_to_ready']:.1f}s "
+                          f"({stats['confirmed']}/{stats['streams']} streams, {stats['recovered_results']} resultado(s) recuperado(s)).", "INFO")
+        logging.info(f"Tempo até pronto após reconexão: {stats['time_to_ready']:.2f}s | {stats}")
 
     def _aguardar_e_processar_resultado(self, trade_id, timeframe=1):
+        """Lucro do trade, ou None se o resultado não chegou (timeout ou parada)."""
         resultado = None
         tempo_max_espera = (int(timeframe) * 60) + 35
         start_time = time.time()
@@ -453,10 +671,11 @@ class IQBotCore:
 
         if resultado is None:
             self.log_callback(f"Timeout ou parada: Não foi possível obter resultado para o trade ID {trade_id}.", "ERRO")
-            return -1
+            return None
 
         lucro = round(resultado, 2)
-        self.lucro_total += lucro
+        with self.resultado_lock:
+            self.lucro_total += lucro
 
         if lucro > 0:
             self.trade_logger.info(f'[WIN] WIN (Ordem {trade_id}) | Lucro: {self.cifrao}{lucro:+.2f} | Saldo: {self.cifrao}{self.lucro_total:+.2f}')
@@ -467,7 +686,7 @@ class IQBotCore:
 
     def _carregar_noticias_do_dia(self):
         logging.info("Iniciando busca por notícias econômicas do dia...")
-        self.news_events = fetch_structured_news()
+        self.news_events = self.news_service.get_news()
         if self.news_events:
             self.log_callback(f"{len(self.news_events)} notícias de impacto encontradas para hoje.", "INFO")
         else:
@@ -479,9 +698,31 @@ class IQBotCore:
                 with self.cache_lock:
                     self.open_assets_cache = self.api.get_all_open_time()
                     self.cache_last_updated = datetime.now()
+                self._publicar_ativos()
         except Exception as e:
             logging.error(f"Erro ao atualizar o cache de ativos abertos: {e}")
 
+    def _precisa_de_ativos(self):
+        """A atualização periódica de ativos/payouts só vale a pena se alguém consome o resultado."""
+        return bool(self.feedback_publisher) or self.atualizar_payouts
+
+    def _publicar_ativos(self):
+        """Atualiza o payout (turbo/binária) de cada ativo e envia aos EAs os ativos abertos com eles."""
+        if not self._precisa_de_ativos():
+            return
+        try:
+            for ativo, perfis in self.api.get_all_profit().items():
+                payout = perfis.get('turbo') or perfis.get('binary')
+                if payout:
+                    self.asset_payouts[ativo] = round(payout * 100, 1)
+        except Exception as e:
+            logging.warning(f"Não foi possível obter os payouts: {e}")
+        if not self.feedback_publisher:
+            return
+        with self.cache_lock:
+            cache = self.open_assets_cache
+        self.feedback_publisher.publish_assets(cache, dict(self.asset_payouts))
+
     def check_stop(self):
         if self.lucro_total <= -abs(self.stop_loss):
             self.is_running = False
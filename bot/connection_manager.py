@@ -3,19 +3,36 @@
 import time
 import threading
 import logging
-from iqoptionapi.stable_api import IQ_Option
+from collections import deque
+
+STALE_AFTER = 6.0 # Segundos sem nenhum frame de entrada até considerar o link morto (mesmo com o socket "aberto")
+PROBE_INTERVAL = 2.0 # Segundos de silêncio antes de enviar um ping para medir o RTT e provocar tráfego
+CHECK_INTERVAL = 1.0
 
 class ConnectionManager:
-    def __init__(self, api_instance, log_callback, status_callback):
+    """
+    Monitor único de vida da conexão com a IQ Option: considera o tempo desde o último frame
+    recebido (mensagens, timeSync, heartbeat ou pong) em vez de apenas flags, mede o RTT com
+    pings e cuida da reconexão com backoff.
+    """
+    def __init__(self, api_instance, log_callback, status_callback, stale_after=STALE_AFTER,
+                 probe_interval=PROBE_INTERVAL, on_connection_lost=None, on_connection_restored=None, on_give_up=None):
         self.api = api_instance
         self.log_callback = log_callback
         self.status_callback = status_callback
-        
+        self.stale_after = min(float(stale_after), 9.5) # Janela sempre abaixo de 10s
+        self.probe_interval = min(float(probe_interval), self.stale_after / 2)
+        self.on_connection_lost = on_connection_lost
+        self.on_connection_restored = on_connection_restored
+        self.on_give_up = on_give_up
+
         self.is_connected = False
         self.reconnect_in_progress = threading.Lock()
         self.health_check_thread = None
         self.stop_event = threading.Event()
-        
+        self.last_probe_ts = 0.0
+        self.rtt_samples = deque(maxlen=200)
+
         self.reconnect_attempts = 0
         self.max_reconnect_attempts = 5
         self.reconnect_delays = [5, 15, 30, 60, 120]  # Exponential backoff delays
@@ -25,7 +42,7 @@ class ConnectionManager:
         if self.health_check_thread and self.health_check_thread.is_alive():
             logging.info("ConnectionManager já está em execução.")
             return
-            
+
         self.stop_event.clear()
         self.health_check_thread = threading.Thread(target=self._health_check_loop)
         self.health_check_thread.daemon = True
@@ -36,36 +53,98 @@ class ConnectionManager:
     def stop(self):
         """Para o monitoramento da conexão."""
         self.stop_event.set()
-        if self.health_check_thread:
+        if self.health_check_thread and self.health_check_thread is not threading.current_thread():
             self.health_check_thread.join(timeout=5)
         self.log_callback("Gerenciador de Conexão parado.", "INFO")
         logging.info("ConnectionManager stopped.")
 
+    # --- Vida do link ---
     def _health_check_loop(self):
-        """Loop principal que verifica a saúde da conexão periodicamente."""
+        """Loop principal que verifica a saúde da conexão a cada segundo."""
         while not self.stop_event.is_set():
-            if self.api and self.api.check_connect():
-                try:
-                    # get_server_timestamp é uma chamada leve para verificar a conexão real.
-                    self.api.get_server_timestamp()
-                    if not self.is_connected:
-                        self.is_connected = True
-                        self.reconnect_attempts = 0  # Reseta tentativas após sucesso
-                        self.status_callback("IQ", "CONECTADO", "Online")
-                        self.log_callback("Conexão com a IQ Option está saudável.", "INFO")
-                except Exception as e:
-                    if self.is_connected:
-                        self.is_connected = False
-                        self.log_callback(f"Health Check falhou, mesmo com check_connect() True. Erro: {e}", "AVISO")
-                        self._trigger_reconnection()
-            else:
-                if self.is_connected:
-                    self.is_connected = False
-                    self.log_callback("Conexão com a IQ Option perdida.", "AVISO")
-                    self._trigger_reconnection()
-            
-            # Verifica a cada 10 segundos
-            self.stop_event.wait(10)
+            self.check_health()
+            if self.stop_event.wait(CHECK_INTERVAL):
+                break
+
+    def check_health(self):
+        """Uma verificação: atualiza is_connected, dispara a reconexão na queda e retorna o estado."""
+        healthy, reason = self._evaluate()
+        if healthy:
+            if not self.is_connected:
+                self.is_connected = True
+                self.reconnect_attempts = 0  # Reseta tentativas após sucesso
+                self.status_callback("IQ", "CONECTADO", "Online")
+                self.log_callback("Conexão com a IQ Option está saudável.", "INFO")
+                if self.on_connection_restored: self.on_connection_restored()
+        elif self.is_connected:
+            self.is_connected = False
+            self.log_callback(f"Conexão com a IQ Option perdida: {reason}.", "AVISO")
+            if self.on_connection_lost: self.on_connection_lost()
+            self._trigger_reconnection()
+        else:
+            self._trigger_reconnection() # Nova tentativa após uma reconexão que falhou
+        return self.is_connected
+
+    def _evaluate(self):
+        """(saudável, motivo). Envia um ping quando o link está em silêncio há probe_interval."""
+        if not self.api:
+            return False, "API inexistente"
+        try:
+            if not self.api.check_connect():
+                return False, "websocket fechado"
+            age = self.api.get_last_frame_age()
+        except Exception as e:
+            return False, f"erro no health check ({e})"
+        if age is None:
+            return True, None # Ainda sem frames desde a conexão; o connect() já validou o timeSync
+        if age > self.stale_after:
+            return False, f"nenhum frame há {age:.1f}s"
+        if age >= self.probe_interval and time.time() - self.last_probe_ts >= self.probe_interval:
+            self._probe()
+        return True, None
+
+    def _probe(self):
+        self.last_probe_ts = time.time()
+        try:
+            self.api.send_ping()
+        except Exception as e:
+            logging.debug(f"Falha ao enviar ping: {e}")
+
+    def seconds_since_last_frame(self):
+        try:
+            return self.api.get_last_frame_age()
+        except Exception:
+            return None
+
+    def rtt_percentiles(self, percentiles=(50, 90, 99)):
+        """RTT dos pings em milissegundos: {50: ..., 90: ..., 99: ...} (vazio sem amostras)."""
+        try:
+            samples = sorted(self.api.get_rtt_samples())
+        except Exception:
+            samples = []
+        if not samples:
+            return {}
+        result = {}
+        for p in percentiles:
+            rank = max(int(round(p / 100.0 * len(samples))) - 1, 0) # Nearest-rank
+            result[p] = samples[min(rank, len(samples) - 1)] * 1000.0
+        return result
+
+    def get_stats(self):
+        return {
+            'conectado': self.is_connected,
+            'ultimo_frame_s': self.seconds_since_last_frame(),
+            'rtt_ms': self.rtt_percentiles(),
+            'tentativas_reconexao': self.reconnect_attempts,
+        }
+
+    # --- Reconexão ---
+    def trigger_reconnection(self):
+        """Força a reconexão (ex.: exceção de socket durante um trade)."""
+        if self.is_connected:
+            self.is_connected = False
+            if self.on_connection_lost: self.on_connection_lost()
+        self._trigger_reconnection()
 
     def _trigger_reconnection(self):
         """Aciona o processo de reconexão em uma nova thread para não bloquear."""
@@ -87,27 +166,31 @@ class ConnectionManager:
                 self.log_callback("FALHA CRÍTICA DE CONEXÃO. VERIFIQUE SUA INTERNET E REINICIE O ROBÔ.", "ERRO")
                 self.status_callback("IQ", "ERRO", "Falha Crítica")
                 self.stop() # Para de tentar
+                if self.on_give_up: self.on_give_up()
                 return
 
             delay = self.reconnect_delays[min(self.reconnect_attempts, len(self.reconnect_delays) - 1)]
-            
+
             self.log_callback(f"Tentando reconectar em {delay} segundos... (Tentativa {self.reconnect_attempts + 1}/{self.max_reconnect_attempts})", "AVISO")
             self.status_callback("IQ", "RECONECTANDO", f"Tentando em {delay}s")
-            
+
             self.stop_event.wait(delay)
             if self.stop_event.is_set(): return # Se o bot foi parado, cancela a reconexão
 
             self.reconnect_attempts += 1
-            
+
             try:
                 logging.info(f"Attempting to reconnect... (Attempt {self.reconnect_attempts})")
-                check, reason = self.api.connect()
+                # Retoma a sessão existente (SSID, streams e ordens pendentes) quando possível
+                reconnect = getattr(self.api, 'reconnect', None) or self.api.connect
+                check, reason = reconnect()
                 if check:
                     self.is_connected = True
                     self.reconnect_attempts = 0
                     self.log_callback("Reconectado com sucesso à IQ Option!", "INFO")
                     logging.info("Successfully reconnected to IQ Option.")
                     self.status_callback("IQ", "CONECTADO", "Online")
+                    if self.on_connection_restored: self.on_connection_restored()
                 else:
                     self.log_callback(f"Falha ao reconectar: {reason}. Agendando nova tentativa.", "ERRO")
                     logging.error(f"Failed to reconnect: {reason}")
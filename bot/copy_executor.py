@@ -0,0 +1,165 @@
+# bot/copy_executor.py
+
+import time
+import json
+import base64
+import logging
+import itertools
+import threading
+from collections import deque
+
+HISTORICO = 200 # Amostras de latência/skew guardadas por conta
+EXPIRA_PENDENTE = 300 # Segundos até descartar um sinal que não recebeu ack de todas as contas
+
+def carregar_contas_copia(valor):
+    """
+    Lê a configuração 'contas_copia': lista JSON de contas
+    [{"nome", "email", "senha" (base64, como no login salvo), "conta": "PRACTICE"|"REAL", ...}].
+    Qualquer outra chave (valor_entrada, stop_win, stop_loss...) sobrescreve a configuração da conta.
+    """
+    if not valor:
+        return []
+    contas = json.loads(valor) if isinstance(valor, str) else valor
+    resultado = []
+    for i, conta in enumerate(contas):
+        if not conta.get('email') or not conta.get('senha'):
+            raise ValueError(f"Conta de cópia #{i + 1} sem email ou senha.")
+        conta = dict(conta)
+        credenciais = {
+            'email': conta.pop('email'),
+            'senha': base64.b64decode(conta.pop('senha').encode('utf-8')).decode('utf-8'),
+            'conta': conta.pop('conta', 'PRACTICE'),
+        }
+        nome = conta.pop('nome', None) or credenciais['email']
+        resultado.append((nome, credenciais, {k: str(v) for k, v in conta.items()}))
+    return resultado
+
+def percentis(amostras, ps=(50, 90, 99)):
+    """Percentis (nearest-rank) de uma lista de amostras; vazio sem amostras."""
+    amostras = sorted(amostras)
+    if not amostras:
+        return {}
+    return {p: amostras[min(max(int(round(p / 100.0 * len(amostras))) - 1, 0), len(amostras) - 1)] for p in ps}
+
+class CopyExecutor:
+    """
+    Espelha cada sinal em várias contas no mesmo processo (um IQBotCore por conta, cada um com
+    seu gerenciador, stops e executor). Tem a mesma interface que as estratégias usam do bot_core,
+    então qualquer estratégia pode alimentá-lo. Mede, por sinal, a latência até a ordem aceita em
+    cada conta e a diferença (skew) entre a primeira e a última conta.
+    """
+    def __init__(self, primary, log_callback):
+        self.primary = primary
+        self.log_callback = log_callback
+        self.cores = {} # nome -> IQBotCore; o primeiro é a conta principal
+        self.lock = threading.Lock()
+        self.pendentes = {} # fanout_id -> {'ativo', 'direcao', 'inicio', 'esperadas', 'acks'}
+        self.latencias = {} # nome -> deque de segundos (sinal -> ordem aceita)
+        self.recusas = {} # nome -> ordens recusadas
+        self.skews = deque(maxlen=HISTORICO)
+        self._seq = itertools.count(1)
+        self.adicionar_conta("principal", primary)
+
+    def adicionar_conta(self, nome, core):
+        core.ack_callback = lambda info, nome=nome: self._on_ack(nome, info)
+        core.nome_conta = nome # Identifica a conta nas linhas do diário de trades
+        self.cores[nome] = core
+        self.latencias[nome] = deque(maxlen=HISTORICO)
+        self.recusas[nome] = 0
+
+    def copias(self):
+        return [core for core in self.cores.values() if core is not self.primary]
+
+    # --- Interface usada pelas estratégias (a conta principal fornece api e config) ---
+    @property
+    def api(self):
+        return self.primary.api
+
+    @property
+    def config(self):
+        return self.primary.config
+
+    @property
+    def asset_payouts(self):
+        return self.primary.asset_payouts
+
+    @property
+    def strategy_name(self):
+        return self.primary.strategy_name
+
+    @strategy_name.setter
+    def strategy_name(self, nome):
+        for core in self.cores.values():
+            core.strategy_name = nome
+
+    def executar_trade(self, ativo_sinal, direcao, timeframe, context=None):
+        """Entrega o mesmo sinal à fila de todas as contas em execução; cada executor envia a ordem em paralelo."""
+        agora = time.time()
+        fanout_id = next(self._seq)
+        base = dict(context or {})
+        base.setdefault('signal_ts', agora)
+        base['fanout_id'] = fanout_id
+        base['fanout_ts'] = agora
+
+        ativas = [(nome, core) for nome, core in self.cores.items() if core.is_running]
+        with self.lock:
+            self._expirar(agora)
+            if ativas:
+                self.pendentes[fanout_id] = {'ativo': ativo_sinal, 'direcao': direcao, 'inicio': agora,
+                                             'esperadas': {nome for nome, _ in ativas}, 'acks': {}}
+        for nome, core in ativas:
+            core.executar_trade(ativo_sinal, direcao, timeframe, dict(base, conta=nome))
+        if len(ativas) < len(self.cores):
+            paradas = sorted(set(self.cores) - {nome for nome, _ in ativas})
+            self.log_callback(f"Sinal {ativo_sinal} não copiado para: {', '.join(paradas)} (robô parado).", "AVISO")
+
+    # --- Acks e estatísticas ---
+    def _on_ack(self, nome, info):
+        fanout_id = info['context'].get('fanout_id')
+        with self.lock:
+            pendente = self.pendentes.get(fanout_id)
+            if not pendente or nome in pendente['acks']:
+                return # Sinal de fora do fan-out ou nível de martingale
+            pendente['acks'][nome] = info
+            if info['aceita']:
+                self.latencias[nome].append(info['ts'] - pendente['inicio'])
+            else:
+                self.recusas[nome] += 1
+            if not pendente['esperadas'] <= set(pendente['acks']):
+                return
+            del self.pendentes[fanout_id]
+        self._concluir(pendente)
+
+    def _concluir(self, pendente):
+        aceitas = {nome: info['ts'] - pendente['inicio'] for nome, info in pendente['acks'].items() if info['aceita']}
+        recusadas = [f"{nome} ({info['reason']})" for nome, info in pendente['acks'].items() if not info['aceita']]
+        resumo = f"Cópia {pendente['ativo']} ({pendente['direcao'].upper()}): {len(aceitas)}/{len(pendente['acks'])} conta(s)"
+        if len(aceitas) > 1:
+            skew = max(aceitas.values()) - min(aceitas.values())
+            with self.lock:
+                self.skews.append(skew)
+            resumo += f", skew {skew * 1000:.0f} ms"
+        if recusadas:
+            resumo += f" | recusada em: {', '.join(recusadas)}"
+        self.log_callback(resumo, "INFO" if not recusadas else "AVISO")
+        logging.info(f"{resumo} | latências: { {n: round(v * 1000) for n, v in aceitas.items()} }")
+
+    def _expirar(self, agora):
+        for fanout_id in [f for f, p in self.pendentes.items() if agora - p['inicio'] > EXPIRA_PENDENTE]:
+            del self.pendentes[fanout_id]
+
+    def get_stats(self):
+        """Por conta: percentis de latência até a ordem aceita (ms), ordens, recusas e lucro; e o skew entre contas."""
+        with self.lock:
+            contas = {
+                nome: {
+                    'latencia_ms': {p: v * 1000.0 for p, v in percentis(self.latencias[nome]).items()},
+                    'ordens': len(self.latencias[nome]),
+                    'recusadas': self.recusas[nome],
+                    'lucro': core.lucro_total,
+                    'ativa': core.is_running,
+                }
+                for nome, core in self.cores.items()
+            }
+            skew = {p: v * 1000.0 for p, v in percentis(self.skews).items()}
+        return {'contas': contas, 'skew_ms': skew}
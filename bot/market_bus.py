@@ -0,0 +1,251 @@
+# bot/market_bus.py
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+
+VELAS_STREAM = 10 # maxdict dos streams de velas abertos pelo barramento
+ESPERA_MAXIMA = 0.5 # Segundos máximos de espera na fila quando não há timer agendado
+
+class MarketDataBus:
+    """
+    Barramento de dados de mercado para várias estratégias-plugin (StrategyPlugin) ao mesmo tempo.
+
+    Cada stream de velas (ativo, tamanho) é assinado uma única vez, seja quantos forem os plugins
+    interessados, e os eventos são entregues por uma única thread de despacho:
+      on_candle - vela fechada;
+      on_tick   - vela em andamento atualizada (coalescida: só a última atualização pendente);
+      on_signal - sinais das estratégias tradicionais (MT4, lista, MHI...) que rodam junto com o
+                  barramento, via SinaisParaBarramento, ou publicados com publicar_sinal;
+      on_result - resultado de um trade (só para o plugin que o enviou, quando identificado).
+    Os timers (agendar) rodam na mesma thread, no relógio do servidor. O tempo de CPU de cada
+    plugin é medido em cada chamada (metricas()).
+
+    Tem a mesma interface das outras estratégias (start/stop/is_alive): o AppController o executa
+    sozinho ("Plugins (Barramento)") ou ao lado da estratégia principal, quando há plugins em
+    'estrategias_plugins'. on_signal só observa: o sinal da estratégia principal é executado de
+    qualquer forma; para operar, o plugin usa operar().
+    """
+    def __init__(self, bot_core, plugins, maxdict=VELAS_STREAM):
+        self.bot_core = bot_core
+        self.log = bot_core.log_callback
+        self.plugins = list(plugins)
+        self.maxdict = maxdict
+        self.stop_event = threading.Event()
+        self.dispatch_thread = None
+        self.eventos = queue.Queue()
+        self.lock = threading.Lock()
+        self.em_andamento = {} # (ativo, tamanho) -> última atualização da vela em andamento
+        self.ticks_pendentes = {} # (ativo, tamanho) -> vela ainda não entregue em on_tick
+        self.interessados = {} # (ativo, tamanho) -> plugins
+        self.streams = [] # (ativo, tamanho) assinados por este barramento
+        self.timers = [] # heap (momento, seq, plugin, função)
+        self.seq = itertools.count()
+        self.contadores = {p.nome: {'chamadas': 0, 'erros': 0, 'cpu': 0.0, 'tempo': 0.0, 'maior': 0.0} for p in self.plugins}
+        self.last_traded_asset = None
+        self.last_trade_direction = None
+        for plugin in self.plugins:
+            plugin.bus = self
+            for ativo in plugin.ativos:
+                for tamanho in plugin.timeframes:
+                    self.interessados.setdefault((ativo, tamanho), []).append(plugin)
+
+    def is_alive(self):
+        return self.dispatch_thread is not None and self.dispatch_thread.is_alive()
+
+    def start(self):
+        if not self.is_alive():
+            self.stop_event.clear()
+            self.dispatch_thread = threading.Thread(target=self._run_loop)
+            self.dispatch_thread.daemon = True
+            self.dispatch_thread.start()
+            nomes = ", ".join(p.nome for p in self.plugins)
+            self.log(f"Barramento de estratégias iniciado: {nomes}.", "STRATEGY")
+
+    def stop(self):
+        self.stop_event.set()
+        self.eventos.put(None) # Acorda a thread de despacho
+        if self.dispatch_thread: self.dispatch_thread.join(timeout=2)
+        self._liberar() # A thread também libera ao sair, caso ainda esteja no _preparar
+        for nome, m in self.metricas().items():
+            self.log(f"Plugin {nome}: {m['chamadas']} chamadas, CPU {m['cpu'] * 1000:.1f} ms, {m['erros']} erro(s).", "INFO")
+        self.log("Barramento de estratégias parado.", "STRATEGY")
+
+    # --- API para os plugins e para o AppController ---
+    def agora(self):
+        return self.bot_core.api.server_now()
+
+    def agendar(self, plugin, momento, funcao):
+        """Chama funcao() na thread de despacho quando o relógio do servidor chegar a `momento`."""
+        with self.lock:
+            heapq.heappush(self.timers, (momento, next(self.seq), plugin, funcao))
+        self.eventos.put(('timer',)) # Recalcula a espera da thread de despacho
+
+    def executar(self, plugin, ativo, direcao, timeframe, context=None):
+        context = dict(context or {})
+        context['estrategia'] = plugin.nome
+        self.last_traded_asset = ativo
+        self.last_trade_direction = direcao
+        self.bot_core.executar_trade(ativo, direcao, timeframe, context)
+
+    def publicar_sinal(self, sinal):
+        self.eventos.put(('signal', sinal))
+
+    def publicar_resultado(self, info):
+        self.eventos.put(('result', info))
+
+    def metricas(self):
+        """nome do plugin -> chamadas, erros, cpu (s), tempo (s, relógio) e maior (s, chamada mais longa)."""
+        with self.lock:
+            return {nome: dict(m) for nome, m in self.contadores.items()}
+
+    # --- Velas (thread do websocket): só classifica e enfileira ---
+    def _on_candle(self, ativo, tamanho, vela):
+        chave = (ativo, tamanho)
+        if chave not in self.interessados:
+            return
+        with self.lock:
+            anterior = self.em_andamento.get(chave)
+            if anterior is not None and vela['from'] < anterior['from']:
+                return # Atualização atrasada de uma vela já fechada
+            if anterior is not None and vela['from'] > anterior['from']:
+                # A última atualização da vela anterior é a vela fechada; o tick pendente dela perde a vez
+                self.ticks_pendentes.pop(chave, None)
+                self.eventos.put(('candle', ativo, tamanho, anterior))
+            self.em_andamento[chave] = vela
+            novo = chave not in self.ticks_pendentes
+            self.ticks_pendentes[chave] = vela
+        if novo:
+            self.eventos.put(('tick', ativo, tamanho, vela['from']))
+
+    def _liberar(self):
+        """Remove o listener e encerra os streams abertos; pode ser chamado mais de uma vez."""
+        api = self.bot_core.api
+        try:
+            api.state.candle_listeners.remove(self._on_candle)
+        except (AttributeError, ValueError):
+            pass
+        with self.lock:
+            streams, self.streams = self.streams, []
+        for ativo, tamanho in streams:
+            try:
+                api.stop_candles_stream(ativo, tamanho)
+            except Exception:
+                pass
+
+    # --- Thread de despacho ---
+    def _preparar(self):
+        api = self.bot_core.api
+        api.state.candle_listeners.append(self._on_candle)
+        for ativo, tamanho in self.interessados:
+            if self.stop_event.is_set():
+                return
+            try:
+                assinado = api.start_candles_stream(ativo, tamanho, self.maxdict)
+            except Exception as e:
+                self.log(f"Barramento: stream de {ativo} ({tamanho}s) indisponível ({e}).", "AVISO")
+                continue
+            if not assinado:
+                # Sem referência no gerenciador de assinaturas: nada a liberar no stop
+                self.log(f"Barramento: stream de {ativo} ({tamanho}s) não confirmado.", "AVISO")
+                continue
+            with self.lock:
+                parado = self.stop_event.is_set()
+                if not parado:
+                    self.streams.append((ativo, tamanho))
+            if parado:
+                # stop() já liberou os streams enquanto este era aberto
+                api.stop_candles_stream(ativo, tamanho)
+                return
+        for plugin in self.plugins:
+            self._chamar(plugin, plugin.on_start)
+
+    def _run_loop(self):
+        try:
+            self._preparar()
+            while not self.stop_event.is_set():
+                espera = self._executar_timers()
+                try:
+                    evento = self.eventos.get(timeout=espera)
+                except queue.Empty:
+                    continue
+                if evento is not None:
+                    self._despachar(evento)
+            for plugin in self.plugins:
+                self._chamar(plugin, plugin.on_stop)
+        finally:
+            self._liberar()
+
+    def _executar_timers(self):
+        """Dispara os timers vencidos e devolve quanto esperar pelo próximo."""
+        while True:
+            with self.lock:
+                if not self.timers:
+                    return ESPERA_MAXIMA
+                espera = self.timers[0][0] - self.agora()
+                if espera > 0:
+                    return min(espera, ESPERA_MAXIMA)
+                _, _, plugin, funcao = heapq.heappop(self.timers)
+            self._chamar(plugin, funcao)
+
+    def _despachar(self, evento):
+        tipo = evento[0]
+        if tipo == 'candle':
+            _, ativo, tamanho, vela = evento
+            for plugin in self.interessados.get((ativo, tamanho), ()):
+                self._chamar(plugin, plugin.on_candle, ativo, tamanho, vela)
+        elif tipo == 'tick':
+            _, ativo, tamanho, inicio = evento
+            with self.lock:
+                vela = self.ticks_pendentes.get((ativo, tamanho))
+                if vela is None or vela['from'] != inicio:
+                    return # Tick de uma vela que já fechou; a nova tem o seu próprio evento
+                del self.ticks_pendentes[(ativo, tamanho)]
+            for plugin in self.interessados.get((ativo, tamanho), ()):
+                self._chamar(plugin, plugin.on_tick, ativo, tamanho, vela)
+        elif tipo == 'signal':
+            for plugin in self.plugins:
+                self._chamar(plugin, plugin.on_signal, evento[1])
+        elif tipo == 'result':
+            info = evento[1]
+            nome = (info.get('context') or {}).get('estrategia')
+            destinos = [p for p in self.plugins if p.nome == nome] or self.plugins
+            for plugin in destinos:
+                self._chamar(plugin, plugin.on_result, info)
+
+    def _chamar(self, plugin, funcao, *args):
+        """Executa um hook do plugin isolando as exceções e somando o tempo de CPU gasto nele."""
+        cpu, inicio = time.thread_time(), time.perf_counter()
+        erro = False
+        try:
+            funcao(*args)
+        except Exception as e:
+            erro = True
+            self.log(f"Plugin {plugin.nome}: erro em {getattr(funcao, '__name__', 'hook')}: {e}", "ERRO")
+        cpu, duracao = time.thread_time() - cpu, time.perf_counter() - inicio
+        with self.lock:
+            m = self.contadores[plugin.nome]
+            m['chamadas'] += 1
+            m['erros'] += erro
+            m['cpu'] += cpu
+            m['tempo'] += duracao
+            m['maior'] = max(m['maior'], duracao)
+
+
+class SinaisParaBarramento:
+    """
+    Executor entregue à estratégia principal quando o barramento roda junto com ela: cada sinal
+    é publicado no barramento (on_signal) e segue para o executor real sem esperar os plugins.
+    """
+    def __init__(self, executor, bus):
+        self.executor = executor
+        self.bus = bus
+
+    def executar_trade(self, ativo, direcao, timeframe, context=None):
+        self.bus.publicar_sinal({'ativo': ativo, 'direcao': direcao, 'timeframe': timeframe, 'context': dict(context or {})})
+        self.executor.executar_trade(ativo, direcao, timeframe, context)
+
+    def __getattr__(self, nome):
+        return getattr(self.executor, nome)
@@ -0,0 +1,160 @@
+# bot/news_service.py
+
+import os
+import json
+import bisect
+import logging
+import threading
+from datetime import datetime, timedelta
+from ui.components.news_scraper import download_calendar_html, parse_news_html
+from utils.path_resolver import resource_path
+
+class NewsService:
+    """
+    Serviço único de notícias: baixa o calendário uma vez por dia, guarda o dia já
+    processado em disco e mantém, por moeda, um índice ordenado de janelas bloqueadas
+    para o filtro de notícias (consulta O(log n) por sinal).
+    """
+    def __init__(self, cache_dir='news_cache', minutos_antes=15, minutos_depois=15, downloader=download_calendar_html):
+        self.cache_dir = resource_path(cache_dir)
+        self.downloader = downloader
+        self.minutos_antes = minutos_antes
+        self.minutos_depois = minutos_depois
+        self.lock = threading.Lock()
+        self.news = []
+        self.news_day = None
+        # moeda -> (inícios ordenados, fins correspondentes, eventos) de janelas já mescladas
+        self.blocked_index = {}
+
+    # --- Carga e cache ---
+    def get_news(self, force_refresh=False):
+        """Retorna as notícias do dia. Só acessa a rede se não houver cache do dia (ou se forçado)."""
+        today = datetime.now().strftime('%Y-%m-%d')
+        with self.lock:
+            if not force_refresh and self.news_day == today:
+                return list(self.news)
+
+            news = None if force_refresh else self._load_cache(today)
+            if news is None:
+                news = self._download()
+                if news:
+                    self._save_cache(today, news)
+            if news is not None:
+                self.news = news
+                self.news_day = today
+                self._build_index()
+            return list(self.news)
+
+    def _cache_file(self, day):
+        return os.path.join(self.cache_dir, f"news_{day}.json")
+
+    def _load_cache(self, day):
+        path = self._cache_file(day)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                news = json.load(f)
+            logging.info(f"Notícias do dia {day} carregadas do cache em disco.")
+            return news
+        except (OSError, ValueError) as e:
+            logging.warning(f"Cache de notícias inválido ({path}): {e}")
+            return None
+
+    def _save_cache(self, day, news):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._cache_file(day), 'w', encoding='utf-8') as f:
+                json.dump(news, f, ensure_ascii=False)
+        except OSError as e:
+            logging.warning(f"Não foi possível salvar o cache de notícias: {e}")
+
+    def _download(self):
+        try:
+            return parse_news_html(self.downloader())
+        except Exception as e:
+            logging.error(f"Ocorreu um erro ao buscar notícias estruturadas: {e}")
+            return None
+
+    # --- Índice de janelas bloqueadas ---
+    def set_windows(self, minutos_antes, minutos_depois):
+        with self.lock:
+            if (minutos_antes, minutos_depois) == (self.minutos_antes, self.minutos_depois):
+                return
+            self.minutos_antes = minutos_antes
+            self.minutos_depois = minutos_depois
+            self._build_index()
+
+    def load_news(self, news):
+        """Substitui as notícias em memória (ex.: dados já obtidos em outro lugar) e reconstrói o índice."""
+        with self.lock:
+            self.news = list(news)
+            self.news_day = datetime.now().strftime('%Y-%m-%d')
+            self._build_index()
+
+    def _build_index(self):
+        antes = timedelta(minutes=self.minutos_antes)
+        depois = timedelta(minutes=self.minutos_depois)
+        windows = {}
+        for item in self.news:
+            event_dt = self._event_datetime(item)
+            currency = (item.get('currency') or '').upper()
+            if event_dt is None or not currency:
+                continue
+            windows.setdefault(currency, []).append((event_dt - antes, event_dt + depois, item))
+
+        index = {}
+        for currency, intervals in windows.items():
+            intervals.sort(key=lambda w: w[0])
+            starts, ends, events = [], [], []
+            for start, end, item in intervals:
+                # Mescla janelas sobrepostas para que a busca binária baste
+                if ends and start <= ends[-1]:
+                    if end > ends[-1]:
+                        ends[-1] = end
+                        events[-1] = item
+                    continue
+                starts.append(start)
+                ends.append(end)
+                events.append(item)
+            index[currency] = (starts, ends, events)
+        self.blocked_index = index
+
+    @staticmethod
+    def _event_datetime(item):
+        if item.get('datetime'):
+            try:
+                return datetime.fromisoformat(item['datetime'])
+            except ValueError:
+                return None
+        # Compatibilidade com itens que só trazem "HH:MM" (considera o dia de hoje)
+        try:
+            hour, minute = map(int, item['time'].split(':'))
+            return datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
+        except (KeyError, ValueError, AttributeError):
+            return None
+
+    @staticmethod
+    def asset_currencies(asset):
+        """'EURUSD-OTC' / 'EUR/USD' / 'EURUSD-op' -> ('EUR', 'USD')."""
+        symbol = asset.upper().split('-')[0].replace('/', '')
+        if len(symbol) < 6:
+            return (symbol,) if symbol else ()
+        return (symbol[:3], symbol[3:6])
+
+    def blocking_event(self, asset, at=None):
+        """Retorna a notícia que bloqueia o ativo no instante informado, ou None."""
+        at = at or datetime.now()
+        index = self.blocked_index
+        for currency in self.asset_currencies(asset):
+            entry = index.get(currency)
+            if not entry:
+                continue
+            starts, ends, events = entry
+            pos = bisect.bisect_right(starts, at) - 1
+            if pos >= 0 and at <= ends[pos]:
+                return events[pos]
+        return None
+
+    def is_blocked(self, asset, at=None):
+        return self.blocking_event(asset, at) is not None
@@ -0,0 +1,103 @@
+# bot/signal_ingress.py
+
+import time
+import threading
+from collections import deque, Counter
+
+POLITICAS = ('drop', 'merge', 'last_wins')
+
+class SignalIngress:
+    """
+    Etapa de entrada do executor: descarta/mescla sinais repetidos antes de ocuparem a fila.
+    Chave de duplicidade: (ativo, direção, timeframe, minuto de expiração), válida por `janela` segundos.
+
+    Políticas para um sinal repetido ainda na fila:
+      drop      - descarta o novo sinal;
+      merge     - mantém o primeiro e anota o novo em context['merged_signals'];
+      last_wins - o contexto do novo sinal substitui o do pendente (mesma posição na fila).
+    Depois que o executor retirou o sinal da fila, qualquer repetição é descartada.
+    """
+    def __init__(self, janela=60, politica='drop'):
+        self.lock = threading.Lock()
+        self.index = {} # chave -> entrada {'context', 'expires', 'dispatched'}
+        self.expiry_order = deque() # (expira_em, chave, entrada) em ordem de chegada
+        self.keys_by_context = {} # id(context) -> chave, para marcar o despacho em O(1)
+        self.drops = Counter() # fonte -> sinais descartados/mesclados
+        self.configure(janela, politica)
+
+    def configure(self, janela, politica):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de duplicidade inválida: {politica}")
+        self.janela = max(float(janela), 0.0)
+        self.politica = politica
+
+    @staticmethod
+    def dedup_key(ativo, direcao, timeframe, signal_ts):
+        timeframe = max(int(timeframe), 1)
+        minuto = int(signal_ts // 60)
+        expiracao = (minuto // timeframe + 1) * timeframe
+        return (ativo.upper(), direcao.lower(), timeframe, expiracao)
+
+    def admit(self, ativo, direcao, timeframe, context, now=None):
+        """
+        Decide o destino de um sinal: (destino, superado).
+        destino: 'enqueue' (novo), 'merged', 'replaced' ou 'dropped'; só 'enqueue' vai para a fila.
+        superado: contexto do sinal que não será executado por conta própria (o novo, ou uma cópia
+        do pendente substituído em 'replaced'), para receber o ack de duplicata; None em 'enqueue'.
+        """
+        if self.janela <= 0:
+            return 'enqueue', None
+        now = now or time.time()
+        key = self.dedup_key(ativo, direcao, timeframe, context.get('signal_ts') or now)
+        with self.lock:
+            self._expire(now)
+            entry = self.index.get(key)
+            if entry is None:
+                entry = {'context': context, 'expires': now + self.janela, 'dispatched': False}
+                self.index[key] = entry
+                self.expiry_order.append((entry['expires'], key, entry))
+                self.keys_by_context[id(context)] = key
+                return 'enqueue', None
+
+            self.drops[context.get('source') or 'desconhecida'] += 1
+            if entry['dispatched'] or self.politica == 'drop':
+                return 'dropped', context
+            pending = entry['context']
+            if self.politica == 'merge':
+                pending.setdefault('merged_signals', []).append(
+                    {'signal_id': context.get('signal_id'), 'source': context.get('source')})
+                return 'merged', context
+            # last_wins: atualiza o pedido pendente no lugar, sem mexer na fila
+            superseded = dict(pending)
+            merged = pending.get('merged_signals')
+            pending.clear()
+            pending.update(context)
+            if merged:
+                pending['merged_signals'] = merged
+            return 'replaced', superseded
+
+    def mark_dispatched(self, context):
+        """Chamado pelo executor ao retirar o pedido da fila."""
+        with self.lock:
+            key = self.keys_by_context.get(id(context))
+            entry = self.index.get(key) if key else None
+            if entry and entry['context'] is context:
+                entry['dispatched'] = True
+
+    def _expire(self, now):
+        while self.expiry_order and self.expiry_order[0][0] <= now:
+            _, key, entry = self.expiry_order.popleft()
+            if self.index.get(key) is entry:
+                del self.index[key]
+                self.keys_by_context.pop(id(entry['context']), None)
+
+    def drops_by_source(self):
+        with self.lock:
+            return dict(self.drops)
+
+    def reset(self):
+        with self.lock:
+            self.index.clear()
+            self.expiry_order.clear()
+            self.keys_by_context.clear()
+            self.drops.clear()
@@ -0,0 +1,202 @@
+# bot/strategies/mhi_scanner.py
+import threading
+from collections import defaultdict
+
+from .mhi_strategy import CICLO_M5, ANTECEDENCIA_ENTRADA
+
+VELA_M1 = 60
+VELAS_CATALOGO = 600 # Velas M1 de histórico por ativo para a catalogação inicial (120 quadrantes)
+VELAS_GUARDADAS = 8 # Velas M1 mantidas em memória por ativo
+
+def cor(vela):
+    """1 verde, -1 vermelha, 0 doji."""
+    return (vela['close'] > vela['open']) - (vela['close'] < vela['open'])
+
+def direcao_mhi(cores):
+    """Minoria das 3 últimas velas do quadrante: maioria verde -> put, maioria vermelha -> call; None com doji ou vela faltando."""
+    if len(cores) != 3 or None in cores or 0 in cores:
+        return None
+    return 'put' if sum(cores) > 0 else 'call'
+
+class MHIScanner:
+    """
+    MHI em vários ativos ao mesmo tempo, a partir das velas M1 recebidas pelo stream (sem get_candles
+    na hora da entrada). A cada fechamento de M5 avalia todos os ativos com as velas em memória,
+    ordena os sinais pela assertividade catalogada (ou pelo payout) e envia os melhores antes do segundo 0.
+    """
+    def __init__(self, bot_core, ativos, max_entradas=1, criterio='assertividade', min_assertividade=0):
+        self.bot_core = bot_core
+        self.ativos = list(dict.fromkeys(ativos))
+        self.ativos_set = set(self.ativos)
+        self.max_entradas = max_entradas
+        self.criterio = criterio
+        self.min_assertividade = min_assertividade
+        self.stop_event = threading.Event()
+        self.strategy_thread = None
+        self.log = self.bot_core.log_callback
+        self.lock = threading.Lock()
+        self.velas = defaultdict(dict) # ativo -> {from: cor} das últimas velas M1
+        self.catalogo = defaultdict(lambda: [0, 0]) # ativo -> [acertos, sinais decididos]
+        self.catalogado_ate = {} # ativo -> última vela de entrada já contada no catálogo
+        self.ultimo_from = {} # ativo -> from da vela M1 em andamento
+        self.streams = [] # Ativos com stream de velas iniciado por esta estratégia
+        self.last_traded_asset = None
+        self.last_trade_direction = None
+
+    def is_alive(self):
+        return self.strategy_thread is not None and self.strategy_thread.is_alive()
+
+    def start(self):
+        if not self.is_alive():
+            self.stop_event.clear()
+            self.strategy_thread = threading.Thread(target=self._run_strategy_loop)
+            self.strategy_thread.daemon = True
+            self.strategy_thread.start()
+            self.log(f"Scanner MHI iniciado para {len(self.ativos)} ativo(s).", "STRATEGY")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.strategy_thread: self.strategy_thread.join(timeout=2)
+        self._liberar() # A thread também libera ao sair, caso ainda esteja no _preparar
+        self.log("Scanner MHI parado.", "STRATEGY")
+
+    def _liberar(self):
+        """Remove o listener e encerra os streams abertos; pode ser chamado mais de uma vez."""
+        api = self.bot_core.api
+        try:
+            api.state.candle_listeners.remove(self._on_candle)
+        except (AttributeError, ValueError):
+            pass
+        with self.lock:
+            streams, self.streams = self.streams, []
+        for ativo in streams:
+            try:
+                api.stop_candles_stream(ativo, VELA_M1)
+            except Exception:
+                pass
+
+    # --- Preparação: catálogo histórico e streams ---
+    def _preparar(self):
+        api = self.bot_core.api
+        api.state.candle_listeners.append(self._on_candle)
+        for ativo in self.ativos:
+            if self.stop_event.is_set():
+                return
+            try:
+                historico = api.get_candles(ativo, VELA_M1, VELAS_CATALOGO, api.server_now()) or []
+                self._catalogar(ativo, historico)
+                if not api.start_candles_stream(ativo, VELA_M1, VELAS_GUARDADAS):
+                    # Sem referência no gerenciador de assinaturas: nada a liberar no stop
+                    self.log(f"Scanner MHI: {ativo} ignorado (stream não confirmado).", "AVISO")
+                    continue
+                with self.lock:
+                    parado = self.stop_event.is_set()
+                    if not parado:
+                        self.streams.append(ativo)
+                if parado:
+                    # stop() já liberou os streams enquanto este era aberto
+                    api.stop_candles_stream(ativo, VELA_M1)
+                    return
+            except Exception as e:
+                self.log(f"Scanner MHI: {ativo} ignorado ({e}).", "AVISO")
+        resumo = ", ".join(f"{a} {self.assertividade(a):.0f}%" for a in self.streams)
+        self.log(f"Catalogação MHI: {resumo}", "INFO")
+
+    def _catalogar(self, ativo, velas):
+        """Catálogo a partir do histórico; as últimas velas (a última ainda em andamento) ficam em memória."""
+        cores = {int(v['from']): cor(v) for v in velas}
+        if not cores:
+            return
+        atual = max(cores)
+        with self.lock:
+            for inicio in sorted(f for f in cores if f % CICLO_M5 == 0 and f < atual):
+                self._registrar_quadrante(ativo, cores, inicio)
+            self.velas[ativo].update({f: c for f, c in cores.items() if f > atual - VELAS_GUARDADAS * VELA_M1})
+            self.ultimo_from[ativo] = max(atual, self.ultimo_from.get(ativo, atual))
+
+    def _registrar_quadrante(self, ativo, cores, inicio):
+        """Conta no catálogo o sinal das velas antes de `inicio` contra a cor da vela `inicio` (a entrada)."""
+        if inicio <= self.catalogado_ate.get(ativo, 0):
+            return
+        self.catalogado_ate[ativo] = inicio
+        direcao = direcao_mhi([cores.get(inicio - k * VELA_M1) for k in (3, 2, 1)])
+        resultado = cores.get(inicio)
+        if direcao is None or not resultado:
+            return # Sem sinal ou vela de entrada doji/ausente
+        acertou = (resultado > 0) == (direcao == 'call')
+        self.catalogo[ativo][0] += acertou
+        self.catalogo[ativo][1] += 1
+
+    def assertividade(self, ativo):
+        acertos, total = self.catalogo.get(ativo, (0, 0))
+        return acertos * 100.0 / total if total else 0.0
+
+    # --- Velas do stream (thread do websocket) ---
+    def _on_candle(self, ativo, size, vela):
+        if size != VELA_M1 or ativo not in self.ativos_set:
+            return
+        inicio = int(vela['from'])
+        with self.lock:
+            velas = self.velas[ativo]
+            velas[inicio] = cor(vela)
+            anterior = self.ultimo_from.get(ativo)
+            if anterior is not None and inicio > anterior:
+                # A vela anterior fechou; se era uma vela de entrada, o resultado vai para o catálogo
+                if anterior % CICLO_M5 == 0:
+                    self._registrar_quadrante(ativo, velas, anterior)
+                for antigo in [f for f in velas if f <= inicio - VELAS_GUARDADAS * VELA_M1]:
+                    del velas[antigo]
+            if anterior is None or inicio > anterior:
+                self.ultimo_from[ativo] = inicio
+
+    # --- Loop de entradas ---
+    def _proxima_entrada(self, agora, ultima_entrada):
+        entrada = (agora // CICLO_M5 + 1) * CICLO_M5 - ANTECEDENCIA_ENTRADA
+        if ultima_entrada is not None and entrada <= ultima_entrada:
+            entrada += CICLO_M5
+        return entrada
+
+    def _run_strategy_loop(self):
+        try:
+            self._preparar()
+            ultima_entrada = None
+            while not self.stop_event.is_set():
+                entrada = self._proxima_entrada(self.bot_core.api.server_now(), ultima_entrada)
+                if not self.bot_core.api.sleep_until(entrada, self.stop_event):
+                    break
+                ultima_entrada = entrada
+                self._avaliar_e_operar(entrada + ANTECEDENCIA_ENTRADA)
+        except Exception as e:
+            self.log(f"Scanner MHI interrompido: {e}", "ERRO")
+        finally:
+            self._liberar() # Em qualquer saída (stop ou erro), nada fica registrado na API
+
+    def _candidatos(self, fechamento):
+        """[(ativo, direcao, assertividade, payout)] dos ativos com sinal no quadrante que fecha em `fechamento`."""
+        payouts = getattr(self.bot_core, 'asset_payouts', None) or {}
+        candidatos = []
+        with self.lock:
+            for ativo in self.streams:
+                velas = self.velas.get(ativo, {})
+                direcao = direcao_mhi([velas.get(fechamento - k * VELA_M1) for k in (3, 2, 1)])
+                if direcao:
+                    candidatos.append((ativo, direcao, self.assertividade(ativo), payouts.get(ativo, 0)))
+        if self.criterio == 'payout':
+            candidatos.sort(key=lambda c: (c[3], c[2]), reverse=True)
+        else:
+            candidatos.sort(key=lambda c: (c[2], c[3]), reverse=True)
+        return [c for c in candidatos if c[2] >= self.min_assertividade]
+
+    def _avaliar_e_operar(self, fechamento):
+        try:
+            candidatos = self._candidatos(fechamento)
+            if not candidatos:
+                self.log("Scanner MHI: nenhum ativo com sinal neste quadrante.", "INFO")
+                return
+            for ativo, direcao, taxa, payout in candidatos[:self.max_entradas]:
+                self.log(f"Sinal MHI: {ativo} {direcao.upper()} (assertividade {taxa:.0f}%, payout {payout}%).", "STRATEGY")
+                self.last_traded_asset = ativo
+                self.last_trade_direction = direcao
+                self.bot_core.executar_trade(ativo, direcao, 1, {'mhi_assertividade': taxa})
+        except Exception as e:
+            self.log(f"Erro no scanner MHI: {e}", "ERRO")
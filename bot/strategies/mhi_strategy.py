@@ -1,7 +1,8 @@
 # bot/strategies/mhi_strategy.py
 import threading
-import time
-from datetime import datetime
+
+CICLO_M5 = 300
+ANTECEDENCIA_ENTRADA = 2 # Segundos antes do fechamento da vela M5 (entrada às x4:58 / x9:58)
 
 class MHIStrategy:
     def __init__(self, bot_core, ativo):
@@ -26,20 +27,27 @@ class MHIStrategy:
         if self.strategy_thread: self.strategy_thread.join(timeout=2)
         self.log("Estratégia MHI parada.", "STRATEGY")
 
+    def _proxima_entrada(self, agora, ultima_entrada):
+        """Instante (relógio do servidor) da próxima entrada: 2s antes do fechamento de cada vela M5."""
+        entrada = (agora // CICLO_M5 + 1) * CICLO_M5 - ANTECEDENCIA_ENTRADA
+        if ultima_entrada is not None and entrada <= ultima_entrada:
+            entrada += CICLO_M5
+        return entrada
+
     def _run_strategy_loop(self):
         self.log("Aguardando horário de entrada para MHI (final de velas M5)...", "INFO")
+        ultima_entrada = None
         while not self.stop_event.is_set():
-            minutos = float(datetime.fromtimestamp(self.bot_core.api.get_server_timestamp()).strftime('%M.%S'))
-            entrar = (4.58 <= (minutos % 5) <= 5.0)
-            if entrar:
-                self.log("Horário de entrada MHI detectado, analisando...", "INFO")
-                self._analisar_e_operar()
-                time.sleep(60) 
-            time.sleep(0.5)
+            entrada = self._proxima_entrada(self.bot_core.api.server_now(), ultima_entrada)
+            if not self.bot_core.api.sleep_until(entrada, self.stop_event):
+                break
+            ultima_entrada = entrada
+            self.log("Horário de entrada MHI detectado, analisando...", "INFO")
+            self._analisar_e_operar()
 
     def _analisar_e_operar(self):
         try:
-            velas_raw = self.bot_core.api.get_candles(self.ativo, 60, 3, time.time())
+            velas_raw = self.bot_core.api.get_candles(self.ativo, 60, 3, self.bot_core.api.server_now())
             if velas_raw is None or len(velas_raw) < 3:
                 self.log(f"Não foi possível obter 3 velas para {self.ativo}.", "AVISO")
                 return
@@ -0,0 +1,128 @@
+# bot/strategies/mt4_feedback.py
+import zmq
+import queue
+import threading
+import logging
+from .mt4_protocol import build_message
+
+FEEDBACK_QUEUE_SIZE = 1000
+SNAPSHOT_TOPICS = ("assets", "payouts") # Reenviados a cada nova assinatura de um EA
+
+class MT4FeedbackPublisher:
+    """
+    Canal de retorno Python -> MT4: publica ativos abertos, payouts e acks/resultados das ordens
+    (com o id do sinal de origem) num socket XPUB. Qualquer thread pode publicar; só a thread
+    interna toca no socket. Um EA que assina depois recebe o último snapshot de ativos/payouts.
+    """
+    def __init__(self, context, endpoint):
+        self.context = context
+        self.endpoint = endpoint
+        self.outbox = queue.Queue(maxsize=FEEDBACK_QUEUE_SIZE)
+        self.snapshots = {}
+        self.dropped = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self._ready.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._ready.wait(timeout=2)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread: self.thread.join(timeout=2)
+        self.thread = None
+
+    # --- API pública (thread-safe) ---
+    def publish_assets(self, open_assets_cache, payouts=None):
+        """Envia a lista de ativos abertos ({tipo: {ativo: {'open': bool}}}) com o payout de cada um, se conhecido."""
+        payouts = payouts or {}
+        types_by_asset = {}
+        for option_type, assets in (open_assets_cache or {}).items():
+            for asset, details in assets.items():
+                if details.get('open', False):
+                    types_by_asset.setdefault(asset, []).append(option_type)
+        assets = [{"asset": asset, "types": sorted(types), "payout": payouts.get(asset)}
+                  for asset, types in sorted(types_by_asset.items())]
+        self._publish("assets", assets=assets)
+
+    def publish_asset_list(self, pairs):
+        """Lista simples de pares (ex.: filtro escolhido na tela de exportação)."""
+        self._publish("assets", assets=[{"asset": pair, "types": [], "payout": None} for pair in pairs])
+
+    def publish_payouts(self, payouts):
+        """payouts: {ativo: payout em %}."""
+        if payouts:
+            self._publish("payouts", payouts=payouts)
+
+    def publish_ack(self, context, asset, direction, accepted, order_id=None, reason=None):
+        context = context or {}
+        self._publish("ack", signal_id=context.get("signal_id"), source=context.get("source"),
+                      signal_ts=context.get("signal_ts"), asset=asset, direction=direction,
+                      accepted=accepted, order_id=order_id, reason=reason)
+
+    def publish_result(self, context, asset, direction, order_id, profit, result):
+        context = context or {}
+        self._publish("result", signal_id=context.get("signal_id"), source=context.get("source"),
+                      signal_ts=context.get("signal_ts"), asset=asset, direction=direction,
+                      order_id=order_id, profit=profit, result=result)
+
+    def _publish(self, topic, **fields):
+        try:
+            payload = build_message(topic, **fields)
+        except (TypeError, ValueError) as e:
+            logging.error(f"Mensagem de retorno ao MT4 inválida ({topic}): {e}")
+            return
+        if topic in SNAPSHOT_TOPICS:
+            self.snapshots[topic] = payload
+        try:
+            self.outbox.put_nowait((topic, payload))
+        except queue.Full:
+            self.dropped += 1 # Nenhum EA consumindo; nunca bloqueia o ciclo de trade
+
+    # --- Thread do socket ---
+    def _run(self):
+        socket = self.context.socket(zmq.XPUB)
+        socket.setsockopt(zmq.LINGER, 0)
+        try:
+            socket.bind(self.endpoint)
+        except zmq.ZMQError as e:
+            logging.error(f"Canal de retorno MT4 indisponível em {self.endpoint}: {e}")
+            socket.close()
+            self._ready.set()
+            return
+        self._ready.set()
+
+        while not self.stop_event.is_set():
+            self._handle_subscriptions(socket)
+            try:
+                topic, payload = self.outbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._send(socket, topic, payload)
+        socket.close()
+
+    def _handle_subscriptions(self, socket):
+        """Nova assinatura (byte 1 + tópico): reenvia o último snapshot para o EA que acabou de entrar."""
+        while True:
+            try:
+                event = socket.recv(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+            if not event or event[0] != 1:
+                continue
+            prefix = event[1:].decode('utf-8', errors='replace')
+            for topic in SNAPSHOT_TOPICS:
+                if topic.startswith(prefix) and topic in self.snapshots:
+                    self._send(socket, topic, self.snapshots[topic])
+
+    def _send(self, socket, topic, payload):
+        try:
+            socket.send_multipart([topic.encode('utf-8'), payload.encode('utf-8')], zmq.NOBLOCK)
+        except zmq.ZMQError as e:
+            logging.debug(f"Falha ao publicar '{topic}' para o MT4: {e}")
@@ -0,0 +1,161 @@
+# bot/strategies/mt4_protocol.py
+"""
+Protocolo de sinais MT4 -> Python (versão 1), em JSON.
+
+Mensagem única:
+    {"v": 1, "type": "signal", "ts": 1736950200123, "id": "ea1-42", "asset": "EURUSD",
+     "direction": "call", "timeframe": 5, "stake": 2.0}
+    "stake" é opcional: quando presente, é o valor da entrada (no lugar do gerenciador, sem martingale).
+Lote (vários sinais num único frame):
+    {"v": 1, "type": "batch", "ts": 1736950200123, "signals": [{...}, {...}]}
+    Itens inválidos do lote são ignorados (e listados em "errors"); os demais seguem.
+Controle:
+    {"v": 1, "type": "heartbeat", "ts": ...} | {"v": 1, "type": "status", "text": "..."}
+
+O campo opcional "source" identifica o terminal/EA; sem ele, vale o tópico ZMQ do frame
+(multipart [tópico, payload] ou "tópico {json}").
+
+"ts" é o horário de envio do EA em milissegundos (epoch UTC). Mensagens que não são JSON
+são interpretadas pelo formato de texto legado ("EURUSD SUPER COMPRA M5").
+
+Canal de retorno Python -> MT4 (multipart [tópico, json], mesmo "v"/"ts"):
+    assets:  {"type": "assets", "assets": [{"asset": "EURUSD", "types": ["binary", "turbo"], "payout": 87.0}]}
+    payouts: {"type": "payouts", "payouts": {"EURUSD": 87.0}}
+    ack:     {"type": "ack", "signal_id": "ea1-42", "accepted": true, "order_id": 123, "reason": null, ...}
+    result:  {"type": "result", "signal_id": "ea1-42", "order_id": 123, "profit": 1.74, "result": "WIN", ...}
+"""
+import json
+import time
+
+PROTOCOL_VERSION = 1
+DEFAULT_ENDPOINT = "tcp://127.0.0.1:5557"
+FEEDBACK_ENDPOINT = "tcp://127.0.0.1:5558"
+
+_DIRECTIONS = {
+    "call": "call", "buy": "call", "compra": "call", "up": "call",
+    "put": "put", "sell": "put", "venda": "put", "down": "put",
+}
+
+class ProtocolError(ValueError):
+    pass
+
+def parse_message(raw):
+    """
+    Converte um frame recebido em {"type", "sent_ts", "signals", "text", "source", "errors"}.
+    sent_ts é o horário de envio em segundos (ou None, no formato legado).
+    """
+    if isinstance(raw, bytes):
+        raw = raw.decode('utf-8', errors='replace')
+    raw = raw.strip()
+    if raw.startswith('{'):
+        return _parse_json(raw)
+    return _parse_legacy(raw)
+
+def build_message(msg_type, **fields):
+    """Serializa uma mensagem do canal de retorno (Python -> MT4)."""
+    message = {"v": PROTOCOL_VERSION, "type": msg_type, "ts": int(time.time() * 1000)}
+    message.update(fields)
+    return json.dumps(message, ensure_ascii=False)
+
+def _parse_json(raw):
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        raise ProtocolError(f"JSON inválido: {e}")
+    if not isinstance(data, dict):
+        raise ProtocolError("Mensagem deve ser um objeto JSON.")
+
+    version = data.get("v", PROTOCOL_VERSION)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Versão de protocolo não suportada: {version}")
+
+    msg_type = data.get("type", "signal")
+    sent_ts = _to_seconds(data.get("ts"))
+    message = {"type": msg_type, "sent_ts": sent_ts, "signals": [], "text": data.get("text", ""),
+               "source": data.get("source"), "errors": []}
+
+    if msg_type == "signal":
+        message["signals"].append(_parse_signal(data, sent_ts))
+    elif msg_type == "batch":
+        items = data.get("signals", [])
+        if not isinstance(items, list):
+            raise ProtocolError("Campo 'signals' do lote deve ser uma lista.")
+        for item in items:
+            try:
+                if not isinstance(item, dict):
+                    raise ProtocolError(f"Item de lote inválido: {item!r}")
+                message["signals"].append(_parse_signal(item, _to_seconds(item.get("ts")) or sent_ts))
+            except ProtocolError as e:
+                message["errors"].append(str(e))
+    elif msg_type not in ("heartbeat", "status"):
+        raise ProtocolError(f"Tipo de mensagem desconhecido: {msg_type}")
+    return message
+
+def _parse_signal(data, sent_ts):
+    asset = str(data.get("asset", "")).strip().upper()
+    direction = _DIRECTIONS.get(str(data.get("direction", "")).strip().lower())
+    if not asset or not direction:
+        raise ProtocolError(f"Sinal incompleto: {data}")
+    try:
+        timeframe = int(data.get("timeframe", 1))
+    except (TypeError, ValueError):
+        raise ProtocolError(f"Timeframe inválido: {data.get('timeframe')}")
+    stake = data.get("stake")
+    if stake is not None:
+        try:
+            stake = float(stake)
+        except (TypeError, ValueError):
+            raise ProtocolError(f"Stake inválido: {stake!r}")
+    return {
+        "id": data.get("id"),
+        "asset": asset,
+        "direction": direction,
+        "timeframe": timeframe,
+        "stake": stake,
+        "sent_ts": sent_ts,
+    }
+
+def _to_seconds(ts):
+    if ts is None:
+        return None
+    try:
+        ts = float(ts)
+    except (TypeError, ValueError):
+        return None
+    # Aceita milissegundos (padrão do protocolo) ou segundos
+    return ts / 1000.0 if ts > 1e11 else ts
+
+def _parse_legacy(raw):
+    """Formato de texto antigo do EA."""
+    if raw == "MT4_HEARTBEAT":
+        return {"type": "heartbeat", "sent_ts": None, "signals": [], "text": raw, "errors": []}
+    if "TESTE DE CONEXAO MANUAL" in raw or "Conexão com o Expert Advisor" in raw or "EA Desconectado" in raw:
+        return {"type": "status", "sent_ts": None, "signals": [], "text": raw, "errors": []}
+
+    message = {"type": "legacy", "sent_ts": None, "signals": [], "text": raw, "errors": []}
+    signal = parse_legacy_signal(raw)
+    if signal:
+        message["signals"].append(signal)
+    return message
+
+def parse_legacy_signal(signal_string):
+    """Aplica os filtros do formato legado; retorna o sinal ou None."""
+    sinal_upper = signal_string.upper()
+    if "POSSÍVEL" in sinal_upper or "SUPER" not in sinal_upper:
+        return None
+
+    palavras = sinal_upper.split()
+    if len(palavras) < 3:
+        return None
+
+    ativo = palavras[0]
+    timeframe = 1
+    for p in palavras:
+        if p.startswith('M') and p[1:].isdigit():
+            timeframe = int(p[1:])
+            break
+
+    direcao = "put" if "VENDA" in palavras else "call" if "COMPRA" in palavras else None
+    if not (ativo and direcao):
+        return None
+    return {"id": None, "asset": ativo, "direction": direcao, "timeframe": timeframe, "stake": None, "sent_ts": None}
@@ -2,23 +2,100 @@
 import zmq
 import threading
 import time
+import logging
+from .mt4_protocol import parse_message, ProtocolError, DEFAULT_ENDPOINT
+
+HEARTBEAT_TIMEOUT = 15 # Segundos sem mensagens do EA até considerá-lo desconectado
+MAX_POLL_MS = 5000 # Limite de segurança do poll quando não há prazo de heartbeat pendente
+DEFAULT_SOURCE = "default"
+
+def _split_setting(value):
+    """'a, b' ou ['a', 'b'] -> ['a', 'b']."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [item.strip() for item in value if item and item.strip()]
+
+class MT4SignalProxy:
+    """
+    Proxy XSUB/XPUB: os EAs conectam seus sockets PUB em frontend e o listener assina o backend.
+    Permite que um único processo Python atenda vários terminais sem conhecer cada endpoint.
+    """
+    def __init__(self, context, frontend, backend):
+        self.context = context
+        self.frontend = frontend
+        self.backend = backend
+        self.control_endpoint = f"inproc://mt4-proxy-control-{id(self)}"
+        self.thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        self._ready.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._ready.wait(timeout=2)
+
+    def stop(self):
+        try:
+            control = self.context.socket(zmq.PAIR)
+            control.setsockopt(zmq.LINGER, 0)
+            control.connect(self.control_endpoint)
+            control.send(b"TERMINATE", zmq.NOBLOCK)
+            control.close()
+        except zmq.ZMQError:
+            pass
+        if self.thread: self.thread.join(timeout=2)
+
+    def _run(self):
+        xsub = self.context.socket(zmq.XSUB)
+        xpub = self.context.socket(zmq.XPUB)
+        control = self.context.socket(zmq.PAIR)
+        try:
+            xsub.bind(self.frontend)
+            xpub.bind(self.backend)
+            control.bind(self.control_endpoint)
+            self._ready.set()
+            zmq.proxy_steerable(xsub, xpub, None, control)
+        except zmq.ZMQError as e:
+            logging.error(f"Proxy MT4 encerrado: {e}")
+        finally:
+            self._ready.set()
+            for sock in (xsub, xpub, control):
+                sock.close(linger=0)
 
 class MT4Strategy:
-    def __init__(self, bot_core, context, status_callback):
+    def __init__(self, bot_core, context, status_callback, endpoint=None, topics=None, proxy_bind=None):
         self.bot_core = bot_core
         self.context = context
         self.status_callback = status_callback
+        config = bot_core.config
+        # Um ou mais endpoints (vários terminais/EAs) e tópicos; vazio = todos os tópicos
+        self.endpoints = _split_setting(endpoint or config.get('mt4_endpoint')) or [DEFAULT_ENDPOINT]
+        self.topics = _split_setting(topics if topics is not None else config.get('mt4_topics')) or [""]
+        self.proxy_bind = proxy_bind or config.get('mt4_proxy_bind') or None
+        self.proxy = None
+        self.control_endpoint = f"inproc://mt4-strategy-control-{id(self)}"
         self.stop_event = threading.Event()
         self.strategy_thread = None
 
+        # Último sinal/heartbeat recebido de cada fonte (EA/terminal)
+        self.source_last_seen = {}
+        self.sources_online = set()
+
         # (NOVO) Atributos para guardar a informação do último trade
         self.last_traded_asset = None
         self.last_trade_direction = None
         self.last_trade_value = 0
+        self.last_signal_latency = None # Latência de transporte (EA -> Python) do último sinal, em segundos
 
     def start(self):
-        # ... (código sem alterações)
         self.stop_event.clear()
+        if self.proxy_bind and not self.proxy:
+            backend = f"inproc://mt4-proxy-backend-{id(self)}"
+            self.proxy = MT4SignalProxy(self.context, self.proxy_bind, backend)
+            self.proxy.start()
+            self.endpoints.append(backend)
         self.strategy_thread = threading.Thread(target=self._listen_for_signals)
         self.strategy_thread.daemon = True
         self.strategy_thread.start()
@@ -26,66 +103,163 @@ class MT4Strategy:
 
     def stop(self):
         self.stop_event.set()
+        self._wake_listener()
         if self.strategy_thread: self.strategy_thread.join(timeout=2)
+        if self.proxy:
+            self.proxy.stop()
+            self.endpoints.remove(self.proxy.backend)
+            self.proxy = None
         self.bot_core.log_callback("Estratégia MT4 parada.", "STRATEGY")
 
+    def _wake_listener(self):
+        """Acorda o listener bloqueado no poll através do socket de controle inproc."""
+        try:
+            waker = self.context.socket(zmq.PAIR)
+            waker.setsockopt(zmq.LINGER, 0)
+            waker.connect(self.control_endpoint)
+            waker.send(b"stop", zmq.NOBLOCK)
+            waker.close()
+        except zmq.ZMQError:
+            pass # O listener ainda não subiu ou já terminou; o stop_event basta
+
+    def _poll_timeout_ms(self, last_message_time, ea_online):
+        # Acorda no próximo prazo de heartbeat (geral ou de alguma fonte online)
+        deadlines = [self.source_last_seen[s] for s in self.sources_online]
+        if ea_online:
+            deadlines.append(last_message_time)
+        if not deadlines:
+            return MAX_POLL_MS
+        remaining = HEARTBEAT_TIMEOUT - (time.time() - min(deadlines))
+        return max(int(remaining * 1000), 0) + 1
+
+    def get_source_status(self):
+        """{fonte: segundos desde a última mensagem} para cada EA/terminal já visto."""
+        now = time.time()
+        return {source: now - last_seen for source, last_seen in self.source_last_seen.items()}
+
+    def _mark_source_seen(self, source, now):
+        self.source_last_seen[source] = now
+        if source not in self.sources_online:
+            self.sources_online.add(source)
+            self.bot_core.log_callback(f"EA '{source}' online ({len(self.sources_online)} fonte(s) ativa(s)).", "STATUS")
+
+    def _expire_sources(self, now):
+        for source in list(self.sources_online):
+            if now - self.source_last_seen[source] > HEARTBEAT_TIMEOUT:
+                self.sources_online.discard(source)
+                self.bot_core.log_callback(f"EA '{source}' sem sinal há mais de {HEARTBEAT_TIMEOUT}s.", "AVISO")
+
+    @staticmethod
+    def _split_frame(frames):
+        """[tópico, payload] (multipart) ou 'tópico {json}' -> (tópico ou None, payload)."""
+        if len(frames) >= 2:
+            return frames[0].decode('utf-8', errors='replace'), frames[-1].decode('utf-8', errors='replace')
+        payload = frames[0].decode('utf-8', errors='replace').strip()
+        prefix, sep, rest = payload.partition(' ')
+        if sep and rest.lstrip().startswith('{') and not prefix.startswith('{'):
+            return prefix, rest
+        return None, payload
+
     def _listen_for_signals(self):
         socket = self.context.socket(zmq.SUB)
-        socket.connect("tcp://127.0.0.1:5557")
-        socket.setsockopt_string(zmq.SUBSCRIBE, "")
-        last_heartbeat_time = time.time()
+        for endpoint in self.endpoints:
+            socket.connect(endpoint)
+        for topic in self.topics:
+            socket.setsockopt_string(zmq.SUBSCRIBE, topic)
+        control = self.context.socket(zmq.PAIR)
+        control.bind(self.control_endpoint)
+
+        poller = zmq.Poller()
+        poller.register(socket, zmq.POLLIN)
+        poller.register(control, zmq.POLLIN)
+
+        last_message_time = time.time()
+        ea_online = True
         self.status_callback("MT4", "CONECTADO", "Aguardando")
         while not self.stop_event.is_set():
             try:
-                if socket.poll(1000):
-                    message = socket.recv_string().strip()
-                    if message == "MT4_HEARTBEAT": 
-                        last_heartbeat_time = time.time()
-                    elif "TESTE DE CONEXAO MANUAL" in message: 
-                        self.bot_core.log_callback("Sinal de teste do MT4 recebido com sucesso!", "STATUS")
-                    elif "Conexão com o Expert Advisor" in message or "EA Desconectado" in message: 
-                        self.bot_core.log_callback(message, "STATUS")
-                    elif message: 
-                        self._process_trade_signal(message)
-                
-                if time.time() - last_heartbeat_time > 15: 
-                    self.status_callback("MT4", "DESCONECTADO", "Sem sinal do EA!")
-                else: 
-                    self.status_callback("MT4", "CONECTADO", "Monitorando...")
+                sources_before = len(self.sources_online)
+                events = dict(poller.poll(self._poll_timeout_ms(last_message_time, ea_online)))
+                if control in events:
+                    break
+
+                if socket in events:
+                    # Drena todos os frames pendentes antes de voltar ao poll
+                    while True:
+                        try:
+                            frames = socket.recv_multipart(zmq.NOBLOCK)
+                        except zmq.Again:
+                            break
+                        last_message_time = time.time()
+                        topic, raw = self._split_frame(frames)
+                        self._handle_message(raw, topic)
+
+                now = time.time()
+                self._expire_sources(now)
+                online = now - last_message_time <= HEARTBEAT_TIMEOUT
+                if online != ea_online or len(self.sources_online) != sources_before:
+                    ea_online = online
+                    if online:
+                        self.status_callback("MT4", "CONECTADO", f"Monitorando {len(self.sources_online)} EA(s)")
+                    else:
+                        self.status_callback("MT4", "DESCONECTADO", "Sem sinal do EA!")
             except Exception as e:
                 self.bot_core.log_callback(f"Erro no listener MT4: {e}", "ERRO")
                 self.status_callback("MT4", "ERRO", "Erro no socket")
-                time.sleep(5)
+                self.stop_event.wait(5)
+        poller.unregister(socket)
+        poller.unregister(control)
         socket.close()
+        control.close()
         self.status_callback("MT4", "PARADO", "Desconectado")
 
-    def _process_trade_signal(self, signal_string):
-        """Processa um sinal de trade, aplicando filtros rígidos e extraindo timeframe se possível."""
+    def _handle_message(self, raw, topic=None):
+        """Interpreta um frame (JSON versionado ou texto legado) e despacha os sinais contidos nele."""
         try:
-            self.bot_core.log_callback(f"Sinal recebido do MT4: '{signal_string}'", "INFO")
-            sinal_upper = signal_string.upper()
-            if "POSSÍVEL" in sinal_upper or "SUPER" not in sinal_upper:
-                return
-
-            palavras = sinal_upper.split()
-            if len(palavras) < 3: return
-
-            ativo = palavras[0]
-            timeframe = 1
-            for p in palavras:
-                if p.startswith('M') and p[1:].isdigit():
-                    timeframe = int(p[1:])
-                    break
+            message = parse_message(raw)
+        except ProtocolError as e:
+            self.bot_core.log_callback(f"Mensagem do MT4 rejeitada: {e}", "ERRO")
+            return
+
+        for erro in message.get("errors", []):
+            self.bot_core.log_callback(f"Sinal do lote MT4 ignorado: {erro}", "AVISO")
+
+        # Fonte: campo "source" da mensagem > tópico ZMQ > fonte padrão
+        source = message.get("source") or topic or DEFAULT_SOURCE
+        received_at = time.time()
+        self._mark_source_seen(source, received_at)
+
+        if message["type"] == "heartbeat":
+            return
+        if message["type"] == "status":
+            if "TESTE DE CONEXAO MANUAL" in message["text"]:
+                self.bot_core.log_callback("Sinal de teste do MT4 recebido com sucesso!", "STATUS")
+            elif message["text"]:
+                self.bot_core.log_callback(message["text"], "STATUS")
+            return
+        if message["type"] == "legacy":
+            # Texto legado: mesmo despacho dos sinais JSON, para não perder a fonte e o horário de chegada
+            if message["text"]:
+                self.bot_core.log_callback(f"Sinal recebido do MT4: '{message['text']}'", "INFO")
 
-            direcao = "put" if "VENDA" in palavras else "call" if "COMPRA" in palavras else None
+        for signal in message["signals"]:
+            self._dispatch_signal(signal, received_at, source)
 
-            if ativo and direcao:
-                self.bot_core.log_callback(f"Sinal VÁLIDO detectado! Ativo: {ativo}, Direção: {direcao}, Timeframe: {timeframe}", "STRATEGY")
-                # Atualiza os atributos do último trade antes de executar
-                self.last_traded_asset = ativo
-                self.last_trade_direction = direcao
-                # A chamada agora é direta e não bloqueante, apenas enfileira o trade
-                self.bot_core.executar_trade(ativo, direcao, timeframe)
+    def _dispatch_signal(self, signal, received_at, source=DEFAULT_SOURCE):
+        """Envia um sinal estruturado ao executor, com id e carimbos de tempo para medir a latência."""
+        if signal["sent_ts"] is not None:
+            self.last_signal_latency = received_at - signal["sent_ts"]
+            logging.debug(f"Sinal MT4 {signal['id']} recebido com latência de {self.last_signal_latency * 1000:.1f} ms")
 
-        except Exception as e:
-            self.bot_core.log_callback(f"Falha crítica ao processar sinal '{signal_string}': {e}", "ERRO")
\ No newline at end of file
+        self.bot_core.log_callback(f"Sinal VÁLIDO detectado! Ativo: {signal['asset']}, Direção: {signal['direction']}, Timeframe: {signal['timeframe']}", "STRATEGY")
+        self.last_traded_asset = signal["asset"]
+        self.last_trade_direction = signal["direction"]
+        context = {
+            "signal_id": signal["id"],
+            "signal_ts": signal["sent_ts"],
+            "received_ts": received_at,
+            "source": f"MT4:{source}",
+        }
+        if signal["stake"] is not None:
+            context["stake"] = signal["stake"]
+        self.bot_core.executar_trade(signal["asset"], signal["direction"], signal["timeframe"], context)
@@ -0,0 +1,95 @@
+# bot/strategies/plugins.py
+
+from .mhi_strategy import CICLO_M5, ANTECEDENCIA_ENTRADA
+from .mhi_scanner import VELA_M1, VELAS_GUARDADAS, cor, direcao_mhi
+
+class StrategyPlugin:
+    """
+    Estratégia executada pelo MarketDataBus: não tem thread própria, só reage aos hooks.
+    `ativos` x `timeframes` definem os streams de velas que o barramento assina para ela.
+    Os hooks rodam todos na thread de despacho do barramento e devem retornar rápido.
+    """
+    timeframes = (VELA_M1,)
+
+    def __init__(self, nome, ativos=()):
+        self.nome = nome
+        self.ativos = list(ativos)
+        self.bus = None # Definido pelo MarketDataBus
+
+    # --- Hooks ---
+    def on_start(self): pass
+    def on_stop(self): pass
+    def on_candle(self, ativo, tamanho, vela): pass
+    def on_tick(self, ativo, tamanho, vela): pass
+    def on_signal(self, sinal): pass
+    def on_result(self, info): pass
+
+    # --- Serviços do barramento ---
+    def agora(self):
+        return self.bus.agora()
+
+    def agendar(self, momento, funcao):
+        self.bus.agendar(self, momento, funcao)
+
+    def operar(self, ativo, direcao, timeframe, context=None):
+        self.bus.executar(self, ativo, direcao, timeframe, context)
+
+    def log(self, mensagem, tag="INFO"):
+        self.bus.log(f"[{self.nome}] {mensagem}", tag)
+
+class MHIPlugin(StrategyPlugin):
+    """MHI de um ativo com as velas M1 do barramento; a entrada das x4:58 é um timer, não um loop."""
+    def __init__(self, nome, ativo):
+        super().__init__(nome, [ativo])
+        self.ativo = ativo
+        self.cores = {} # from -> cor das últimas velas M1
+        self.ultima_entrada = None
+
+    def on_start(self):
+        self._agendar_entrada()
+
+    def on_tick(self, ativo, tamanho, vela):
+        self.cores[vela['from']] = cor(vela)
+
+    def on_candle(self, ativo, tamanho, vela):
+        self.cores[vela['from']] = cor(vela)
+        for antigo in [f for f in self.cores if f <= vela['from'] - VELAS_GUARDADAS * VELA_M1]:
+            del self.cores[antigo]
+
+    def _agendar_entrada(self):
+        entrada = (self.agora() // CICLO_M5 + 1) * CICLO_M5 - ANTECEDENCIA_ENTRADA
+        if self.ultima_entrada is not None and entrada <= self.ultima_entrada:
+            entrada += CICLO_M5
+        self.ultima_entrada = entrada
+        self.agendar(entrada, self._entrada)
+
+    def _entrada(self):
+        fechamento = self.ultima_entrada + ANTECEDENCIA_ENTRADA
+        self._agendar_entrada()
+        direcao = direcao_mhi([self.cores.get(fechamento - k * VELA_M1) for k in (3, 2, 1)])
+        if direcao:
+            self.log(f"Sinal MHI: {self.ativo} {direcao.upper()}.", "STRATEGY")
+            self.operar(self.ativo, direcao, 1)
+        else:
+            self.log(f"Análise MHI de {self.ativo} abortada (doji ou velas faltando).", "AVISO")
+
+PLUGINS = {
+    'mhi': MHIPlugin,
+}
+
+def criar_plugins(especificacao):
+    """'mhi:EURUSD, mhi:GBPUSD-OTC' -> plugins; o nome de cada um é a própria especificação."""
+    plugins = {}
+    for spec in (especificacao or '').split(','):
+        spec = spec.strip()
+        if not spec or spec in plugins:
+            continue
+        tipo, _, parametros = spec.partition(':')
+        if tipo not in PLUGINS:
+            raise ValueError(f"Plugin de estratégia desconhecido: {tipo}")
+        args = [p.strip().upper() for p in parametros.split(':') if p.strip()]
+        try:
+            plugins[spec] = PLUGINS[tipo](spec, *args)
+        except TypeError:
+            raise ValueError(f"Parâmetros inválidos para o plugin '{spec}'")
+    return list(plugins.values())
@@ -33,11 +33,26 @@ class SignalListStrategy:
         if self.strategy_thread: self.strategy_thread.join(timeout=2)
         self.bot_core.log_callback("Estratégia de Lista de Sinais parada.", "STRATEGY")
 
+    def _agora(self):
+        """Horário do servidor (interpolado); relógio local se a API ainda não existir."""
+        api = getattr(self.bot_core, 'api', None)
+        if api is None:
+            return datetime.now()
+        return datetime.fromtimestamp(api.server_now())
+
+    def _aguardar_proximo_segundo(self):
+        """Acorda no início exato do próximo segundo do servidor, para entrar no :00 da vela."""
+        api = getattr(self.bot_core, 'api', None)
+        if api is None:
+            time.sleep(1)
+            return
+        api.sleep_until(int(api.server_now()) + 1, self.stop_event)
+
     def _run_loop(self):
         logging.info("Loop da lista de sinais iniciado.")
         
         while not self.stop_event.is_set():
-            now = datetime.now()
+            now = self._agora()
             current_time_str = now.strftime("%H:%M")
 
             for signal in self.signals:
@@ -57,6 +72,6 @@ class SignalListStrategy:
                     # A chamada agora é direta e não bloqueante, apenas enfileira o trade
                     self.bot_core.executar_trade(signal['asset'], signal['action'], signal['timeframe'], context)
             
-            time.sleep(1)
+            self._aguardar_proximo_segundo()
         
         logging.info("Loop da lista de sinais finalizado.")
\ No newline at end of file
@@ -7,7 +7,6 @@ import threading
 import requests
 import ssl
 import atexit
-from collections import deque
 from iqoptionapi.http.login import Login
 from iqoptionapi.http.loginv2 import Loginv2
 from iqoptionapi.http.logout import Logout
@@ -61,20 +60,7 @@ from iqoptionapi.ws.chanels.sell_digital_option import Sell_Digital_Option
 from iqoptionapi.ws.chanels.change_tpsl import Change_Tpsl
 from iqoptionapi.ws.chanels.change_auto_margin_call import ChangeAutoMarginCall
 
-from iqoptionapi.ws.objects.timesync import TimeSync
-from iqoptionapi.ws.objects.profile import Profile
-from iqoptionapi.ws.objects.candles import Candles
-from iqoptionapi.ws.objects.listinfodata import ListInfoData
-from iqoptionapi.ws.objects.betinfo import Game_betinfo_data
-import iqoptionapi.global_value as global_value
-from collections import defaultdict
-
-
-def nested_dict(n, type):
-    if n == 1:
-        return defaultdict(type)
-    else:
-        return defaultdict(lambda: nested_dict(n - 1, type))
+from iqoptionapi.connection_state import ConnectionState, bind_state_fields
 
 
 # InsecureRequestWarning: Unverified HTTPS request is being made.
@@ -83,84 +69,22 @@ def nested_dict(n, type):
 requests.packages.urllib3.disable_warnings()  # pylint: disable=no-member
 
 
+@bind_state_fields
 class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
     """Class for communication with IQ Option API."""
 
     # pylint: disable=too-many-public-methods
-    socket_option_opened = {}
-    socket_option_closed = {}
-    timesync = TimeSync()
-    profile = Profile()
-    candles = Candles()
-    listinfodata = ListInfoData()
-    api_option_init_all_result = []
-    api_option_init_all_result_v2 = []
-    # for digital
-    underlying_list_data = None
-    position_changed = None
-    instrument_quites_generated_data = nested_dict(2, dict)
-    instrument_quotes_generated_raw_data = nested_dict(2, dict)
-    instrument_quites_generated_timestamp = nested_dict(2, dict)
-    strike_list = None
-    leaderboard_deals_client = None
-    #position_changed_data = nested_dict(2, dict)
-    # microserviceName_binary_options_name_option=nested_dict(2,dict)
-    order_async = nested_dict(2, dict)
-    order_binary = {}
-    game_betinfo = Game_betinfo_data()
-    instruments = None
-    financial_information = None
-    buy_id = None
-    buy_order_id = None
-    traders_mood = {}  # get hight(put) %
-    technical_indicators = {}
-    order_data = None
-    positions = None
-    position = None
-    deferred_orders = None
-    position_history = None
-    position_history_v2 = None
-    available_leverages = None
-    order_canceled = None
-    close_position_data = None
-    overnight_fee = None
-    # ---for real time
-    digital_option_placed_id = {}
-    live_deal_data = nested_dict(3, deque)
-
-    subscribe_commission_changed_data = nested_dict(2, dict)
-    real_time_candles = nested_dict(3, dict)
-    real_time_candles_maxdict_table = nested_dict(2, dict)
-    candle_generated_check = nested_dict(2, dict)
-    candle_generated_all_size_check = nested_dict(1, dict)
-    # ---for api_game_getoptions_result
-    api_game_getoptions_result = None
-    sold_options_respond = None
-    sold_digital_options_respond = None
-    tpsl_changed_respond = None
-    auto_margin_call_changed_respond = None
-    top_assets_updated_data = {}
-    get_options_v2_data = None
-    # --for binary option multi buy
-    buy_multi_result = None
-    buy_multi_option = {}
-    #
-    result = None
-    training_balance_reset_request = None
-    balances_raw = None
-    user_profile_client = None
-    leaderboard_userinfo_deals_client = None
-    users_availability = None
-    # ------------------
-    digital_payout = None
-
-    def __init__(self, host, username, password, proxies=None):
+
+    def __init__(self, host, username, password, proxies=None, state=None):
         """
         :param str host: The hostname or ip address of a IQ Option server.
         :param str username: The username of a IQ Option server.
         :param str password: The password of a IQ Option server.
         :param dict proxies: (optional) The http request proxies.
+        :param state: (optional) The :class:`ConnectionState` to use; pass the same
+            one when rebuilding the API so the session (SSID, balance, streams) is kept.
         """
+        self.state = state if state is not None else ConnectionState()
         self.https_url = "https://{host}/api".format(host=host)
         self.wss_url = "wss://{host}/echo/websocket".format(host=host)
         self.websocket_client = None
@@ -271,12 +195,14 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         data = json.dumps(dict(name=name,
                                msg=msg, request_id=request_id))
 
-        while (global_value.ssl_Mutual_exclusion or global_value.ssl_Mutual_exclusion_write) and no_force_send:
+        while self.state.ssl_Mutual_exclusion and no_force_send:
             pass
-        global_value.ssl_Mutual_exclusion_write = True
-        self.websocket.send(data)
+        # the flag check alone let two threads write the same frame at once
+        with self.state.send_lock:
+            self.state.ssl_Mutual_exclusion_write = True
+            self.websocket.send(data)
+            self.state.ssl_Mutual_exclusion_write = False
         logger.debug(data)
-        global_value.ssl_Mutual_exclusion_write = False
 
     @property
     def logout(self):
@@ -772,9 +698,9 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         requests.utils.add_dict_to_cookiejar(self.session.cookies, cookies)
 
     def start_websocket(self):
-        global_value.check_websocket_if_connect = None
-        global_value.check_websocket_if_error = False
-        global_value.websocket_error_reason = None
+        self.state.check_websocket_if_connect = None
+        self.state.check_websocket_if_error = False
+        self.state.websocket_error_reason = None
 
         self.websocket_client = WebsocketClient(self)
 
@@ -784,11 +710,11 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         self.websocket_thread.start()
         while True:
             try:
-                if global_value.check_websocket_if_error:
-                    return False, global_value.websocket_error_reason
-                if global_value.check_websocket_if_connect == 0:
+                if self.state.check_websocket_if_error:
+                    return False, self.state.websocket_error_reason
+                if self.state.check_websocket_if_connect == 0:
                     return False, "Websocket connection closed."
-                elif global_value.check_websocket_if_connect == 1:
+                elif self.state.check_websocket_if_connect == 1:
                     return True, None
             except:
                 pass
@@ -822,7 +748,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
 
     def send_ssid(self):
         self.profile.msg = None
-        self.ssid(global_value.SSID)  # pylint: disable=not-callable
+        self.ssid(self.state.SSID)  # pylint: disable=not-callable
         while self.profile.msg == None:
             pass
         if self.profile.msg == False:
@@ -832,8 +758,8 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
 
     def connect(self):
 
-        global_value.ssl_Mutual_exclusion = False
-        global_value.ssl_Mutual_exclusion_write = False
+        self.state.ssl_Mutual_exclusion = False
+        self.state.ssl_Mutual_exclusion_write = False
         """Method for connection to IQ Option API."""
         try:
             self.close()
@@ -845,7 +771,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
             return check_websocket, websocket_reason
 
         # doing temp ssid reconnect for speed up
-        if global_value.SSID != None:
+        if self.state.SSID != None:
 
             check_ssid = self.send_ssid()
 
@@ -853,7 +779,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
                 # ssdi time out need reget,if sent error ssid,the weksocket will close by iqoption server
                 response = self.get_ssid()
                 try:
-                    global_value.SSID = response.cookies["ssid"]
+                    self.state.SSID = response.cookies["ssid"]
                 except:
                     return False, response.text
                 atexit.register(self.logout)
@@ -864,7 +790,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         else:
             response = self.get_ssid()
             try:
-                global_value.SSID = response.cookies["ssid"]
+                self.state.SSID = response.cookies["ssid"]
             except:
                 self.close()
                 return False, response.text
@@ -873,7 +799,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
 
         # set ssis cookie
         requests.utils.add_dict_to_cookiejar(
-            self.session.cookies, {"ssid": global_value.SSID})
+            self.session.cookies, {"ssid": self.state.SSID})
 
         self.timesync.server_timestamp = None
         while True:
@@ -900,6 +826,10 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         self.websocket.close()
         self.websocket_thread.join()
 
+    def ping(self):
+        """Send a websocket ping carrying the send time; the pong is timed in WebsocketClient.on_pong."""
+        self.websocket_client.wss.sock.ping(repr(time.time()))
+
     def websocket_alive(self):
         return self.websocket_thread.is_alive()
 
@@ -0,0 +1,299 @@
+# python
+"""asyncio facade over IQ_Option.
+
+Requests go out through the existing channels and the existing message handlers keep filling
+the connection state; the answers are awaited as futures resolved from the frame stream instead
+of busy-waiting one thread per call, so many concurrent waits cost almost nothing.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import defaultdict
+
+import iqoptionapi.constants as OP_code
+from iqoptionapi.stable_api import IQ_Option, option_closed_result, all_profit_from_init
+from iqoptionapi.server_clock import COARSE_MARGIN
+
+DEFAULT_PAYOUT = 75  # same fallback as IQ_Option.get_digital_payout
+RESULT_GRACE = 35  # seconds past expiration before a result wait gives up (same margin as IQBotCore)
+RESULT_WAIT_SLICE = 1.0  # longest single wait on the loop between stop_event checks
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def shared_loop():
+    """Event loop running in a daemon thread, shared by every adapter in the process."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="iqoption-loop", daemon=True).start()
+        return _loop
+
+
+class AsyncIQOption(object):
+    """Awaitable versions of the IQ_Option calls the bot uses. Bind to a loop by awaiting connect()."""
+
+    def __init__(self, email, password, active_account_type="PRACTICE"):
+        self.sync = IQ_Option(email, password, active_account_type)
+        self.loop = None
+        self._waiters = defaultdict(list)  # frame name -> [(predicate, future)]
+        self._inflight = {}  # requests shared by concurrent callers (payout per asset, init data)
+        self._ids = itertools.count(1)
+        self.sync.state.frame_listeners.append(self._on_frame)
+
+    @property
+    def api(self):
+        return self.sync.api
+
+    # --- frame dispatch ---
+    def _on_frame(self, message):
+        # websocket thread: only hand over frames somebody is waiting for
+        if self.loop is not None and message.get("name") in self._waiters:
+            self.loop.call_soon_threadsafe(self._dispatch, message)
+
+    def _dispatch(self, message):
+        waiters = self._waiters.get(message["name"])
+        if not waiters:
+            return
+        for entry in list(waiters):
+            predicate, future = entry
+            if future.done():
+                waiters.remove(entry)
+            elif predicate(message):
+                future.set_result(message)
+                waiters.remove(entry)
+        if not waiters:
+            self._waiters.pop(message["name"], None)
+
+    async def _request(self, name, predicate, send=None, timeout=None, ready=None):
+        """
+        Register a waiter for the first `name` frame matching predicate, then send the request.
+        `ready` is checked after registering, for answers that may already be in the state.
+        """
+        future = self.loop.create_future()
+        entry = (predicate, future)
+        self._waiters[name].append(entry)
+        try:
+            if send is not None:
+                send()
+            if ready is not None:
+                message = ready()
+                if message is not None:
+                    return message
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            waiters = self._waiters.get(name)
+            if waiters and entry in waiters:
+                waiters.remove(entry)
+                if not waiters:
+                    self._waiters.pop(name, None)
+
+    def _shared(self, key, factory):
+        """Concurrent callers of the same request await one task."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self.loop.create_task(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return asyncio.shield(task)
+
+    def _request_id(self):
+        return "async-{}".format(next(self._ids))
+
+    async def _blocking(self, fn, *args):
+        return await self.loop.run_in_executor(None, fn, *args)
+
+    # --- connection ---
+    async def connect(self, sms_code=None):
+        self.loop = asyncio.get_running_loop()
+        return await self._blocking(self.sync.connect, sms_code)
+
+    async def reconnect(self, timeout=20):
+        self.loop = asyncio.get_running_loop()
+        return await self._blocking(self.sync.reconnect, timeout)
+
+    def check_connect(self):
+        return self.sync.check_connect()
+
+    # --- clock ---
+    def server_now(self):
+        return self.sync.server_now()
+
+    async def sleep_until(self, server_ts):
+        clock = self.api.timesync.clock
+        while True:
+            remaining = server_ts - clock.server_now()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining - COARSE_MARGIN if remaining > COARSE_MARGIN else remaining)
+
+    # --- orders ---
+    async def buy(self, price, active, action, expirations, timeout=15):
+        """(True, option_id) or (False, reason), like IQ_Option.buy."""
+        orders = self.sync.state.orders
+        order = orders.open()
+        future = self.loop.create_future()
+
+        def completed(_order):  # websocket thread
+            self.loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+        order.add_done_callback(completed)
+        try:
+            self.api.buyv3(float(price), OP_code.ACTIVES[active], str(action), int(expirations), order.request_id)
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logging.error('**warning** buy late {} sec'.format(timeout))
+            return False, "Timeout"
+        finally:
+            orders.close(order)
+        if not order.accepted:
+            return False, order.message
+        self.sync.pending_option_ids.add(order.option_id)
+        return True, order.option_id
+
+    async def wait_result(self, option_id, timeout=None):
+        """(win, profit) once the option closes, like IQ_Option.check_win_v4; None on timeout."""
+        try:
+            message = await self._request(
+                "socket-option-closed", lambda m: m["msg"]["id"] == option_id, timeout=timeout,
+                ready=lambda: self.api.socket_option_closed.get(option_id))
+        except asyncio.TimeoutError:
+            return None
+        self.sync.pending_option_ids.discard(option_id)
+        return option_closed_result(message)
+
+    # --- market data ---
+    async def get_candles(self, active, interval, count, endtime, timeout=10):
+        if active not in OP_code.ACTIVES:
+            logging.error('Asset {} not found in constants'.format(active))
+            return None
+        req_id = self._request_id()
+        try:
+            message = await self._request(
+                "candles", lambda m: str(m.get("request_id")) == req_id,
+                lambda: self.api.getcandles(OP_code.ACTIVES[active], interval, count, endtime, req_id),
+                timeout)
+        except asyncio.TimeoutError:
+            logging.error('Timeout while waiting for candles data')
+            return None
+        return message["msg"].get("candles")
+
+    async def get_digital_payout(self, active, timeout=5):
+        return await self._shared(("payout", active), lambda: self._fetch_digital_payout(active, timeout))
+
+    async def _fetch_digital_payout(self, active, timeout):
+        # same reference-counted price-splitter stream as IQ_Option.get_digital_payout
+        asset_id = OP_code.ACTIVES[active]
+        key = ("price-splitter", asset_id, None)
+        subscriptions = self.sync.subscriptions
+        new = subscriptions.acquire(key)
+        if new is None:
+            return DEFAULT_PAYOUT
+        try:
+            payout = self.sync.state.digital_payouts.get(asset_id)
+            if payout is not None:
+                return payout
+            message = await self._request(
+                "client-price-generated", lambda m: m["msg"].get("asset_id", asset_id) == asset_id,
+                (lambda: self.api.subscribe_digital_price_splitter(asset_id)) if new else None, timeout)
+        except asyncio.TimeoutError:
+            return DEFAULT_PAYOUT
+        finally:
+            subscriptions.release(key, keep_idle=True)
+        ask_price = [d for d in message["msg"]["prices"] if d['strike'] == 'SPT'][0]['call']['ask']
+        return int(((100 - ask_price) * 100) / ask_price) or DEFAULT_PAYOUT
+
+    async def get_all_profit(self, timeout=30):
+        return await self._shared("init_all", lambda: self._fetch_all_profit(timeout))
+
+    async def _fetch_all_profit(self, timeout):
+        message = await self._request(
+            "api_option_init_all_result", lambda m: m["msg"].get("isSuccessful") == True,
+            self.api.get_api_option_init_all, timeout)
+        return all_profit_from_init(message["msg"])
+
+    async def get_all_open_time(self):
+        # Rare call (once a minute) made of several requests; runs on the loop's executor
+        return await self._blocking(self.sync.get_all_open_time)
+
+
+class AsyncIQOptionAdapter(object):
+    """
+    IQ_Option-compatible blocking interface over AsyncIQOption, for IQBotCore. The hot-path calls
+    (buy, check_win_v4, payouts, candles, profits) are awaited on the shared event loop, so the
+    calling thread sleeps on a future instead of spinning; everything else goes to IQ_Option.
+    stop_event (optional) cuts result waits short when the caller is shutting down.
+    """
+
+    def __init__(self, email, password, active_account_type="PRACTICE", loop=None, stop_event=None):
+        self.loop = loop or shared_loop()
+        self.client = AsyncIQOption(email, password, active_account_type)
+        self.stop_event = stop_event
+        self._result_deadlines = {}  # option id -> time.time() after which check_win_v4 gives up
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def connect(self, sms_code=None):
+        return self._run(self.client.connect(sms_code))
+
+    def reconnect(self, timeout=20):
+        return self._run(self.client.reconnect(timeout))
+
+    def buy(self, price, ACTIVES, ACTION, expirations, timeout=15):
+        check, option_id = self._run(self.client.buy(price, ACTIVES, ACTION, expirations, timeout))
+        if check:
+            self._set_result_deadline(option_id, expirations)
+        return check, option_id
+
+    def buy_batch(self, orders, timeout=15):
+        results = self.client.sync.buy_batch(orders, timeout)
+        for (_, _, _, expirations), (check, option_id, _, _) in zip(orders, results):
+            if check:
+                self._set_result_deadline(option_id, expirations)
+        return results
+
+    def _set_result_deadline(self, option_id, expirations):
+        self._result_deadlines[option_id] = time.time() + int(expirations) * 60 + RESULT_GRACE
+
+    def check_win_v4(self, id_number, timeout=None):
+        """
+        (win, profit) like IQ_Option.check_win_v4, or (None, None) when the option does not close
+        within `timeout` seconds (default: its expiration plus RESULT_GRACE) or stop_event is set.
+        """
+        if timeout is not None:
+            deadline = time.time() + timeout
+        else:
+            deadline = self._result_deadlines.get(id_number) or time.time() + RESULT_GRACE
+        while True:
+            remaining = deadline - time.time()
+            # Short slices, so a lost close frame or a stop never holds the trade thread
+            result = self._run(self.client.wait_result(id_number, min(max(remaining, 0), RESULT_WAIT_SLICE)))
+            if result is not None:
+                self._result_deadlines.pop(id_number, None)
+                return result
+            if remaining <= RESULT_WAIT_SLICE:
+                self._result_deadlines.pop(id_number, None)
+                return None, None
+            if self.stop_event is not None and self.stop_event.is_set():
+                return None, None
+
+    def get_candles(self, ACTIVES, interval, count, endtime):
+        return self._run(self.client.get_candles(ACTIVES, interval, count, endtime))
+
+    def get_digital_payout(self, active, seconds=0):
+        return self._run(self.client.get_digital_payout(active, seconds or 5))
+
+    def get_all_profit(self):
+        return self._run(self.client.get_all_profit())
+
+    def get_all_open_time(self):
+        return self._run(self.client.get_all_open_time())
+
+    def __getattr__(self, name):
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client.sync, name)
@@ -0,0 +1,170 @@
+# python
+"""Bounded worker pool for high-rate stream callbacks (live deals)."""
+import logging
+import threading
+import time
+from collections import deque
+
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+POLICIES = (DROP_OLDEST, COALESCE)
+
+
+class CallbackExecutor(object):
+    """
+    Fixed number of worker threads fed by a bounded queue. When the queue is full the oldest
+    item is dropped; with the "coalesce" policy an item whose key is still queued replaces it
+    in place instead (only the latest data per key is delivered).
+    """
+
+    def __init__(self, workers=2, maxsize=1000, policy=DROP_OLDEST):
+        if policy not in POLICIES:
+            raise ValueError("unknown policy {}".format(policy))
+        self.workers = workers
+        self.maxsize = maxsize
+        self.policy = policy
+        self._queue = deque()
+        self._queued_keys = {}  # key -> queued entry (coalesce)
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopped = False
+        self.submitted = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    def submit(self, fn, data, key=None):
+        with self._cond:
+            self.submitted += 1
+            if self.policy == COALESCE and key is not None:
+                entry = self._queued_keys.get(key)
+                if entry is not None:
+                    entry[1] = data
+                    self.coalesced += 1
+                    return
+            if len(self._queue) >= self.maxsize:
+                old = self._queue.popleft()
+                if self._queued_keys.get(old[2]) is old:
+                    del self._queued_keys[old[2]]
+                self.dropped += 1
+            entry = [fn, data, key]
+            self._queue.append(entry)
+            if self.policy == COALESCE and key is not None:
+                self._queued_keys[key] = entry
+            if not self._threads:
+                self._start()
+            self._cond.notify()
+
+    def _start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name="iqoption-callback-{}".format(i))
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                entry = self._queue.popleft()
+                if self._queued_keys.get(entry[2]) is entry:
+                    del self._queued_keys[entry[2]]
+                fn, data, _ = entry
+            try:
+                fn(data)
+            except Exception:
+                self.failed += 1
+                logging.exception('**error** stream callback failed')
+
+    def stop(self, timeout=2):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+
+    def stats(self):
+        with self._cond:
+            return {"submitted": self.submitted, "dropped": self.dropped, "coalesced": self.coalesced,
+                    "failed": self.failed, "queued": len(self._queue)}
+
+
+class StreamCallbacks(object):
+    """
+    User callbacks per stream name, run on a CallbackExecutor. A callback registered with
+    batch_ms receives a list of messages every batch_ms instead of one call per message.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor or CallbackExecutor()
+        self._callbacks = {}  # stream -> (fn, batch_ms)
+        self._batches = {}  # stream -> deque of pending messages
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._wakeup = threading.Event()
+        self.batch_dropped = 0
+
+    def set(self, stream, fn, batch_ms=None):
+        with self._lock:
+            if fn is None:
+                self._callbacks.pop(stream, None)
+                self._batches.pop(stream, None)
+                return
+            self._callbacks[stream] = (fn, batch_ms)
+            if batch_ms:
+                self._batches.setdefault(stream, deque(maxlen=self.executor.maxsize))
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, name="iqoption-callback-batch")
+                    self._flusher.daemon = True
+                    self._flusher.start()
+            else:
+                self._batches.pop(stream, None)
+        self._wakeup.set()
+
+    def has(self, stream):
+        return stream in self._callbacks
+
+    def dispatch(self, stream, data, key=None):
+        registered = self._callbacks.get(stream)
+        if registered is None:
+            return
+        fn, batch_ms = registered
+        if batch_ms:
+            with self._lock:
+                batch = self._batches.get(stream)
+                if batch is not None:
+                    if len(batch) == batch.maxlen:
+                        self.batch_dropped += 1
+                    batch.append(data)
+            return
+        self.executor.submit(lambda d: fn(**d), data, (stream, key) if key is not None else None)
+
+    def _flush_loop(self):
+        next_flush = {}
+        while True:
+            now = time.time()
+            with self._lock:
+                due = []
+                for stream, (fn, batch_ms) in self._callbacks.items():
+                    if not batch_ms:
+                        continue
+                    at = next_flush.setdefault(stream, now + batch_ms / 1000.0)
+                    if at <= now:
+                        next_flush[stream] = now + batch_ms / 1000.0
+                        batch = self._batches.get(stream)
+                        if batch:
+                            due.append((fn, list(batch)))
+                            batch.clear()
+                wait = min([at for s, at in next_flush.items() if s in self._callbacks] or [now + 1]) - now
+            for fn, items in due:
+                self.executor.submit(fn, items)
+            self._wakeup.wait(max(wait, 0.001))
+            self._wakeup.clear()
+
+    def stats(self):
+        stats = self.executor.stats()
+        stats["batch_dropped"] = self.batch_dropped
+        return stats
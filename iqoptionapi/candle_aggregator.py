@@ -0,0 +1,125 @@
+# python
+"""Higher timeframes built locally from one streamed candle size."""
+import threading
+
+INF = float("inf")
+
+
+def aggregation_base(sizes, supported):
+    """Largest supported size every requested size is a multiple of, or None."""
+    bases = [s for s in supported if all(size % s == 0 for size in sizes)]
+    return max(bases) if bases else None
+
+
+def aligned(size):
+    """Bars of `size` seconds line up with server epoch time (intraday sizes and the day)."""
+    return size <= 86400 and 86400 % size == 0
+
+
+class _Bar(object):
+    # high/low/volume of the base candles already finished in this bar; the base candle
+    # in progress is kept aside because the stream sends it again on every tick
+    __slots__ = ("start", "open", "high", "low", "volume", "base_from", "last", "complete")
+
+    def __init__(self, start, base_from, open_, complete):
+        self.start = start
+        self.open = open_
+        self.high = -INF
+        self.low = INF
+        self.volume = 0
+        self.base_from = base_from
+        self.last = None  # latest update of the base candle in progress
+        self.complete = complete
+
+
+class CandleAggregator(object):
+    """
+    Folds the candles of one streamed size into bars of larger sizes, written to the
+    real-time candle store like streamed ones ({active: {size: {from: candle}}}). Each base
+    candle update costs O(1) per target size. A bar is only written once it was seen from its
+    first base candle, so a bar loaded from history is not replaced by a partial one.
+    """
+
+    def __init__(self, store, listeners=()):
+        self._store = store
+        self._listeners = listeners  # called like the streamed candles: (active, size, candle)
+        self._targets = {}  # (active, base) -> {size: [maxdict, consumers]}
+        self._bars = {}  # (active, size) -> _Bar
+        self._lock = threading.Lock()
+
+    def add(self, active, base, size, maxdict):
+        with self._lock:
+            targets = self._targets.setdefault((active, base), {})
+            if size in targets:
+                targets[size][0] = max(targets[size][0], maxdict)
+                targets[size][1] += 1
+            else:
+                targets[size] = [maxdict, 1]
+
+    def remove(self, active, base, size):
+        with self._lock:
+            targets = self._targets.get((active, base), {})
+            if size not in targets:
+                return
+            targets[size][1] -= 1
+            if targets[size][1] <= 0:
+                del targets[size]
+                self._bars.pop((active, size), None)
+            if not targets:
+                self._targets.pop((active, base), None)
+
+    def sizes(self, active, base):
+        with self._lock:
+            return sorted(self._targets.get((active, base), {}))
+
+    def on_candle(self, active, base, candle):
+        """Called with every candle of the base size (streamed or replayed from history)."""
+        targets = self._targets.get((active, base))
+        if not targets:
+            return
+        with self._lock:
+            for size, (maxdict, _) in targets.items():
+                self._update(active, size, maxdict, candle)
+
+    def _update(self, active, size, maxdict, candle):
+        from_ = int(candle["from"])
+        start = from_ - from_ % size
+        key = (active, size)
+        bar = self._bars.get(key)
+        if bar is None or start != bar.start:
+            if bar is not None and start < bar.start:
+                return  # late update of a bar already closed
+            bar = _Bar(start, from_, candle["open"], from_ == start or bar is not None)
+            self._bars[key] = bar
+        elif from_ != bar.base_from:
+            if from_ < bar.base_from:
+                return
+            # the previous base candle is finished: fold its final values into the bar
+            last = bar.last
+            bar.high = max(bar.high, last["max"])
+            bar.low = min(bar.low, last["min"])
+            bar.volume += last.get("volume", 0)
+            bar.base_from = from_
+        bar.last = candle
+        if bar.complete:
+            self._write(active, size, maxdict, bar, candle)
+
+    def _write(self, active, size, maxdict, bar, candle):
+        bars = self._store[active][size]
+        bars[bar.start] = written = {
+            "active_id": candle.get("active_id"),
+            "size": size,
+            "from": bar.start,
+            "to": bar.start + size,
+            "open": bar.open,
+            "close": candle["close"],
+            "min": min(bar.low, candle["min"]),
+            "max": max(bar.high, candle["max"]),
+            "volume": bar.volume + candle.get("volume", 0),
+            "at": candle.get("at"),
+        }
+        # bars are added in time order, so the oldest is first
+        while len(bars) > maxdict:
+            del bars[next(iter(bars))]
+        for listener in self._listeners:
+            listener(active, size, written)
@@ -0,0 +1,197 @@
+"""Per-connection state of an IQ Option session."""
+import threading
+from collections import deque, defaultdict
+
+from iqoptionapi.ws.objects.timesync import TimeSync
+from iqoptionapi.ws.objects.profile import Profile
+from iqoptionapi.ws.objects.candles import Candles
+from iqoptionapi.ws.objects.listinfodata import ListInfoData
+from iqoptionapi.ws.objects.betinfo import Game_betinfo_data
+from iqoptionapi.order_gateway import OrderGateway
+from iqoptionapi.callback_executor import StreamCallbacks
+from iqoptionapi.market_analytics import MarketAnalytics
+from iqoptionapi.expiring_dict import ExpiringDict
+from iqoptionapi.candle_aggregator import CandleAggregator
+from iqoptionapi.indicators import IndicatorEngine
+
+# Per-request response maps: entries expire after the TTL (from their last write) and each map
+# holds at most STORE_MAXSIZE entries, so a session running for days stays at flat memory.
+STORE_MAXSIZE = 5000
+RESPONSE_TTL = 600  # answers picked up right after the request (indicators, digital order ids)
+OPTION_TTL = 6 * 3600  # option/position lifecycle events, read when the option closes
+
+
+def nested_dict(n, type):
+    if n == 1:
+        return defaultdict(type)
+    else:
+        return defaultdict(lambda: nested_dict(n - 1, type))
+
+
+# Session flags (formerly module globals in global_value)
+SESSION_FIELDS = (
+    "SSID",
+    "balance_id",
+    "check_websocket_if_connect",
+    "check_websocket_if_error",
+    "websocket_error_reason",
+    "ssl_Mutual_exclusion",
+    "ssl_Mutual_exclusion_write",
+    "frame_listeners",
+    "send_lock",
+    "orders",
+    "deal_callbacks",
+    "analytics",
+    "candle_aggregator",
+    "candle_listeners",
+    "indicators",
+)
+
+# Data filled by the websocket handlers (formerly IQOptionAPI class attributes),
+# exposed on IQOptionAPI as attributes of the same name
+DATA_FIELDS = (
+    "socket_option_opened", "socket_option_closed",
+    "timesync", "profile", "candles", "listinfodata", "game_betinfo",
+    "api_option_init_all_result", "api_option_init_all_result_v2",
+    "underlying_list_data", "position_changed",
+    "instrument_quites_generated_data", "instrument_quotes_generated_raw_data",
+    "instrument_quites_generated_timestamp",
+    "strike_list", "leaderboard_deals_client",
+    "order_async", "order_binary",
+    "instruments", "financial_information", "buy_id", "buy_order_id",
+    "traders_mood", "technical_indicators",
+    "order_data", "positions", "position", "deferred_orders",
+    "position_history", "position_history_v2", "available_leverages",
+    "order_canceled", "close_position_data", "overnight_fee",
+    "digital_option_placed_id", "live_deal_data",
+    "subscribe_commission_changed_data", "real_time_candles",
+    "real_time_candles_maxdict_table", "candle_generated_check",
+    "candle_generated_all_size_check",
+    "api_game_getoptions_result", "sold_options_respond",
+    "sold_digital_options_respond", "tpsl_changed_respond",
+    "auto_margin_call_changed_respond", "top_assets_updated_data",
+    "get_options_v2_data", "buy_multi_result", "buy_multi_option", "result",
+    "training_balance_reset_request", "balances_raw", "user_profile_client",
+    "leaderboard_userinfo_deals_client", "users_availability", "digital_payout", "digital_payouts",
+    "last_frame_ts", "rtt_samples",
+)
+
+
+class ConnectionState(object):
+    """
+    Everything one IQ Option session owns: SSID, active balance, websocket flags and the
+    response/stream stores filled by the message handlers. One instance per IQ_Option, so
+    several accounts can run in the same interpreter without sharing data.
+    """
+    __slots__ = SESSION_FIELDS + DATA_FIELDS
+
+    def __init__(self):
+        self.SSID = None
+        self.balance_id = None
+        self.check_websocket_if_connect = None
+        self.check_websocket_if_error = False
+        self.websocket_error_reason = None
+        # try fix ssl.SSLEOFError: EOF occurred in violation of protocol (_ssl.c:2361)
+        self.ssl_Mutual_exclusion = False  # mutex read write
+        self.ssl_Mutual_exclusion_write = False  # if thread write
+        # callables fed every decoded frame after the handlers ran (e.g. AsyncIQOption)
+        self.frame_listeners = []
+        # one writer at a time on the websocket
+        self.send_lock = threading.Lock()
+        # in-flight buy requests, completed by the option/result handlers
+        self.orders = OrderGateway()
+        # user callbacks for the live-deal streams, run on a bounded worker pool
+        self.deal_callbacks = StreamCallbacks()
+        # rolling live-deal / traders-mood statistics per active id
+        self.analytics = MarketAnalytics()
+
+        self.socket_option_opened = ExpiringDict(OPTION_TTL, STORE_MAXSIZE)
+        self.socket_option_closed = ExpiringDict(OPTION_TTL, STORE_MAXSIZE)
+        self.timesync = TimeSync()
+        self.profile = Profile()
+        self.candles = Candles()
+        self.listinfodata = ListInfoData(ExpiringDict(OPTION_TTL, STORE_MAXSIZE))
+        self.game_betinfo = Game_betinfo_data()
+        self.api_option_init_all_result = []
+        self.api_option_init_all_result_v2 = []
+        # for digital
+        self.underlying_list_data = None
+        self.position_changed = None
+        self.instrument_quites_generated_data = nested_dict(2, dict)
+        self.instrument_quotes_generated_raw_data = nested_dict(2, dict)
+        self.instrument_quites_generated_timestamp = nested_dict(2, dict)
+        self.strike_list = None
+        self.leaderboard_deals_client = None
+        self.order_async = ExpiringDict(OPTION_TTL, STORE_MAXSIZE, factory=lambda: defaultdict(dict))  # two levels, like nested_dict(2, dict)
+        self.order_binary = {}
+        self.instruments = None
+        self.financial_information = None
+        self.buy_id = None
+        self.buy_order_id = None
+        self.traders_mood = {}  # get hight(put) %
+        self.technical_indicators = ExpiringDict(RESPONSE_TTL, STORE_MAXSIZE)
+        self.order_data = None
+        self.positions = None
+        self.position = None
+        self.deferred_orders = None
+        self.position_history = None
+        self.position_history_v2 = None
+        self.available_leverages = None
+        self.order_canceled = None
+        self.close_position_data = None
+        self.overnight_fee = None
+        # ---for real time
+        self.digital_option_placed_id = ExpiringDict(RESPONSE_TTL, STORE_MAXSIZE)
+        self.live_deal_data = nested_dict(3, deque)
+        self.subscribe_commission_changed_data = nested_dict(2, dict)
+        self.real_time_candles = nested_dict(3, dict)
+        # called with (active, size, candle) for every streamed or locally aggregated candle update
+        self.candle_listeners = []
+        # larger sizes built locally from one streamed size (start_candles_aggregated)
+        self.candle_aggregator = CandleAggregator(self.real_time_candles, self.candle_listeners)
+        # local indicators over the real-time candles (IQ_Option.add_indicator)
+        self.indicators = IndicatorEngine()
+        self.candle_listeners.append(self.indicators.on_candle)
+        self.real_time_candles_maxdict_table = nested_dict(2, dict)
+        self.candle_generated_check = nested_dict(2, dict)
+        self.candle_generated_all_size_check = nested_dict(1, dict)
+        # ---for api_game_getoptions_result
+        self.api_game_getoptions_result = None
+        self.sold_options_respond = None
+        self.sold_digital_options_respond = None
+        self.tpsl_changed_respond = None
+        self.auto_margin_call_changed_respond = None
+        self.top_assets_updated_data = {}
+        self.get_options_v2_data = None
+        # --for binary option multi buy
+        self.buy_multi_result = None
+        self.buy_multi_option = ExpiringDict(RESPONSE_TTL, STORE_MAXSIZE)
+        self.result = None
+        self.training_balance_reset_request = None
+        self.balances_raw = None
+        self.user_profile_client = None
+        self.leaderboard_userinfo_deals_client = None
+        self.users_availability = None
+        self.digital_payout = None
+        self.digital_payouts = {}  # asset id -> payout % from the price-splitter stream
+        # liveness: time of the last inbound frame (message or pong) and ping round-trip times
+        self.last_frame_ts = None
+        self.rtt_samples = deque(maxlen=200)
+
+    def store_metrics(self):
+        """{field: {"size", "expired", "evicted"}} for every expiring response map."""
+        stores = {name: getattr(self, name) for name in DATA_FIELDS}
+        stores["listinfodata"] = self.listinfodata.listinfodata_dict
+        return {name: store.metrics() for name, store in stores.items() if isinstance(store, ExpiringDict)}
+
+
+def _state_property(name):
+    return property(lambda self: getattr(self.state, name),
+                    lambda self, value: setattr(self.state, name, value))
+
+
+def bind_state_fields(cls):
+    """Class decorator: expose every DATA_FIELDS entry of self.state as an attribute of cls."""
+    for name in DATA_FIELDS:
+        setattr(cls, name, _state_property(name))
+    return cls
@@ -32,7 +32,7 @@ def get_expiration_time(timestamp, duration):
 
     remaning = []
     for t in exp:
-        remaning.append(int(t)-int(time.time()))
+        remaning.append(int(t)-int(timestamp))
     close = [abs(x-60*duration) for x in remaning]
     return int(exp[close.index(min(close))]), int(close.index(min(close)))
 
@@ -65,6 +65,6 @@ def get_remaning_time(timestamp):
             dr = 15*(idx-4)
         else:
             dr = idx+1
-        remaning.append((dr, int(t)-int(time.time())))
+        remaning.append((dr, int(t)-int(timestamp)))
 
     return remaning
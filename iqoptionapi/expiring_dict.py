@@ -0,0 +1,100 @@
+# python
+"""Dict with a time-to-live per entry and a maximum size, for per-request response maps."""
+import time
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+
+class ExpiringDict(MutableMapping):
+    """
+    Entries expire `ttl` seconds after their last write; past `maxsize` the least recently
+    written entry is evicted. Entries are kept in write order, so eviction only ever looks at
+    the front: each write costs O(1) amortized. `factory` makes missing keys autovivify on
+    d[key] like a defaultdict (get() and `in` never create entries).
+    """
+
+    def __init__(self, ttl, maxsize, factory=None, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.factory = factory
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.RLock()
+        self.expired = 0
+        self.evicted = 0
+
+    def _prune(self, now):
+        data = self._data
+        while data:
+            key, (expires_at, _) = next(iter(data.items()))
+            if expires_at <= now:
+                self.expired += 1
+            elif len(data) > self.maxsize:
+                self.evicted += 1
+            else:
+                break
+            del data[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            now = self._clock()
+            self._data.pop(key, None)
+            self._data[key] = (now + self.ttl, value)
+            self._prune(now)
+
+    def __getitem__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    return entry[1]
+                del self._data[key]
+                self.expired += 1
+            if self.factory is None:
+                raise KeyError(key)
+            value = self.factory()
+            self[key] = value
+            return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= self._clock():
+                del self._data[key]
+                self.expired += 1
+                return default
+            return entry[1]
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._data[key]
+
+    def __iter__(self):
+        now = self._clock()
+        with self._lock:
+            keys = [k for k, (expires_at, _) in self._data.items() if expires_at > now]
+        return iter(keys)
+
+    def __len__(self):
+        with self._lock:
+            self._prune(self._clock())
+            return len(self._data)
+
+    def __repr__(self):
+        return "ExpiringDict({!r})".format(dict(self.items()))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def metrics(self):
+        """{"size", "expired", "evicted"}; expired/evicted count entries dropped since creation."""
+        with self._lock:
+            self._prune(self._clock())
+            return {"size": len(self._data), "expired": self.expired, "evicted": self.evicted}
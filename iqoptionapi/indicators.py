@@ -0,0 +1,359 @@
+# python
+"""Incremental technical indicators over the real-time candle store.
+
+Every indicator keeps only the state it needs, so a closed candle (update) or a tick of the
+candle in progress (preview) costs O(1). preview() never changes the state: the value it
+returns is the one update() will return if the candle closes as it is now.
+"""
+import threading
+from collections import deque, namedtuple
+
+Bands = namedtuple("Bands", "middle upper lower")
+Stoch = namedtuple("Stoch", "k d")
+Macd = namedtuple("Macd", "macd signal histogram")
+
+
+class SMA(object):
+    def __init__(self, period, field="close"):
+        self.period = period
+        self.field = field
+        self._values = deque()
+        self._sum = 0.0
+
+    def _next(self, price):
+        if len(self._values) + 1 < self.period:
+            return None
+        old = self._values[0] if len(self._values) == self.period else 0.0
+        return (self._sum + price - old) / self.period
+
+    def preview(self, candle):
+        return self._next(candle[self.field])
+
+    def update(self, candle):
+        price = candle[self.field]
+        value = self._next(price)
+        self._values.append(price)
+        self._sum += price
+        if len(self._values) > self.period:
+            self._sum -= self._values.popleft()
+        return value
+
+
+class EMA(object):
+    """Seeded with the SMA of the first `period` values."""
+
+    def __init__(self, period, field="close"):
+        self.period = period
+        self.field = field
+        self.alpha = 2.0 / (period + 1)
+        self.value = None
+        self._seed = SMA(period, field)
+
+    def _next(self, price, candle):
+        if self.value is None:
+            return self._seed.preview(candle) if candle is not None else None
+        return self.value + self.alpha * (price - self.value)
+
+    def preview(self, candle):
+        return self._next(candle[self.field], candle)
+
+    def update(self, candle):
+        if self.value is None:
+            self.value = self._seed.update(candle)
+        else:
+            self.value = self._next(candle[self.field], candle)
+        return self.value
+
+    # MACD feeds EMAs with numbers instead of candles
+    def preview_price(self, price):
+        return self.preview({self.field: price})
+
+    def update_price(self, price):
+        return self.update({self.field: price})
+
+
+class RSI(object):
+    """Wilder's RSI, seeded with the plain average of the first `period` changes."""
+
+    def __init__(self, period=14, field="close"):
+        self.period = period
+        self.field = field
+        self._prev = None
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def _next(self, price):
+        if self._prev is None:
+            return None, 0, 0.0, 0.0
+        change = price - self._prev
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        count = self._count + 1
+        if count < self.period:
+            return None, count, self._gain + gain, self._loss + loss
+        if count == self.period:
+            avg_gain, avg_loss = (self._gain + gain) / self.period, (self._loss + loss) / self.period
+        else:
+            avg_gain = (self._gain * (self.period - 1) + gain) / self.period
+            avg_loss = (self._loss * (self.period - 1) + loss) / self.period
+        if avg_loss == 0:
+            value = 100.0 if avg_gain > 0 else 50.0
+        else:
+            value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        return value, count, avg_gain, avg_loss
+
+    def preview(self, candle):
+        return self._next(candle[self.field])[0]
+
+    def update(self, candle):
+        price = candle[self.field]
+        value, self._count, self._gain, self._loss = self._next(price)
+        self._prev = price
+        return value
+
+
+class Bollinger(object):
+    def __init__(self, period=20, k=2.0, field="close"):
+        self.period = period
+        self.k = k
+        self.field = field
+        self._values = deque()
+        self._sum = 0.0
+        self._sq = 0.0
+
+    def _next(self, price):
+        if len(self._values) + 1 < self.period:
+            return None
+        old = self._values[0] if len(self._values) == self.period else 0.0
+        mean = (self._sum + price - old) / self.period
+        var = max((self._sq + price * price - old * old) / self.period - mean * mean, 0.0)
+        width = self.k * var ** 0.5
+        return Bands(mean, mean + width, mean - width)
+
+    def preview(self, candle):
+        return self._next(candle[self.field])
+
+    def update(self, candle):
+        price = candle[self.field]
+        value = self._next(price)
+        self._values.append(price)
+        self._sum += price
+        self._sq += price * price
+        if len(self._values) > self.period:
+            old = self._values.popleft()
+            self._sum -= old
+            self._sq -= old * old
+        return value
+
+
+class ATR(object):
+    """Wilder's average true range."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self._prev_close = None
+        self._count = 0
+        self._atr = 0.0
+
+    def _next(self, candle):
+        high, low = candle["max"], candle["min"]
+        if self._prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        count = self._count + 1
+        if count < self.period:
+            return None, count, self._atr + tr
+        if count == self.period:
+            atr = (self._atr + tr) / self.period
+        else:
+            atr = (self._atr * (self.period - 1) + tr) / self.period
+        return atr, count, atr
+
+    def preview(self, candle):
+        return self._next(candle)[0]
+
+    def update(self, candle):
+        value, self._count, self._atr = self._next(candle)
+        self._prev_close = candle["close"]
+        return value
+
+
+class _WindowExtreme(object):
+    """Max (or min) of the last `size` committed values, with monotonic deques (O(1) amortized)."""
+
+    def __init__(self, size, is_max):
+        self.size = size
+        self._better = (lambda a, b: a >= b) if is_max else (lambda a, b: a <= b)
+        self._items = deque()  # (index, value), values monotonic
+        self._index = 0
+
+    def best(self):
+        return self._items[0][1] if self._items else None
+
+    def push(self, value):
+        while self._items and self._better(value, self._items[-1][1]):
+            self._items.pop()
+        self._items.append((self._index, value))
+        self._index += 1
+        while self._items[0][0] <= self._index - 1 - self.size:
+            self._items.popleft()
+
+
+class Stochastic(object):
+    """%K over the last k_period candles (the current one included), %D = SMA of %K."""
+
+    def __init__(self, k_period=14, d_period=3):
+        self.k_period = k_period
+        # extremes of the k_period - 1 candles before the current one
+        self._highs = _WindowExtreme(k_period - 1, True)
+        self._lows = _WindowExtreme(k_period - 1, False)
+        self._seen = 0
+        self._d = SMA(d_period, "k")
+
+    def _k(self, candle):
+        if self._seen + 1 < self.k_period:
+            return None
+        high = max(candle["max"], self._highs.best()) if self.k_period > 1 else candle["max"]
+        low = min(candle["min"], self._lows.best()) if self.k_period > 1 else candle["min"]
+        return 100.0 * (candle["close"] - low) / (high - low) if high > low else 50.0
+
+    def preview(self, candle):
+        k = self._k(candle)
+        return None if k is None else Stoch(k, self._d.preview({"k": k}))
+
+    def update(self, candle):
+        k = self._k(candle)
+        self._seen += 1
+        if self.k_period > 1:
+            self._highs.push(candle["max"])
+            self._lows.push(candle["min"])
+        return None if k is None else Stoch(k, self._d.update({"k": k}))
+
+
+class MACD(object):
+    def __init__(self, fast=12, slow=26, signal=9, field="close"):
+        self.field = field
+        self._fast = EMA(fast, "p")
+        self._slow = EMA(slow, "p")
+        self._signal = EMA(signal, "p")
+
+    def _value(self, fast, slow, signal_fn):
+        if fast is None or slow is None:
+            return None
+        macd = fast - slow
+        signal = signal_fn(macd)
+        return Macd(macd, signal, None if signal is None else macd - signal)
+
+    def preview(self, candle):
+        price = candle[self.field]
+        return self._value(self._fast.preview_price(price), self._slow.preview_price(price),
+                           self._signal.preview_price)
+
+    def update(self, candle):
+        price = candle[self.field]
+        return self._value(self._fast.update_price(price), self._slow.update_price(price),
+                           self._signal.update_price)
+
+
+INDICATORS = {
+    "sma": SMA,
+    "ema": EMA,
+    "rsi": RSI,
+    "bollinger": Bollinger,
+    "atr": ATR,
+    "stochastic": Stochastic,
+    "macd": MACD,
+}
+
+
+def create_indicator(spec):
+    """'rsi:14', 'ema:20', 'bollinger:20:2', 'stochastic:14:3', 'macd:12:26:9' -> indicator."""
+    name, _, params = spec.partition(":")
+    if name not in INDICATORS:
+        raise ValueError("unknown indicator {}".format(name))
+    args = [float(p) if "." in p else int(p) for p in params.split(":") if p]
+    return INDICATORS[name](*args)
+
+
+class _Series(object):
+    __slots__ = ("indicator", "value", "closed_from", "consumers")
+
+    def __init__(self, indicator):
+        self.indicator = indicator
+        self.value = None  # including the candle in progress
+        self.closed_from = None  # 'from' of the last committed candle
+        self.consumers = 1  # add() calls not yet matched by remove()
+
+
+class IndicatorEngine(object):
+    """
+    Indicators shared by every consumer of the connection, keyed by (active, size, spec) and
+    fed by the candle listeners: a new candle 'from' commits the previous candle, every
+    update of the current one refreshes the value with preview().
+    """
+
+    def __init__(self):
+        self._series = {}  # (active, size) -> {spec: _Series}
+        self._current = {}  # (active, size) -> candle in progress
+        self._lock = threading.Lock()
+
+    def add(self, active, size, spec, history=()):
+        """
+        Register spec for active/size (shared if already there) and warm it up on history,
+        a list of candles in time order whose last one may still be in progress.
+        """
+        with self._lock:
+            series = self._series.setdefault((active, size), {})
+            if spec in series:
+                series[spec].consumers += 1
+                return series[spec].indicator
+            entry = _Series(create_indicator(spec))
+            history = sorted(history, key=lambda c: c["from"])
+            current = self._current.get((active, size))
+            if current is not None:
+                history = [c for c in history if c["from"] < current["from"]] + [current]
+            for candle in history[:-1]:
+                entry.indicator.update(candle)
+                entry.closed_from = candle["from"]
+            if history:
+                self._current[(active, size)] = history[-1]
+                entry.value = entry.indicator.preview(history[-1])
+            series[spec] = entry
+            return entry.indicator
+
+    def remove(self, active, size, spec):
+        """Release one add(); the series goes away with its last consumer."""
+        with self._lock:
+            key = (active, size)
+            series = self._series.get(key, {})
+            entry = series.get(spec)
+            if entry is None:
+                return
+            entry.consumers -= 1
+            if entry.consumers <= 0:
+                del series[spec]
+            if not series:
+                self._series.pop(key, None)
+                self._current.pop(key, None)
+
+    def on_candle(self, active, size, candle):
+        series = self._series.get((active, size))
+        if not series:
+            return
+        with self._lock:
+            key = (active, size)
+            current = self._current.get(key)
+            if current is not None and candle["from"] < current["from"]:
+                return
+            for entry in series.values():
+                if current is not None and candle["from"] > current["from"] and entry.closed_from != current["from"]:
+                    entry.indicator.update(current)
+                    entry.closed_from = current["from"]
+                entry.value = entry.indicator.preview(candle)
+            self._current[key] = candle
+
+    def value(self, active, size, spec):
+        """Latest value (the candle in progress included), None while warming up or not registered."""
+        entry = self._series.get((active, size), {}).get(spec)
+        return entry.value if entry is not None else None
@@ -0,0 +1,115 @@
+# python
+"""Rolling per-asset statistics of the live-deal and traders-mood streams."""
+import time
+import threading
+from collections import deque
+
+# window (seconds) -> bucket width (seconds); 20 buckets per window
+WINDOWS = {10: 0.5, 60: 3, 300: 15}
+MOOD_HISTORY = 600  # mood samples kept per asset
+
+
+class RollingWindow(object):
+    """
+    Deal count and amounts over the last `span` seconds, kept in a fixed ring of time buckets.
+    An update touches one bucket; a query sums the ring (the oldest bucket may be partial,
+    so the window is exact to one bucket width).
+    """
+    __slots__ = ("span", "width", "_slots", "_n")
+
+    def __init__(self, span, width):
+        self.span = span
+        self.width = width
+        self._n = int(round(span / float(width)))
+        # per bucket: [bucket index, deals, amount, call amount, put amount]
+        self._slots = [[-1, 0, 0.0, 0.0, 0.0] for _ in range(self._n)]
+
+    def add(self, ts, amount, direction):
+        index = int(ts // self.width)
+        slot = self._slots[index % self._n]
+        if slot[0] != index:
+            slot[0], slot[1], slot[2], slot[3], slot[4] = index, 0, 0.0, 0.0, 0.0
+        slot[1] += 1
+        slot[2] += amount
+        if direction == "call":
+            slot[3] += amount
+        elif direction == "put":
+            slot[4] += amount
+
+    def totals(self, now):
+        newest = int(now // self.width)
+        deals, amount, call, put = 0, 0.0, 0.0, 0.0
+        for index, n, total, c, p in self._slots:
+            if newest - self._n < index <= newest:
+                deals += n
+                amount += total
+                call += c
+                put += p
+        return deals, amount, call, put
+
+
+class AssetAnalytics(object):
+    __slots__ = ("windows", "mood")
+
+    def __init__(self):
+        self.windows = {span: RollingWindow(span, width) for span, width in WINDOWS.items()}
+        self.mood = deque(maxlen=MOOD_HISTORY)  # (ts, value)
+
+
+class MarketAnalytics(object):
+    """
+    Fed by the live-deal and traders-mood handlers of one connection, keyed by active id.
+    Strategies read it as a pre-trade filter without sending anything to the server.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._assets = {}
+        self._lock = threading.Lock()
+
+    def _asset(self, active_id):
+        asset = self._assets.get(active_id)
+        if asset is None:
+            asset = self._assets.setdefault(active_id, AssetAnalytics())
+        return asset
+
+    def on_deal(self, active_id, amount, direction, ts=None):
+        ts = self._clock() if ts is None else ts
+        with self._lock:
+            for window in self._asset(active_id).windows.values():
+                window.add(ts, amount, direction)
+
+    def on_mood(self, active_id, value, ts=None):
+        ts = self._clock() if ts is None else ts
+        with self._lock:
+            self._asset(active_id).mood.append((ts, value))
+
+    def deal_stats(self, active_id, window=60):
+        """
+        {"deals", "amount", "call_amount", "put_amount", "call_ratio"} over the last `window`
+        seconds (10, 60 or 300). call_ratio is None without deals.
+        """
+        if window not in WINDOWS:
+            raise ValueError("window must be one of {}".format(sorted(WINDOWS)))
+        now = self._clock()
+        with self._lock:
+            asset = self._assets.get(active_id)
+            totals = asset.windows[window].totals(now) if asset else (0, 0.0, 0.0, 0.0)
+        deals, amount, call, put = totals
+        return {"deals": deals, "amount": amount, "call_amount": call, "put_amount": put,
+                "call_ratio": call / (call + put) if call + put else None}
+
+    def mood(self, active_id):
+        """Last traders-mood value, or None."""
+        with self._lock:
+            asset = self._assets.get(active_id)
+            return asset.mood[-1][1] if asset and asset.mood else None
+
+    def mood_series(self, active_id, seconds=None):
+        """[(ts, value)] of the traders-mood stream, optionally only the last `seconds`."""
+        since = self._clock() - seconds if seconds is not None else None
+        with self._lock:
+            asset = self._assets.get(active_id)
+            if not asset:
+                return []
+            return [sample for sample in asset.mood if since is None or sample[0] >= since]
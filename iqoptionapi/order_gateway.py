@@ -0,0 +1,97 @@
+# python
+"""In-flight order tracking keyed by unique request ids."""
+import itertools
+import time
+import threading
+
+
+class PendingOrder(object):
+    """State of one order request, completed by the "option" handler (or a failed "result")."""
+    __slots__ = ("request_id", "success", "option_id", "message", "completed_at", "done", "_callbacks")
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.success = None  # "result" frame: request accepted by the server
+        self.option_id = None  # "option" frame: id of the opened option
+        self.message = None  # rejection reason
+        self.completed_at = None  # time.time() when the answer arrived
+        self.done = threading.Event()
+        self._callbacks = []
+
+    @property
+    def accepted(self):
+        return self.option_id is not None and self.message is None
+
+    def add_done_callback(self, fn):
+        """fn(order) is called once the order is complete (right away if it already is)."""
+        self._callbacks.append(fn)
+        if self.done.is_set():
+            fn(self)
+
+    def _complete(self):
+        if self.done.is_set():
+            return
+        self.completed_at = time.time()
+        self.done.set()
+        for fn in self._callbacks:
+            fn(self)
+
+
+class OrderGateway(object):
+    """
+    Hands out monotonic request ids and keeps one PendingOrder per request, so any number of
+    buy() calls can be in flight on the same connection without sharing response fields.
+    """
+
+    def __init__(self, prefix="buy"):
+        self._prefix = prefix
+        self._ids = itertools.count(1)
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def open(self):
+        with self._lock:
+            order = PendingOrder("{}-{}".format(self._prefix, next(self._ids)))
+            self._orders[order.request_id] = order
+        return order
+
+    def close(self, order):
+        with self._lock:
+            self._orders.pop(order.request_id, None)
+
+    def wait(self, order, timeout):
+        """True if the order completed within timeout; the order is forgotten either way."""
+        try:
+            return order.done.wait(timeout)
+        finally:
+            self.close(order)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._orders)
+
+    # --- called from the websocket handlers; False if the request id is not ours ---
+    def on_result(self, request_id, msg):
+        with self._lock:
+            order = self._orders.get(str(request_id))
+        if order is None:
+            return False
+        order.success = msg.get("success")
+        if order.success is False:
+            order.message = msg.get("message") or "rejected"
+            order._complete()
+        return True
+
+    def on_option(self, request_id, msg):
+        with self._lock:
+            order = self._orders.get(str(request_id))
+        if order is None:
+            return False
+        if "message" in msg:
+            order.message = msg["message"]
+            order._complete()
+        else:
+            # the option frame with an id means the option is open, with or without the result frame
+            order.option_id = msg.get("id")
+            order._complete()
+        return True
@@ -0,0 +1,95 @@
+# python
+"""Server clock estimated from the timeSync stream."""
+import time
+import threading
+from collections import deque
+
+MIN_DRIFT_SAMPLES = 10
+MIN_DRIFT_SPAN = 20.0  # seconds of samples before trusting a drift estimate
+MAX_DRIFT = 1e-3  # 1000 ppm, anything above is noise
+COARSE_MARGIN = 0.05  # sleep_until: last 50 ms are done in short steps
+
+
+class ServerClock(object):
+    """
+    Estimates offset and drift between local monotonic time and server time.
+
+    Each timeSync frame gives offset = server_time - local_receive_time, which is the true
+    offset minus the network delay of that frame; the least-delayed frame (largest offset,
+    corrected for drift) is used as the anchor. server_now() interpolates between frames.
+    """
+
+    def __init__(self, window=60, monotonic=time.monotonic):
+        self._monotonic = monotonic
+        self._samples = deque(maxlen=window)  # (local_monotonic, offset)
+        self._lock = threading.Lock()
+        self._ref = None
+        self._offset = None
+        self._drift = 0.0
+
+    @property
+    def synced(self):
+        return self._offset is not None
+
+    @property
+    def drift(self):
+        return self._drift
+
+    def add_sample(self, server_ms, local_monotonic=None):
+        local = self._monotonic() if local_monotonic is None else local_monotonic
+        with self._lock:
+            self._samples.append((local, server_ms / 1000.0 - local))
+            self._estimate()
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._ref, self._offset, self._drift = None, None, 0.0
+
+    def _estimate(self):
+        samples = self._samples
+        ref = samples[-1][0]
+        drift = 0.0
+        if len(samples) >= MIN_DRIFT_SAMPLES and ref - samples[0][0] >= MIN_DRIFT_SPAN:
+            xs = [t - ref for t, _ in samples]
+            ys = [o for _, o in samples]
+            mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+            sxx = sum((x - mx) ** 2 for x in xs)
+            if sxx > 0:
+                drift = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx
+                drift = max(-MAX_DRIFT, min(MAX_DRIFT, drift))
+        self._offset = max(o - drift * (t - ref) for t, o in samples)
+        self._ref = ref
+        self._drift = drift
+
+    def server_now(self):
+        """Interpolated server time in seconds (float, millisecond resolution)."""
+        local = self._monotonic()
+        with self._lock:
+            if self._offset is None:
+                return time.time()
+            return local + self._offset + self._drift * (local - self._ref)
+
+    def server_now_ms(self):
+        return int(round(self.server_now() * 1000))
+
+    def sleep_until(self, server_ts, stop_event=None):
+        """
+        Block until the server clock reaches server_ts (seconds). Sleeps coarsely and finishes
+        in short steps, re-reading the estimate each time. Returns False if stop_event is set first.
+        """
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return False
+            remaining = server_ts - self.server_now()
+            if remaining <= 0:
+                return True
+            if remaining > COARSE_MARGIN:
+                delay = remaining - COARSE_MARGIN
+                if stop_event is not None:
+                    if stop_event.wait(delay):
+                        return False
+                else:
+                    time.sleep(delay)
+            else:
+                time.sleep(min(remaining, 0.001))
@@ -1,5 +1,9 @@
 # python
 from iqoptionapi.api import IQOptionAPI
+from iqoptionapi.connection_state import ConnectionState
+from iqoptionapi.callback_executor import CallbackExecutor, DROP_OLDEST
+from iqoptionapi.subscriptions import SubscriptionManager
+from iqoptionapi.candle_aggregator import aggregation_base, aligned
 import iqoptionapi.constants as OP_code
 import iqoptionapi.country_id as Country
 import threading
@@ -7,13 +11,12 @@ import time
 import json
 import logging
 import operator
-import iqoptionapi.global_value as global_value
 from collections import defaultdict
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from iqoptionapi.expiration import get_expiration_time, get_remaning_time
 from iqoptionapi.version_control import api_version
 from datetime import datetime, timedelta
-from random import randint
 
 
 def nested_dict(n, type):
@@ -23,6 +26,39 @@ def nested_dict(n, type):
         return defaultdict(lambda: nested_dict(n - 1, type))
 
 
+def option_closed_result(message):
+    """(win, profit) of a "socket-option-closed" frame."""
+    x = message
+    return x['msg']['win'], (0 if x['msg']['win'] == 'equal' else float(x['msg']['sum']) * -1 if x['msg']['win'] == 'loose' else float(x['msg']['win_amount']) - float(x['msg']['sum']))
+
+
+def all_profit_from_init(init_info):
+    """{name: {"turbo": payout, "binary": payout}} from an api_option_init_all result."""
+    all_profit = nested_dict(2, dict)
+    for option in ["turbo", "binary"]:
+        for actives in init_info["result"][option]["actives"]:
+            name = init_info["result"][option]["actives"][actives]["name"]
+            name = name[name.index(".") + 1:len(name)]
+            all_profit[name][option] = (
+                100.0 -
+                init_info["result"][option]["actives"][actives]["option"]["profit"][
+                    "commission"]) / 100.0
+    return all_profit
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def shared_executor():
+    """Thread pool shared by every IQ_Option instance in the process."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="iqoption")
+        return _executor
+
+
 class IQ_Option:
     __version__ = api_version
 
@@ -31,12 +67,17 @@ class IQ_Option:
                      3600, 7200, 14400, 28800, 43200, 86400, 604800, 2592000]
         self.email = email
         self.password = password
+        # SSID, balance and stream data of this account; kept across API rebuilds in connect()
+        self.state = ConnectionState()
         self.suspend = 0.5
         self.thread = None
-        self.subscribe_candle = []
-        self.subscribe_candle_all_size = []
-        self.subscribe_mood = []
+        # candle/mood/price streams held by this account, re-subscribed after a reconnect
+        self.subscriptions = SubscriptionManager(self._unsubscribe_stream)
         self.subscribe_indicators = []
+        # binary/turbo order ids still waiting for socket-option-closed
+        self.pending_option_ids = set()
+        # {"time_to_ready", "streams", "confirmed", "recovered_results", "resumed"} of the last (re)connect
+        self.last_connect_stats = None
         # for digit
         self.get_digital_spot_profit_after_sale_data = nested_dict(2, int)
         self.get_realtime_strike_list_temp_data = {}
@@ -54,31 +95,191 @@ class IQ_Option:
     def get_server_timestamp(self):
         return self.api.timesync.server_timestamp
 
-    def re_subscribe_stream(self):
-        try:
-            for ac in self.subscribe_candle:
-                sp = ac.split(",")
-                self.start_candles_one_stream(sp[0], sp[1])
-        except:
-            pass
-        # -----------------
-        try:
-            for ac in self.subscribe_candle_all_size:
-                self.start_candles_all_size_stream(ac)
-        except:
-            pass
-        # -------------reconnect subscribe_mood
+    def server_now(self):
+        """Server time in seconds with millisecond resolution (interpolated between timeSync frames)."""
+        return self.api.timesync.clock.server_now()
+
+    def sleep_until(self, server_ts, stop_event=None):
+        """Sleep until the server clock reaches server_ts; False if stop_event was set first."""
+        return self.api.timesync.clock.sleep_until(server_ts, stop_event)
+
+    def get_last_frame_age(self):
+        """Seconds since the last inbound websocket frame (None before the first one)."""
+        if self.api.last_frame_ts is None:
+            return None
+        return time.time() - self.api.last_frame_ts
+
+    def send_ping(self):
+        self.api.ping()
+
+    def get_rtt_samples(self):
+        return list(self.api.rtt_samples)
+
+    # legacy views of the subscription manager
+    @property
+    def subscribe_candle(self):
+        return ["{},{}".format(active, size) for _, active, size in self.subscriptions.keys("candles")]
+
+    @property
+    def subscribe_candle_all_size(self):
+        return [active for _, active, _ in self.subscriptions.keys("candles-all-size")]
+
+    @property
+    def subscribe_mood(self):
+        return [active for _, active, _ in self.subscriptions.keys("traders-mood")]
+
+    def set_max_streams(self, max_streams):
+        """Cap on concurrent streams (None: no cap); idle ones are dropped least recently used first."""
+        self.subscriptions.max_streams = max_streams
+
+    def get_subscription_stats(self):
+        return self.subscriptions.stats()
+
+    def _unsubscribe_stream(self, key):
+        # called by the subscription manager once nobody holds the stream (or it is evicted)
+        channel, active, param = key
+        if channel == "candles":
+            self.api.candle_generated_check[str(active)][int(param)] = {}
+            self.api.unsubscribe(OP_code.ACTIVES[active], param)
+        elif channel == "candles-all-size":
+            self.api.candle_generated_all_size_check[str(active)] = {}
+            self.api.unsubscribe_all_size(OP_code.ACTIVES[active])
+        elif channel == "traders-mood":
+            self.api.unsubscribe_Traders_mood(OP_code.ACTIVES[active], param)
+        elif channel == "price-splitter":
+            self.api.unsubscribe_digital_price_splitter(active)
+            self.state.digital_payouts.pop(active, None)
+
+    def re_subscribe_stream(self, timeout=20):
+        """
+        Re-subscribe every stream held in self.subscriptions in one burst and wait for the
+        candle streams together (unconfirmed ones are re-sent once a second).
+        Returns (confirmed, total) for the candle streams.
+        """
+        pending = set()
+        for _, active, size in self.subscriptions.keys("candles"):
+            self.api.candle_generated_check[str(active)][int(size)] = {}
+            pending.add((active, int(size)))
+        for _, active, _ in self.subscriptions.keys("candles-all-size"):
+            self.api.candle_generated_all_size_check[str(active)] = {}
+            pending.add((active, None))
+        total = len(pending)
+
+        for _, active, instrument in self.subscriptions.keys("traders-mood"):
+            try:
+                self.api.subscribe_Traders_mood(OP_code.ACTIVES[active], instrument)
+            except Exception as e:
+                logging.error('**error** re_subscribe_stream mood {}: {}'.format(active, e))
+        for _, asset_id, _ in self.subscriptions.keys("price-splitter"):
+            try:
+                self.api.subscribe_digital_price_splitter(asset_id)
+            except Exception as e:
+                logging.error('**error** re_subscribe_stream price splitter {}: {}'.format(asset_id, e))
+
+        start = time.time()
+        last_sent = 0
+        while pending and time.time() - start < timeout:
+            if time.time() - last_sent >= 1:
+                for active, size in pending:
+                    try:
+                        if size is None:
+                            self.api.subscribe_all_size(OP_code.ACTIVES[active])
+                        else:
+                            self.api.subscribe(OP_code.ACTIVES[active], size)
+                    except Exception as e:
+                        logging.error('**error** re_subscribe_stream {} {}: {}'.format(active, size, e))
+                last_sent = time.time()
+            time.sleep(0.05)
+            pending = {(active, size) for active, size in pending if not self._stream_confirmed(active, size)}
+
+        if pending:
+            logging.error('**error** re_subscribe_stream {} stream(s) not confirmed in {} sec'.format(len(pending), timeout))
+        return total - len(pending), total
+
+    def _stream_confirmed(self, active, size):
         try:
-            for ac in self.subscribe_mood:
-                self.start_mood_stream(ac)
-        except:
-            pass
+            if size is None:
+                return self.api.candle_generated_all_size_check[str(active)] == True
+            return self.api.candle_generated_check[str(active)][int(size)] == True
+        except KeyError:
+            return False
+
+    def _wait_balance_id(self, timeout=10):
+        start = time.time()
+        while self.state.balance_id == None:
+            if time.time() - start > timeout:
+                logging.error('**error** balance_id not received in {} sec'.format(timeout))
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _subscribe_portfolio(self, timeout=10):
+        # ---------for async get name: "position-changed", microserviceName
+        if self._wait_balance_id(timeout):
+            self.position_change_all(
+                "subscribeMessage", self.state.balance_id)
+        self.order_changed_all("subscribeMessage")
+        self.api.setOptions(1, True)
+
+    def replay_pending_results(self, timeout=5):
+        """
+        Ask (in a single api_game_betinfo request) for the result of orders that were open
+        when the socket dropped, so check_win_v4 does not wait for a socket-option-closed
+        that was sent on the dead connection. Returns how many results were recovered.
+        """
+        pending = [id_number for id_number in self.pending_option_ids
+                   if id_number not in self.api.socket_option_closed]
+        if not pending:
+            return 0
+        self.api.game_betinfo.isSuccessful = None
+        self.api.get_betinfo(pending)
+        start = time.time()
+        while self.api.game_betinfo.isSuccessful == None:
+            if time.time() - start > timeout:
+                logging.error('**warning** replay_pending_results late {} sec'.format(timeout))
+                return 0
+            time.sleep(0.05)
+        if self.api.game_betinfo.isSuccessful != True:
+            return 0
+
+        recovered = 0
+        data = self.api.game_betinfo.dict.get("result", {}).get("data", {})
+        for id_number in pending:
+            info = data.get(str(id_number))
+            if not info or info.get("win") in (None, ""):
+                continue # still open, socket-option-closed will arrive on the new socket
+            self.api.socket_option_closed[id_number] = {
+                "name": "socket-option-closed",
+                "msg": {"id": id_number, "win": info["win"], "sum": info.get("deposit", 0),
+                        "win_amount": info.get("profit", 0)}}
+            recovered += 1
+        return recovered
+
+    def reconnect(self, timeout=20):
+        """
+        Fast session resume: reuse the current IQOptionAPI (HTTP session/cookies and the
+        session SSID) instead of rebuilding it, re-subscribe all streams in one burst and
+        recover pending order results. Falls back to connect() when there is nothing to resume.
+        """
+        if getattr(self, "api", None) is None or self.state.SSID is None:
+            return self.connect()
+        start = time.time()
+        check, reason = self.api.connect()
+        if not check:
+            return False, reason
+        self._subscribe_portfolio(timeout)
+        confirmed, total = self.re_subscribe_stream(timeout)
+        recovered = self.replay_pending_results()
+        self.last_connect_stats = {"time_to_ready": time.time() - start, "streams": total,
+                                   "confirmed": confirmed, "recovered_results": recovered, "resumed": True}
+        return True, None
 
     def set_session(self, header, cookie):
         self.SESSION_HEADER = header
         self.SESSION_COOKIE = cookie
 
     def connect(self, sms_code=None):
+        start = time.time()
         try:
             self.api.close()
         except:
@@ -86,7 +287,7 @@ class IQ_Option:
             # logging.error('**warning** self.api.close() fail')
 
         self.api = IQOptionAPI(
-            "iqoption.com", self.email, self.password)
+            "iqoption.com", self.email, self.password, state=self.state)
         check = None
 
         # 2FA--
@@ -104,17 +305,11 @@ class IQ_Option:
 
         if check == True:
             # -------------reconnect subscribe_candle
-            self.re_subscribe_stream()
-
-            # ---------for async get name: "position-changed", microserviceName
-            while global_value.balance_id == None:
-                pass
-
-            self.position_change_all(
-                "subscribeMessage", global_value.balance_id)
-
-            self.order_changed_all("subscribeMessage")
-            self.api.setOptions(1, True)
+            confirmed, total = self.re_subscribe_stream()
+            self._subscribe_portfolio()
+            recovered = self.replay_pending_results()
+            self.last_connect_stats = {"time_to_ready": time.time() - start, "streams": total,
+                                       "confirmed": confirmed, "recovered_results": recovered, "resumed": False}
 
             """
             self.api.subscribe_position_changed(
@@ -159,7 +354,7 @@ class IQ_Option:
         # True/False
         # if not connected, sometimes it's None, sometimes its '0', so
         # both will fall on this first case
-        if not global_value.check_websocket_if_connect:
+        if not self.state.check_websocket_if_connect:
             return False
         else:
             return True
@@ -345,11 +540,13 @@ class IQ_Option:
     def get_all_open_time(self):
         # all pairs openned
         self.OPEN_TIME = nested_dict(3, dict)
-        binary = threading.Thread(target=self.__get_binary_open)
-        digital = threading.Thread(target=self.__get_digital_open)
-        #other = threading.Thread(target=self.__get_other_open)
-        binary.start(), digital.start()#, other.start()
-        binary.join(), digital.join()#, other.join()
+        pool = shared_executor()
+        binary = pool.submit(self.__get_binary_open)
+        digital = pool.submit(self.__get_digital_open)
+        #other = pool.submit(self.__get_other_open)
+        for job in (binary, digital):#, other
+            if job.exception() is not None:
+                logging.error('**error** get_all_open_time: {}'.format(job.exception()))
         # ordenate updated actives opcode
         OP_code.ACTIVES = dict(sorted(OP_code.ACTIVES.items(), key=operator.itemgetter(1)))
         return self.OPEN_TIME
@@ -415,24 +612,7 @@ class IQ_Option:
             return None
 
     def get_all_profit(self):
-        all_profit = nested_dict(2, dict)
-        init_info = self.get_all_init()
-        for actives in init_info["result"]["turbo"]["actives"]:
-            name = init_info["result"]["turbo"]["actives"][actives]["name"]
-            name = name[name.index(".") + 1:len(name)]
-            all_profit[name]["turbo"] = (
-                100.0 -
-                init_info["result"]["turbo"]["actives"][actives]["option"]["profit"][
-                    "commission"]) / 100.0
-
-        for actives in init_info["result"]["binary"]["actives"]:
-            name = init_info["result"]["binary"]["actives"][actives]["name"]
-            name = name[name.index(".") + 1:len(name)]
-            all_profit[name]["binary"] = (
-                100.0 -
-                init_info["result"]["binary"]["actives"][actives]["option"]["profit"][
-                    "commission"]) / 100.0
-        return all_profit
+        return all_profit_from_init(self.get_all_init())
 
     # ----------------------------------------
 
@@ -459,11 +639,11 @@ class IQ_Option:
     def get_currency(self):
         balances_raw = self.get_balances()
         for balance in balances_raw["msg"]:
-            if balance["id"] == global_value.balance_id:
+            if balance["id"] == self.state.balance_id:
                 return balance["currency"]
 
     def get_balance_id(self):
-        return global_value.balance_id
+        return self.state.balance_id
 
     """ def get_balance(self):
         self.api.profile.balance = None
@@ -482,7 +662,7 @@ class IQ_Option:
 
         balances_raw = self.get_balances()
         for balance in balances_raw["msg"]:
-            if balance["id"] == global_value.balance_id:
+            if balance["id"] == self.state.balance_id:
                 return balance["amount"]
 
     def get_balances(self):
@@ -496,7 +676,7 @@ class IQ_Option:
         # self.api.profile.balance_type=None
         profile = self.get_profile_ansyc()
         for balance in profile.get("balances"):
-            if balance["id"] == global_value.balance_id:
+            if balance["id"] == self.state.balance_id:
                 if balance["type"] == 1:
                     return "REAL"
                 elif balance["type"] == 4:
@@ -528,11 +708,11 @@ class IQ_Option:
 
     def change_balance(self, Balance_MODE):
         def set_id(b_id):
-            if global_value.balance_id != None:
+            if self.state.balance_id != None:
                 self.position_change_all(
-                    "unsubscribeMessage", global_value.balance_id)
+                    "unsubscribeMessage", self.state.balance_id)
 
-            global_value.balance_id = b_id
+            self.state.balance_id = b_id
 
             self.position_change_all("subscribeMessage", b_id)
 
@@ -596,18 +776,20 @@ class IQ_Option:
 
 
     def start_candles_stream(self, ACTIVE, size, maxdict):
+        """True when the stream is live and holds a reference the caller must stop; False otherwise."""
         if size == "all":
             for s in self.size:
                 self.full_realtime_get_candle(ACTIVE, s, maxdict)
                 self.api.real_time_candles_maxdict_table[ACTIVE][s] = maxdict
-            self.start_candles_all_size_stream(ACTIVE)
+            return bool(self.start_candles_all_size_stream(ACTIVE))
         elif size in self.size:
             self.api.real_time_candles_maxdict_table[ACTIVE][size] = maxdict
             self.full_realtime_get_candle(ACTIVE, size, maxdict)
-            self.start_candles_one_stream(ACTIVE, size)
+            return bool(self.start_candles_one_stream(ACTIVE, size))
 
         else:
             logging.error('**error** start_candles_stream please input right size')
+            return False
 
     def stop_candles_stream(self, ACTIVE, size):
         if size == "all":
@@ -650,14 +832,20 @@ class IQ_Option:
 
     # ------------------------Subscribe ONE SIZE-----------------------
     def start_candles_one_stream(self, ACTIVE, size):
-        if (str(ACTIVE + "," + str(size)) in self.subscribe_candle) == False:
-            self.subscribe_candle.append((ACTIVE + "," + str(size)))
+        key = ("candles", ACTIVE, int(size))
+        new = self.subscriptions.acquire(key)
+        if new is None:
+            return False
+        if not new and self._stream_confirmed(ACTIVE, size):
+            return True
         start = time.time()
         self.api.candle_generated_check[str(ACTIVE)][int(size)] = {}
         while True:
             if time.time() - start > 20:
                 logging.error(
                     '**error** start_candles_one_stream late for 20 sec')
+                # the caller sees False and never stops it: drop the reference taken above
+                self.subscriptions.release(key)
                 return False
             try:
                 if self.api.candle_generated_check[str(ACTIVE)][int(size)] == True:
@@ -673,29 +861,76 @@ class IQ_Option:
             time.sleep(1)
 
     def stop_candles_one_stream(self, ACTIVE, size):
-        if ((ACTIVE + "," + str(size)) in self.subscribe_candle) == True:
-            self.subscribe_candle.remove(ACTIVE + "," + str(size))
-        while True:
-            try:
-                if self.api.candle_generated_check[str(ACTIVE)][int(size)] == {}:
-                    return True
-            except:
-                pass
-            self.api.candle_generated_check[str(ACTIVE)][int(size)] = {}
-            self.api.unsubscribe(OP_code.ACTIVES[ACTIVE], size)
-            time.sleep(self.suspend * 10)
+        # the stream is only unsubscribed when no other consumer holds it
+        self.subscriptions.release(("candles", ACTIVE, int(size)))
+        return True
+
+    # ------------------------Subscribe AGGREGATED SIZES-----------------------
+
+    def _aggregation_base(self, sizes):
+        sizes = sorted(set(int(size) for size in sizes))
+        base = aggregation_base(sizes, self.size)
+        if base is None or not all(aligned(size) for size in sizes):
+            logging.error('**error** can not aggregate sizes {} from one stream'.format(sizes))
+            return sizes, None
+        return sizes, base
+
+    def start_candles_aggregated(self, ACTIVE, sizes, maxdict):
+        """
+        Real-time candles of several sizes from a single stream: only the largest size every
+        requested size is a multiple of is subscribed, the others are built locally into
+        get_realtime_candles(ACTIVE, size). Returns the streamed size, or False.
+        """
+        sizes, base = self._aggregation_base(sizes)
+        if base is None:
+            return False
+        aggregator = self.state.candle_aggregator
+        for size in sizes:
+            if size != base:
+                self.api.real_time_candles_maxdict_table[ACTIVE][size] = maxdict
+                self.full_realtime_get_candle(ACTIVE, size, maxdict)
+        # enough base history to rebuild the bar in progress of the largest size
+        base_maxdict = max(maxdict, sizes[-1] // base + 1)
+        self.api.real_time_candles_maxdict_table[ACTIVE][base] = base_maxdict
+        self.full_realtime_get_candle(ACTIVE, base, base_maxdict)
+        for size in sizes:
+            if size != base:
+                aggregator.add(ACTIVE, base, size, maxdict)
+        history = self.api.real_time_candles[ACTIVE][base]
+        for from_ in sorted(history):
+            aggregator.on_candle(ACTIVE, base, history[from_])
+        if not self.start_candles_one_stream(ACTIVE, base):
+            for size in sizes:
+                if size != base:
+                    aggregator.remove(ACTIVE, base, size)
+            return False
+        return base
+
+    def stop_candles_aggregated(self, ACTIVE, sizes):
+        sizes, base = self._aggregation_base(sizes)
+        if base is None:
+            return
+        for size in sizes:
+            if size != base:
+                self.state.candle_aggregator.remove(ACTIVE, base, size)
+        self.stop_candles_one_stream(ACTIVE, base)
 
     # ------------------------Subscribe ALL SIZE-----------------------
 
     def start_candles_all_size_stream(self, ACTIVE):
+        key = ("candles-all-size", str(ACTIVE), None)
+        new = self.subscriptions.acquire(key)
+        if new is None:
+            return False
+        if not new and self._stream_confirmed(ACTIVE, None):
+            return True
         self.api.candle_generated_all_size_check[str(ACTIVE)] = {}
-        if (str(ACTIVE) in self.subscribe_candle_all_size) == False:
-            self.subscribe_candle_all_size.append(str(ACTIVE))
         start = time.time()
         while True:
             if time.time() - start > 20:
                 logging.error('**error** fail ' + ACTIVE +
                               ' start_candles_all_size_stream late for 10 sec')
+                self.subscriptions.release(key)
                 return False
             try:
                 if self.api.candle_generated_all_size_check[str(ACTIVE)] == True:
@@ -711,17 +946,7 @@ class IQ_Option:
             time.sleep(1)
 
     def stop_candles_all_size_stream(self, ACTIVE):
-        if (str(ACTIVE) in self.subscribe_candle_all_size) == True:
-            self.subscribe_candle_all_size.remove(str(ACTIVE))
-        while True:
-            try:
-                if self.api.candle_generated_all_size_check[str(ACTIVE)] == {}:
-                    break
-            except:
-                pass
-            self.api.candle_generated_all_size_check[str(ACTIVE)] = {}
-            self.api.unsubscribe_all_size(OP_code.ACTIVES[ACTIVE])
-            time.sleep(self.suspend * 10)
+        self.subscriptions.release(("candles-all-size", str(ACTIVE), None))
 
     # ------------------------top_assets_updated---------------------------------------------
 
@@ -754,8 +979,8 @@ class IQ_Option:
     # -----------------traders_mood----------------------
 
     def start_mood_stream(self, ACTIVES, instrument="turbo-option"):
-        if ACTIVES in self.subscribe_mood == False:
-            self.subscribe_mood.append(ACTIVES)
+        if self.subscriptions.acquire(("traders-mood", ACTIVES, instrument)) is None:
+            return
 
         while True:
             self.api.subscribe_Traders_mood(
@@ -767,9 +992,7 @@ class IQ_Option:
                 time.sleep(5)
 
     def stop_mood_stream(self, ACTIVES, instrument="turbo-option"):
-        if ACTIVES in self.subscribe_mood == True:
-            del self.subscribe_mood[ACTIVES]
-        self.api.unsubscribe_Traders_mood(OP_code.ACTIVES[ACTIVES], instrument)
+        self.subscriptions.release(("traders-mood", ACTIVES, instrument))
 
     def get_traders_mood(self, ACTIVES):
         # return highter %
@@ -779,6 +1002,18 @@ class IQ_Option:
         # return highter %
         return self.api.traders_mood
 
+    def get_traders_mood_series(self, ACTIVES, seconds=None):
+        # [(ts, value)] received since start_mood_stream, local only
+        return self.state.analytics.mood_series(OP_code.ACTIVES[ACTIVES], seconds)
+
+    def get_live_deal_stats(self, ACTIVES, window=60):
+        """
+        Deals seen on the subscribed live-deal streams of ACTIVES over the last window seconds
+        (10, 60 or 300): {"deals", "amount", "call_amount", "put_amount", "call_ratio"}.
+        Computed locally, no request is sent.
+        """
+        return self.state.analytics.deal_stats(OP_code.ACTIVES[ACTIVES], window)
+
 ##############################################################################################
 
     # -----------------technical_indicators----------------------
@@ -790,6 +1025,24 @@ class IQ_Option:
             pass
         return self.api.technical_indicators[request_id]
 
+    # local indicators: computed from the real-time candles, no request is sent.
+    # spec: "sma:20", "ema:9", "rsi:14", "bollinger:20:2", "atr:14", "stochastic:14:3", "macd:12:26:9"
+    def add_indicator(self, ACTIVE, size, spec):
+        """
+        Keep spec updated for ACTIVE/size (shared by every caller), warmed up on the candles
+        already in get_realtime_candles. The candles must be streamed (start_candles_stream or
+        start_candles_aggregated) for the value to follow the market. Match every call with
+        one remove_indicator: the indicator lives while any caller still uses it.
+        """
+        history = list(self.api.real_time_candles[ACTIVE][int(size)].values())
+        return self.state.indicators.add(ACTIVE, int(size), spec, history)
+
+    def get_indicator(self, ACTIVE, size, spec):
+        return self.state.indicators.value(ACTIVE, int(size), spec)
+
+    def remove_indicator(self, ACTIVE, size, spec):
+        self.state.indicators.remove(ACTIVE, int(size), spec)
+
 ##############################################################################################
 
 
@@ -837,8 +1090,8 @@ class IQ_Option:
                     break
             except:
                 pass
-        x = self.api.socket_option_closed[id_number]
-        return x['msg']['win'], (0 if x['msg']['win'] == 'equal' else float(x['msg']['sum']) * -1 if x['msg']['win'] == 'loose' else float(x['msg']['win_amount']) - float(x['msg']['sum']))
+        self.pending_option_ids.discard(id_number)
+        return option_closed_result(self.api.socket_option_closed[id_number])
 
     def check_win_v3(self, id_number):
         while True:
@@ -895,26 +1148,45 @@ class IQ_Option:
     # __________________FOR OPTION____________________________
 
     def buy_multi(self, price, ACTIVES, ACTION, expirations):
-        self.api.buy_multi_option = {}
         if len(price) == len(ACTIVES) == len(ACTION) == len(expirations):
-            buy_len = len(price)
-            for idx in range(buy_len):
-                self.api.buyv3(
-                    price[idx], OP_code.ACTIVES[ACTIVES[idx]], ACTION[idx], expirations[idx], idx)
-            while len(self.api.buy_multi_option) < buy_len:
-                pass
-            buy_id = []
-            for key in sorted(self.api.buy_multi_option.keys()):
-                try:
-                    value = self.api.buy_multi_option[str(key)]
-                    buy_id.append(value["id"])
-                except:
-                    buy_id.append(None)
-
-            return buy_id
+            results = self.buy_batch(list(zip(price, ACTIVES, ACTION, expirations)))
+            return [id if check else None for check, id, _, _ in results]
         else:
             logging.error('buy_multi error please input all same len')
 
+    def buy_batch(self, orders, timeout=15):
+        """
+        Place several binary/turbo orders back to back on the socket and collect the answers
+        afterwards. orders: [(price, ACTIVES, ACTION, expirations), ...].
+        Returns, in the same order, [(check, option_id or reason, sent_ts, ack_ts), ...].
+        """
+        pending = []
+        for price, active, action, expirations in orders:
+            order = self.state.orders.open()
+            try:
+                self.api.buyv3(
+                    float(price), OP_code.ACTIVES[active], str(action), int(expirations), order.request_id)
+            except Exception as e:
+                self.state.orders.close(order)
+                pending.append((order, time.time(), str(e)))
+                continue
+            pending.append((order, time.time(), None))
+
+        deadline = time.time() + timeout
+        results = []
+        for order, sent_ts, error in pending:
+            if error is not None:
+                results.append((False, error, sent_ts, None))
+            elif not self.state.orders.wait(order, max(deadline - time.time(), 0)):
+                logging.error('**warning** buy_batch {} late {} sec'.format(order.request_id, timeout))
+                results.append((False, "Timeout", sent_ts, None))
+            elif not order.accepted:
+                results.append((False, order.message, sent_ts, order.completed_at))
+            else:
+                self.pending_option_ids.add(order.option_id)
+                results.append((True, order.option_id, sent_ts, order.completed_at))
+        return results
+
     def get_remaning(self, duration):
         for remaning in get_remaning_time(self.api.timesync.server_timestamp):
             if remaning[0] == duration:
@@ -923,65 +1195,30 @@ class IQ_Option:
         return "ERROR duration"
 
     def buy_by_raw_expirations(self, price, active, direction, option, expired):
-
-        self.api.buy_multi_option = {}
-        self.api.buy_successful = None
-        req_id = "buyraw"
-        try:
-            self.api.buy_multi_option[req_id]["id"] = None
-        except:
-            pass
+        order = self.state.orders.open()
         self.api.buyv3_by_raw_expired(
-            price, OP_code.ACTIVES[active], direction, option, expired, request_id=req_id)
-        start_t = time.time()
-        id = None
-        self.api.result = None
-        while self.api.result == None or id == None:
-            try:
-                if "message" in self.api.buy_multi_option[req_id].keys():
-                    logging.error(
-                        '**warning** buy' + str(self.api.buy_multi_option[req_id]["message"]))
-                    return False, self.api.buy_multi_option[req_id]["message"]
-            except:
-                pass
-            try:
-                id = self.api.buy_multi_option[req_id]["id"]
-            except:
-                pass
-            if time.time() - start_t >= 5:
-                logging.error('**warning** buy late 5 sec')
-                return False, None
-
-        return self.api.result, self.api.buy_multi_option[req_id]["id"]
+            price, OP_code.ACTIVES[active], direction, option, expired, request_id=order.request_id)
+        if not self.state.orders.wait(order, 5):
+            logging.error('**warning** buy late 5 sec')
+            return False, None
+        if not order.accepted:
+            logging.error('**warning** buy' + str(order.message))
+            return False, order.message
+        self.pending_option_ids.add(order.option_id)
+        return True, order.option_id
 
     def buy(self, price, ACTIVES, ACTION, expirations, timeout=15):
-        self.api.buy_multi_option = {}
-        self.api.buy_successful = None
-        req_id = str(randint(0, 10000))
-        try:
-            self.api.buy_multi_option[req_id]["id"] = None
-        except:
-            pass
+        # each call waits on its own PendingOrder, so concurrent buys never share response fields
+        order = self.state.orders.open()
         self.api.buyv3(
-            float(price), OP_code.ACTIVES[ACTIVES], str(ACTION), int(expirations), req_id)
-        start_t = time.time()
-        id = None
-        self.api.result = None
-        while self.api.result == None or id == None:
-            try:
-                if "message" in self.api.buy_multi_option[req_id].keys():
-                    return False, self.api.buy_multi_option[req_id]["message"]
-            except:
-                pass
-            try:
-                id = self.api.buy_multi_option[req_id]["id"]
-            except:
-                pass
-            if time.time() - start_t >= timeout:
-                logging.error(f'**warning** buy late {timeout} sec')
-                return False, "Timeout" # Retorna "Timeout" para ser mais específico
-
-        return self.api.result, self.api.buy_multi_option[req_id]["id"]
+            float(price), OP_code.ACTIVES[ACTIVES], str(ACTION), int(expirations), order.request_id)
+        if not self.state.orders.wait(order, timeout):
+            logging.error(f'**warning** buy late {timeout} sec')
+            return False, "Timeout" # Retorna "Timeout" para ser mais específico
+        if not order.accepted:
+            return False, order.message
+        self.pending_option_ids.add(order.option_id)
+        return True, order.option_id
 
     def sell_option(self, options_ids):
         self.api.sell_option(options_ids)
@@ -1554,11 +1791,34 @@ class IQ_Option:
             time.sleep(1)
         """
 
-    def set_digital_live_deal_cb(self, cb):
-        self.api.digital_live_deal_cb = cb
+    # Live-deal callbacks run on a fixed pool of worker threads (see configure_live_deal_callbacks).
+    # With batch_ms the callback gets a single argument instead: the list of deal dicts received
+    # during the last batch_ms milliseconds.
+    def set_live_deal_cb(self, cb, batch_ms=None):
+        self.state.deal_callbacks.set("live-deal", cb, batch_ms)
+
+    def set_digital_live_deal_cb(self, cb, batch_ms=None):
+        self.state.deal_callbacks.set("live-deal-digital-option", cb, batch_ms)
+
+    def set_binary_live_deal_cb(self, cb, batch_ms=None):
+        self.state.deal_callbacks.set("live-deal-binary-option-placed", cb, batch_ms)
+
+    def configure_live_deal_callbacks(self, workers=2, maxsize=1000, policy=DROP_OLDEST):
+        """
+        Size of the callback pool and what happens when consumers fall behind: "drop_oldest"
+        discards the oldest queued deal, "coalesce" keeps only the latest queued deal per
+        active/type. Call before setting the callbacks.
+        """
+        self.state.deal_callbacks.executor.stop()
+        self.state.deal_callbacks.executor = CallbackExecutor(workers, maxsize, policy)
+
+    def get_store_metrics(self):
+        """Size and expired/evicted counters of each per-request response map of this connection."""
+        return self.state.store_metrics()
 
-    def set_binary_live_deal_cb(self, cb):
-        self.api.binary_live_deal_cb = cb
+    def get_live_deal_callback_stats(self):
+        """Counters of the callback pool: submitted, dropped, coalesced, failed, queued, batch_dropped."""
+        return self.state.deal_callbacks.stats()
 
     def get_live_deal(self, name, active, _type):
         return self.api.live_deal_data[name][active][_type]
@@ -1602,16 +1862,24 @@ class IQ_Option:
         return self.api.users_availability
 
     def get_digital_payout(self, active, seconds=0):
-        self.api.digital_payout = None
+        # the price splitter stays subscribed (idle) after the call, so the next call for the
+        # same asset reads the streamed payout instead of subscribing again
         asset_id = OP_code.ACTIVES[active]
-        self.api.subscribe_digital_price_splitter(asset_id)
-
-        start = time.time()
-        while self.api.digital_payout is None:
-            if seconds and int(time.time() - start) > seconds:
-                break
-        self.api.unsubscribe_digital_price_splitter(asset_id)
-        return self.api.digital_payout if self.api.digital_payout else 75
+        key = ("price-splitter", asset_id, None)
+        new = self.subscriptions.acquire(key)
+        if new is None:
+            return 75
+        try:
+            if new:
+                self.api.subscribe_digital_price_splitter(asset_id)
+            start = time.time()
+            while self.state.digital_payouts.get(asset_id) is None:
+                if seconds and int(time.time() - start) > seconds:
+                    break
+                time.sleep(0.01)
+            return self.state.digital_payouts.get(asset_id) or 75
+        finally:
+            self.subscriptions.release(key, keep_idle=True)
         
     def logout(self):
         self.api.logout()
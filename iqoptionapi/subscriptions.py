@@ -0,0 +1,95 @@
+# python
+"""Reference-counted market-data subscriptions of one connection."""
+import logging
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_STREAMS = 100
+
+
+class SubscriptionManager(object):
+    """
+    One entry per stream key, e.g. ("candles", "EURUSD", 60), ("candles-all-size", "EURUSD", None),
+    ("traders-mood", "EURUSD", "turbo-option") or ("price-splitter", 1, None), with the number of
+    consumers holding it. A stream released by its last consumer can stay subscribed (idle) for
+    the next one; idle streams are unsubscribed least recently used first when the cap on
+    concurrent streams is reached. The keys are what gets re-subscribed after a reconnect.
+    """
+
+    def __init__(self, unsubscribe, max_streams=DEFAULT_MAX_STREAMS):
+        self._unsubscribe = unsubscribe  # unsubscribe(key): sends the unsubscribe frame
+        self.max_streams = max_streams
+        self._refs = OrderedDict()  # key -> consumers; idle keys (0) in release order
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def acquire(self, key):
+        """
+        Take a reference on key. True: new stream, the caller sends the subscribe; False: the
+        stream is already live; None: cap reached with no idle stream to evict.
+        """
+        evicted = None
+        with self._lock:
+            refs = self._refs.get(key)
+            if refs is not None:
+                self._refs[key] = refs + 1
+                if refs == 0:
+                    self._refs.move_to_end(key)
+                return False
+            if self.max_streams and len(self._refs) >= self.max_streams:
+                evicted = next((k for k, n in self._refs.items() if n == 0), None)
+                if evicted is None:
+                    logging.error('**error** subscription limit of {} streams reached, {} refused'.format(
+                        self.max_streams, key))
+                    return None
+                del self._refs[evicted]
+                self.evicted += 1
+            self._refs[key] = 1
+        if evicted is not None:
+            self._safe_unsubscribe(evicted)
+        return True
+
+    def release(self, key, keep_idle=False):
+        """
+        Drop a reference on key. When it was the last one the stream is unsubscribed, or kept
+        idle for reuse with keep_idle. Returns True if the stream was unsubscribed.
+        """
+        with self._lock:
+            refs = self._refs.get(key)
+            if not refs:
+                return False
+            if refs > 1:
+                self._refs[key] = refs - 1
+                return False
+            if keep_idle:
+                self._refs[key] = 0
+                self._refs.move_to_end(key)
+                return False
+            del self._refs[key]
+        self._safe_unsubscribe(key)
+        return True
+
+    def _safe_unsubscribe(self, key):
+        try:
+            self._unsubscribe(key)
+        except Exception as e:
+            logging.error('**error** unsubscribe {}: {}'.format(key, e))
+
+    def is_live(self, key):
+        with self._lock:
+            return key in self._refs
+
+    def refs(self, key):
+        with self._lock:
+            return self._refs.get(key, 0)
+
+    def keys(self, channel=None):
+        """Subscribed keys (held and idle), optionally of one channel."""
+        with self._lock:
+            return [key for key in self._refs if channel is None or key[0] == channel]
+
+    def stats(self):
+        with self._lock:
+            idle = sum(1 for n in self._refs.values() if n == 0)
+            return {"streams": len(self._refs), "idle": idle, "max_streams": self.max_streams,
+                    "evicted": self.evicted}
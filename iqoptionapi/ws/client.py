@@ -1,10 +1,10 @@
 """Module for IQ option websocket."""
 
 import json
+import time
 import logging
 import websocket
 import iqoptionapi.constants as OP_code
-import iqoptionapi.global_value as global_value
 from threading import Thread
 from iqoptionapi.ws.received.technical_indicators import technical_indicators
 from iqoptionapi.ws.received.time_sync import time_sync
@@ -74,7 +74,7 @@ class WebsocketClient(object):
         self.wss = websocket.WebSocketApp(
             self.api.wss_url, on_message=self.on_message,
             on_error=self.on_error, on_close=self.on_close,
-            on_open=self.on_open)
+            on_open=self.on_open, on_pong=self.on_pong)
 
     def dict_queue_add(self, dict, maxdict, key1, key2, key3, value):
         if key3 in dict[key1][key2]:
@@ -93,22 +93,17 @@ class WebsocketClient(object):
                     del dict[key1][key2][sorted(
                         dict[key1][key2].keys(), reverse=False)[0]]
 
-    def api_dict_clean(self, obj):
-        if len(obj) > 5000:
-            for k in obj.keys():
-                del obj[k]
-                break
-
     def on_message(self, wss, message):  # pylint: disable=unused-argument
         """Method to process websocket messages."""
-        global_value.ssl_Mutual_exclusion = True
+        self.api.state.ssl_Mutual_exclusion = True
+        self.api.last_frame_ts = time.time()
         logger = logging.getLogger(__name__)
         logger.debug(message)
 
         message = json.loads(str(message))
 
 
-        technical_indicators(self.api, message, self.api_dict_clean)
+        technical_indicators(self.api, message)
         time_sync(self.api, message)
         heartbeat(self.api, message)
         balances(self.api, message)
@@ -151,7 +146,7 @@ class WebsocketClient(object):
         sold_options(self.api, message)
         tpsl_changed(self.api, message)
         auto_margin_call_changed(self.api, message)
-        digital_option_placed(self.api, message, self.api_dict_clean)
+        digital_option_placed(self.api, message)
         result(self.api, message)
         instrument_quotes_generated(self.api, message)
         training_balance_reset(self.api, message)
@@ -165,26 +160,38 @@ class WebsocketClient(object):
         users_availability(self.api, message)
         client_price_generated(self.api, message)
 
-        global_value.ssl_Mutual_exclusion = False
+        self.api.state.ssl_Mutual_exclusion = False
+
+        for listener in self.api.state.frame_listeners:
+            try:
+                listener(message)
+            except Exception as e:
+                logger.error('frame listener failed: {}'.format(e))
+
+    def on_pong(self, wss, data):  # pylint: disable=unused-argument
+        """Method to process websocket pong (answer to IQOptionAPI.ping)."""
+        now = time.time()
+        self.api.last_frame_ts = now
+        try:
+            self.api.rtt_samples.append(now - float(data))
+        except (TypeError, ValueError):
+            pass
 
-    @staticmethod
-    def on_error(wss, error):  # pylint: disable=unused-argument
+    def on_error(self, wss, error):  # pylint: disable=unused-argument
         """Method to process websocket errors."""
         logger = logging.getLogger(__name__)
         logger.error(error)
-        global_value.websocket_error_reason = str(error)
-        global_value.check_websocket_if_error = True
+        self.api.state.websocket_error_reason = str(error)
+        self.api.state.check_websocket_if_error = True
 
-    @staticmethod
-    def on_open(wss):  # pylint: disable=unused-argument
+    def on_open(self, wss):  # pylint: disable=unused-argument
         """Method to process websocket open."""
         logger = logging.getLogger(__name__)
         logger.debug("Websocket client connected.")
-        global_value.check_websocket_if_connect = 1
+        self.api.state.check_websocket_if_connect = 1
 
-    @staticmethod
-    def on_close(wss):  # pylint: disable=unused-argument
+    def on_close(self, wss, *args):  # pylint: disable=unused-argument
         """Method to process websocket close."""
         logger = logging.getLogger(__name__)
         logger.debug("Websocket connection closed.")
-        global_value.check_websocket_if_connect = 0
+        self.api.state.check_websocket_if_connect = 0
@@ -6,10 +6,10 @@ from iqoptionapi.ws.objects.base import Base
 class ListInfoData(Base):
     """Class for IQ Option Candles websocket object."""
 
-    def __init__(self):
+    def __init__(self, store=None):
         super(ListInfoData, self).__init__()
         self.__name = "listInfoData"
-        self.listinfodata_dict = {}
+        self.listinfodata_dict = {} if store is None else store
 #--------------------
     def set(self,win,game_state,id_number):
         self.listinfodata_dict[id_number]={"win":win,"game_state":game_state}
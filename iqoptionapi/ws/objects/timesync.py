@@ -4,6 +4,7 @@ import time
 import datetime
 
 from iqoptionapi.ws.objects.base import Base
+from iqoptionapi.server_clock import ServerClock
 
 
 class TimeSync(Base):
@@ -14,23 +15,28 @@ class TimeSync(Base):
         self.__name = "timeSync"
         self.__server_timestamp = time.time()
         self.__expiration_time = 1
+        self.clock = ServerClock()
 
     @property
     def server_timestamp(self):
         """Property to get server timestamp.
 
-        :returns: The server timestamp.
+        :returns: The server timestamp, interpolated between timeSync frames once the clock is synced.
         """
         while self.__server_timestamp==None:
             time.sleep(0.2)
             pass
 
+        if self.clock.synced:
+            return self.clock.server_now()
         return self.__server_timestamp / 1000
 
     @server_timestamp.setter
     def server_timestamp(self, timestamp):
-        """Method to set server timestamp."""
+        """Method to set server timestamp (in ms, as sent by timeSync)."""
         self.__server_timestamp = timestamp
+        if timestamp is not None:
+            self.clock.add_sample(timestamp)
 
     @property
     def server_datetime(self):
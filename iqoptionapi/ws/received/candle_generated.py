@@ -1,6 +1,5 @@
 """Module for IQ option websocket."""
 import iqoptionapi.constants as OP_code
-import iqoptionapi.global_value as global_value
 
 def candle_generated_realtime(api, message, dict_queue_add):
     if message["name"] == "candle-generated":
@@ -15,4 +14,7 @@ def candle_generated_realtime(api, message, dict_queue_add):
 
         dict_queue_add(api.real_time_candles,
                             maxdict, active, size, from_, msg)
-        api.candle_generated_check[active][size] = True
\ No newline at end of file
+        api.candle_generated_check[active][size] = True
+        api.state.candle_aggregator.on_candle(active, size, msg)
+        for listener in api.state.candle_listeners:
+            listener(active, size, msg)
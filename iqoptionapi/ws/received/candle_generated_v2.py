@@ -17,5 +17,7 @@ def candle_generated_v2(api, message, dict_queue_add):
             maxdict = api.real_time_candles_maxdict_table[Active_name][size]
             msg = v
             dict_queue_add(api.real_time_candles, maxdict, active, size, from_, msg)
+            for listener in api.state.candle_listeners:
+                listener(active, size, msg)
 
         api.candle_generated_all_size_check[active] = True
\ No newline at end of file
@@ -1,25 +1,25 @@
 """Module for IQ option websocket."""
 import iqoptionapi.constants as OP_code
-from threading import Thread
+
 
 def live_deal_binary_option_placed(api, message):
     if message["name"] == "live-deal-binary-option-placed":
-        # name = message["name"]
-        active_id = message["msg"]["active_id"]
-        active = list(OP_code.ACTIVES.keys())[
-            list(OP_code.ACTIVES.values()).index(active_id)]
-        _type = message["msg"]["option_type"]
+        msg = message["msg"]
+        active_id = msg["active_id"]
+        api.state.analytics.on_deal(active_id, msg.get("amount_enrolled", 0),
+                                    msg.get("direction", msg.get("instrument_dir")))
+        callbacks = api.state.deal_callbacks
+        if not callbacks.has("live-deal-binary-option-placed"):
+            return
         try:
-            # self.api.live_deal_data[name][active][_type].appendleft(
-            #     message["msg"])
-            if hasattr(api.binary_live_deal_cb, '__call__'):
-                cb_data = {
-                    "active": active,
-                    **message["msg"]
-                }
-                realbinary = Thread(target=api.binary_live_deal_cb,
-                                    kwargs=(cb_data))
-                realbinary.daemon = True
-                realbinary.start()
-        except:
-            pass
\ No newline at end of file
+            active = list(OP_code.ACTIVES.keys())[
+                list(OP_code.ACTIVES.values()).index(active_id)]
+        except ValueError:
+            return
+        _type = msg["option_type"]
+        cb_data = {
+            "active": active,
+            **msg
+        }
+        # runs on the connection's bounded callback pool (coalesced per active/type if configured)
+        callbacks.dispatch("live-deal-binary-option-placed", cb_data, key=(active, _type))
@@ -1,25 +1,25 @@
 """Module for IQ option websocket."""
 import iqoptionapi.constants as OP_code
-from threading import Thread
+
 
 def live_deal_digital_option(api, message):
     if message["name"] == "live-deal-digital-option":
-        # name = message["name"]
-        active_id = message["msg"]["instrument_active_id"]
-        active = list(OP_code.ACTIVES.keys())[
-            list(OP_code.ACTIVES.values()).index(active_id)]
-        _type = message["msg"]["expiration_type"]
+        msg = message["msg"]
+        active_id = msg["instrument_active_id"]
+        api.state.analytics.on_deal(active_id, msg.get("amount_enrolled", 0),
+                                    msg.get("instrument_dir", msg.get("direction")))
+        callbacks = api.state.deal_callbacks
+        if not callbacks.has("live-deal-digital-option"):
+            return
         try:
-            # self.api.live_deal_data[name][active][_type].appendleft(
-            #     message["msg"])
-            if hasattr(api.digital_live_deal_cb, '__call__'):
-                cb_data = {
-                    "active": active,
-                    **message["msg"]
-                }
-                realdigital = Thread(target=api.digital_live_deal_cb,
-                                        kwargs=(cb_data))
-                realdigital.daemon = True
-                realdigital.start()
-        except:
-            pass
\ No newline at end of file
+            active = list(OP_code.ACTIVES.keys())[
+                list(OP_code.ACTIVES.values()).index(active_id)]
+        except ValueError:
+            return
+        _type = msg["expiration_type"]
+        cb_data = {
+            "active": active,
+            **msg
+        }
+        # runs on the connection's bounded callback pool (coalesced per active/type if configured)
+        callbacks.dispatch("live-deal-digital-option", cb_data, key=(active, _type))
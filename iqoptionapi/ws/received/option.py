@@ -2,4 +2,5 @@
 
 def option(api, message):
     if message["name"] == "option":
-        api.buy_multi_option[str(message["request_id"])] = message["msg"]
\ No newline at end of file
+        if not api.state.orders.on_option(message.get("request_id"), message["msg"]):
+            api.buy_multi_option[str(message["request_id"])] = message["msg"]
\ No newline at end of file
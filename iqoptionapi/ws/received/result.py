@@ -2,4 +2,5 @@
 
 def result(api, message):
     if message["name"] == "result":
-        api.result = message["msg"]["success"]
\ No newline at end of file
+        if not api.state.orders.on_result(message.get("request_id"), message["msg"]):
+            api.result = message["msg"]["success"]
\ No newline at end of file
@@ -2,4 +2,5 @@
 
 def traders_mood_changed(api, message):
     if message["name"] == "traders-mood-changed":
-        api.traders_mood[message["msg"]["asset_id"]] = message["msg"]["value"]
\ No newline at end of file
+        api.traders_mood[message["msg"]["asset_id"]] = message["msg"]["value"]
+        api.state.analytics.on_mood(message["msg"]["asset_id"], message["msg"]["value"])
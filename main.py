@@ -2,7 +2,7 @@
 import tkinter.font
 
 from ui.app import App
-from utils.logger import setup_loggers
+from utils.logger import setup_loggers, shutdown_loggers
 import logging
 
 if __name__ == "__main__":
@@ -21,3 +21,4 @@ if __name__ == "__main__":
         root_logger.critical(f"Erro fatal na aplicação: {e}", exc_info=True)
         
     root_logger.info("Aplicação finalizada.\n")
+    shutdown_loggers()
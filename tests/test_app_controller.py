@@ -3,6 +3,9 @@ import unittest
 from unittest.mock import MagicMock, patch, call
 import sys
 import os
+import base64
+import json
+import threading
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -92,6 +95,48 @@ class TestAppController(unittest.TestCase):
         mock_signal_list_strategy_class.assert_not_called()
         self.mock_ui_callbacks['show_popup'].assert_called_with("Erro", "Nenhum arquivo de sinais foi carregado.")
 
+    @patch.object(AppController, '_update_strategy_status_bar')
+    @patch.object(AppController, '_setup_management')
+    def test_plugins_invalidos_nao_impedem_a_estrategia_principal(self, *_):
+        self.mock_config_manager.get_all_settings.return_value = {'estrategias_plugins': 'rsi:EURUSD'}
+        self.controller.start_bot(strategy_name="Sinal MT4", selected_pair=None, signals=[])
+
+        self.assertIsNone(self.controller.market_bus)
+        mock_mt4_strategy_class.return_value.start.assert_called_once()
+        titulo, _ = self.mock_ui_callbacks['show_popup'].call_args[0]
+        self.assertEqual(titulo, "Aviso")
+
+    @patch.object(AppController, '_update_strategy_status_bar')
+    @patch.object(AppController, '_setup_management')
+    def test_plugins_invalidos_abortam_o_barramento(self, *_):
+        self.mock_config_manager.get_all_settings.return_value = {'estrategias_plugins': 'rsi:EURUSD'}
+        self.controller.start_bot(strategy_name="Plugins (Barramento)", selected_pair=None, signals=[])
+
+        self.assertIsNone(self.controller.strategy)
+        titulo, _ = self.mock_ui_callbacks['show_popup'].call_args[0]
+        self.assertEqual(titulo, "Erro de Configuração")
+
+    @patch('bot.app_controller.TIMEOUT_CONEXAO_COPIA', 0.2)
+    def test_conta_de_copia_travada_fica_de_fora(self):
+        liberar, desconectada = threading.Event(), threading.Event()
+        def criar_core(**kwargs):
+            core = MagicMock(is_connected=True)
+            if kwargs['credentials']['email'] == 'lenta@b.com':
+                core.connect.side_effect = lambda: liberar.wait(5) # connect travado
+                core.disconnect.side_effect = desconectada.set
+            return core
+        mock_bot_core_class.side_effect = criar_core
+        self.addCleanup(setattr, mock_bot_core_class, 'side_effect', None)
+        senha = base64.b64encode(b"x").decode()
+        contas = json.dumps([{"nome": "rapida", "email": "rapida@b.com", "senha": senha},
+                             {"nome": "lenta", "email": "lenta@b.com", "senha": senha}])
+
+        self.controller._conectar_contas_copia({'contas_copia': contas})
+        self.assertEqual(list(self.controller.copy_executor.cores), ["principal", "rapida"])
+
+        liberar.set() # Conecta depois do prazo: é desconectada
+        self.assertTrue(desconectada.wait(2))
+
     def test_stop_bot_stops_strategy_and_workers(self):
         """Test the stop_bot functionality."""
         # Simulate a running strategy
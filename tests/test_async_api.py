@@ -0,0 +1,116 @@
+
+import unittest
+import asyncio
+import threading
+import time
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import iqoptionapi.constants as OP_code
+from iqoptionapi.async_api import AsyncIQOption, AsyncIQOptionAdapter, shared_loop
+from iqoptionapi.ws.received.option import option
+from iqoptionapi.ws.received.result import result
+
+def frame_from_ws_thread(client, message):
+    """Entrega um frame como a thread do websocket faria: handlers e depois os listeners."""
+    def on_message():
+        option(client.sync.api, message)
+        result(client.sync.api, message)
+        client._on_frame(message)
+    t = threading.Thread(target=on_message)
+    t.start()
+    t.join()
+
+class TestAsyncIQOption(unittest.TestCase):
+
+    def setUp(self):
+        self.client = AsyncIQOption("a@b.com", "pw")
+        self.api = MagicMock()
+        self.api.buy_multi_option = {}
+        self.api.socket_option_closed = {}
+        self.api.state = self.client.sync.state
+        self.client.sync.api = self.api
+
+    def run_async(self, coro):
+        async def bound():
+            self.client.loop = asyncio.get_running_loop()
+            return await coro
+        return asyncio.run(bound())
+
+    def test_buy_resolves_from_the_option_frame(self):
+        def buyv3(price, active, direction, duration, req_id):
+            frame_from_ws_thread(self.client, {"name": "option", "request_id": req_id, "msg": {"id": 555}})
+        self.api.buyv3.side_effect = buyv3
+        self.assertEqual(self.run_async(self.client.buy(2, "EURUSD", "call", 1)), (True, 555))
+        self.assertIn(555, self.client.sync.pending_option_ids)
+        self.assertEqual(self.client.sync.state.orders.in_flight(), 0)
+
+    def test_buy_rejection_and_timeout(self):
+        self.api.buyv3.side_effect = lambda *a: frame_from_ws_thread(
+            self.client, {"name": "option", "request_id": a[-1], "msg": {"message": "Time for purchasing options is over"}})
+        self.assertEqual(self.run_async(self.client.buy(2, "EURUSD", "call", 1)), (False, "Time for purchasing options is over"))
+        self.api.buyv3.side_effect = None
+        self.assertEqual(self.run_async(self.client.buy(2, "EURUSD", "call", 1, timeout=0.05)), (False, "Timeout"))
+
+    def test_many_result_waits_resolve_independently(self):
+        closed = lambda i, win: {"name": "socket-option-closed", "msg": {"id": i, "win": win, "sum": 2, "win_amount": 3.75}}
+        self.api.socket_option_closed[1] = closed(1, "win") # Resultado chegou antes do await
+
+        async def scenario():
+            waits = [asyncio.ensure_future(self.client.wait_result(i)) for i in range(1, 1001)]
+            await asyncio.sleep(0)
+            for i in range(2, 1001):
+                self.client._on_frame(closed(i, "loose"))
+            return await asyncio.gather(*waits)
+
+        results = self.run_async(scenario())
+        self.assertEqual(results[0], ("win", 1.75))
+        self.assertEqual(results[-1], ("loose", -2.0))
+        self.assertEqual(len(results), 1000)
+
+    def test_concurrent_payout_requests_share_one_subscription(self):
+        asset_id = OP_code.ACTIVES["EURUSD"]
+        prices = {"name": "client-price-generated", "msg": {"asset_id": asset_id, "prices": [{"strike": "SPT", "call": {"ask": 50}}]}}
+        self.api.subscribe_digital_price_splitter.side_effect = lambda _id: frame_from_ws_thread(self.client, prices)
+
+        async def scenario():
+            return await asyncio.gather(*[self.client.get_digital_payout("EURUSD") for _ in range(5)])
+
+        self.assertEqual(self.run_async(scenario()), [100] * 5)
+        self.api.subscribe_digital_price_splitter.assert_called_once_with(asset_id)
+        # A assinatura fica ociosa para a próxima consulta, sem cancelar
+        self.api.unsubscribe_digital_price_splitter.assert_not_called()
+        self.assertEqual(self.client.sync.get_subscription_stats()["idle"], 1)
+
+    def test_adapter_runs_calls_on_the_shared_loop(self):
+        adapter = AsyncIQOptionAdapter("a@b.com", "pw")
+        adapter.client.loop = shared_loop()
+        self.api.state = adapter.client.sync.state
+        adapter.client.sync.api = self.api
+        self.api.buyv3.side_effect = lambda *a: frame_from_ws_thread(
+            adapter.client, {"name": "option", "request_id": a[-1], "msg": {"id": 7}})
+        self.assertEqual(adapter.buy(1, "EURUSD", "put", 1), (True, 7))
+        self.assertIs(adapter.pending_option_ids, adapter.client.sync.pending_option_ids) # Demais chamadas vão ao IQ_Option
+
+    def test_adapter_result_wait_times_out_and_respects_stop(self):
+        stop_event = threading.Event()
+        adapter = AsyncIQOptionAdapter("a@b.com", "pw", stop_event=stop_event)
+        adapter.client.loop = shared_loop()
+        adapter.client.sync.api = self.api
+
+        # Frame de fechamento perdido: falha no formato que o IQBotCore já trata, sem travar
+        self.assertEqual(adapter.check_win_v4(99, timeout=0.05), (None, None))
+
+        stop_event.set()
+        started = time.monotonic()
+        self.assertEqual(adapter.check_win_v4(99, timeout=60), (None, None))
+        self.assertLess(time.monotonic() - started, 2)
+
+        self.api.socket_option_closed[99] = {"name": "socket-option-closed", "msg": {"id": 99, "win": "win", "sum": 2, "win_amount": 3.75}}
+        self.assertEqual(adapter.check_win_v4(99), ("win", 1.75))
+
+if __name__ == '__main__':
+    unittest.main()
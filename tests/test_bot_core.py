@@ -53,9 +53,9 @@ class TestBotCore(unittest.TestCase):
         self.patcher_thread.stop()
         self.patcher_queue.stop()
 
-    def thread_side_effect(self, target, daemon=True):
+    def thread_side_effect(self, target, daemon=True, args=(), kwargs=None):
         thread = MagicMock(target=target, daemon=daemon)
-        thread.start = target # Run synchronously
+        thread.start = lambda: target(*args, **(kwargs or {})) # Run synchronously
         self.threads.append(thread)
         return thread
 
@@ -70,6 +70,17 @@ class TestBotCore(unittest.TestCase):
         item = self.bot.trade_queue.get_nowait()
         self.assertEqual(item, ('EURUSD', 'call', 1, {'id': 1}))
 
+    def test_sinal_substituido_recebe_ack_de_duplicata(self):
+        self.bot.is_running = True
+        self.bot.ack_callback = MagicMock()
+        self.bot.ingress.configure(60, 'last_wins')
+        self.bot.executar_trade('EURUSD', 'call', 1, {'signal_id': 1})
+        self.bot.executar_trade('EURUSD', 'call', 1, {'signal_id': 2})
+
+        info = self.bot.ack_callback.call_args[0][0]
+        self.assertEqual((info['context']['signal_id'], info['aceita'], info['reason']), (1, False, 'duplicate'))
+        self.assertEqual(self.bot.trade_queue.qsize(), 1)
+
     @patch('time.sleep', return_value=None) # Prevent sleeping
     def test_trade_executor_loop_happy_path(self, mock_sleep):
         """Test the full processing of a single successful trade from the queue."""
@@ -110,6 +121,13 @@ class TestBotCore(unittest.TestCase):
         self.mock_log.assert_not_called("STOP WIN ATINGIDO", "STOP")
         self.mock_log.assert_not_called("STOP LOSS ATINGIDO", "STOP")
 
+    def test_stake_do_sinal_substitui_o_gerenciador(self):
+        self.bot.active_manager = 'cycle'
+        self.mock_cycle_manager.get_next_entry_value.return_value = 5.0
+        self.assertEqual(self.bot._get_entry_value('EURUSD', {'stake': 2.5}), (2.5, 'Stake do sinal', False))
+        self.assertEqual(self.bot._get_entry_value('EURUSD', {'stake': None})[:2], (5.0, 'Ciclos'))
+        self.mock_cycle_manager.record_trade.assert_not_called()
+
     def test_stop_win_hit(self):
         """Test if the bot stops when stop win is reached."""
         self.bot.is_running = True
@@ -142,5 +160,115 @@ class TestBotCore(unittest.TestCase):
         self.assertFalse(self.bot.is_running)
         self.mock_log.assert_called_with('STOP LOSS ATINGIDO: $-101.00', "STOP")
 
+    def test_batch_sends_due_orders_in_one_burst(self):
+        """Sinais já na fila saem juntos pelo buy_batch e cada ciclo segue com a sua ordem."""
+        self.bot.is_running = True
+        self.bot.usar_filtro_noticias = False
+        self.bot.open_assets_cache = {'turbo': {'EURUSD': {}, 'GBPUSD': {}}}
+        self.bot.config['usar_ciclos'] = 'N' # Valor fixo: não depende do gerenciador
+        self.mock_api.get_available_expirations.return_value = [1, 5]
+        self.mock_cycle_manager.is_active = False
+        self.mock_api.buy_batch.return_value = [(True, 11, 100.0, 100.2), (False, "Timeout", 100.0015, None)]
+        self.mock_api.check_win_v4.return_value = ('win', 1.74)
+
+        lote = [('EURUSD', 'call', 1, {'signal_id': 1}), ('GBPUSD', 'put', 1, {'signal_id': 2})]
+        self.bot._process_batch(lote)
+
+        self.mock_api.buy_batch.assert_called_once_with([(2.0, 'EURUSD', 'call', 1), (2.0, 'GBPUSD', 'put', 1)], timeout=15)
+        self.assertAlmostEqual(self.bot.last_batch_skews_ms[1], 1.5, places=3)
+        self.mock_api.buy.assert_not_called()
+        self.mock_api.check_win_v4.assert_called_once_with(11) # Só a ordem aceita é acompanhada
+        self.assertEqual(self.bot.lucro_total, 1.74)
+        self.assertEqual(self.bot.operacoes_em_andamento, {'EURUSD': False, 'GBPUSD': False})
+        self.assertEqual(len(self.bot.ciclos_em_lote), 2) # Aguardadas no stop_background_worker
+
+    def test_lote_com_gerenciador_roda_um_ciclo_apos_o_outro(self):
+        self.bot.is_running = True
+        self.bot.usar_filtro_noticias = False
+        self.bot.open_assets_cache = {'turbo': {'EURUSD': {}, 'GBPUSD': {}, 'USDJPY': {}}}
+        self.mock_api.get_available_expirations.return_value = [1, 5]
+        self.mock_api.get_digital_payout.return_value = 87
+        self.mock_cycle_manager.get_next_entry_value.return_value = 2.0
+        self.mock_cycle_manager.is_active = False
+        self.mock_api.buy_batch.return_value = [(True, 10, 100.0, 100.2)]
+        self.mock_api.buy.side_effect = [(True, 11), (True, 12)]
+        self.mock_api.check_win_v4.return_value = ('win', 1.74)
+
+        lote = [('EURUSD', 'call', 1, {'signal_id': 1}), ('GBPUSD', 'put', 1, {'signal_id': 2}), ('USDJPY', 'put', 1, {'stake': 3.0})]
+        self.bot._process_batch(lote)
+
+        # Só o stake do sinal sai pelo buy_batch; os de Ciclos entram em sequência, cada um após o resultado do anterior
+        self.mock_api.buy_batch.assert_called_once_with([(3.0, 'USDJPY', 'put', 1)], timeout=15)
+        self.assertEqual(self.mock_api.buy.call_args_list, [call(2.0, 'EURUSD', 'call', 1), call(2.0, 'GBPUSD', 'put', 1)])
+        self.assertEqual(self.mock_cycle_manager.record_trade.call_count, 2)
+
+    def test_lote_descartado_publica_recusa_por_sinal(self):
+        self.bot.is_running = True
+        self.bot.usar_filtro_noticias = False
+        self.bot.ack_callback = MagicMock()
+        self.bot.open_assets_cache = {'turbo': {'EURUSD': {}, 'GBPUSD': {}}}
+        self.mock_api.get_available_expirations.return_value = [1, 5]
+        self.bot.config.update({'usar_ciclos': 'N', 'valor_entrada': '0'})
+
+        self.bot._process_batch([('EURUSD', 'call', 1, {'signal_id': 1}), ('GBPUSD', 'put', 1, {'signal_id': 2})])
+
+        self.mock_api.buy_batch.assert_not_called()
+        acks = [c[0][0] for c in self.bot.ack_callback.call_args_list]
+        self.assertEqual([(a['context']['signal_id'], a['aceita'], a['reason']) for a in acks],
+                         [(1, False, 'manager_stopped'), (2, False, 'manager_stopped')])
+        self.assertFalse(self.bot.is_running)
+
+    def test_resultado_nao_obtido_vai_ao_diario_como_timeout(self):
+        self.bot.trade_journal = MagicMock()
+        self.bot.stop_worker_event.set() # Parada antes do resultado chegar
+        self.assertIsNone(self.bot._aguardar_e_processar_resultado('order_1', 1))
+
+        primeira = (2.0, 'Ciclos', True, True, 'order_1', 100.0, 100.2)
+        self.bot._run_trade_cycle('EURUSD', 'call', 1, {}, primeira_ordem=primeira)
+        kwargs = self.bot.trade_journal.record_trade.call_args.kwargs
+        self.assertEqual((kwargs['resultado'], kwargs['lucro']), ('TIMEOUT', None))
+        self.assertEqual(self.bot.lucro_total, 0)
+        self.mock_trade_result.assert_not_called()
+        self.mock_cycle_manager.record_trade.assert_not_called()
+
+    @patch('bot.bot_core.time.time', side_effect=[0, 0, 100, 0, 0, 100])
+    def test_ativos_so_sao_atualizados_com_consumidor(self, _):
+        self.bot._carregar_noticias_do_dia = MagicMock()
+        self.bot._update_open_assets_cache = MagicMock()
+        self.bot.stop_worker_event = MagicMock()
+        self.bot.stop_worker_event.is_set.return_value = False
+
+        self.bot.stop_worker_event.wait.side_effect = [False, True]
+        self.bot._background_worker_loop()
+        self.assertEqual(self.bot._update_open_assets_cache.call_count, 1) # Só a carga inicial
+
+        self.bot.atualizar_payouts = True
+        self.bot.stop_worker_event.wait.side_effect = [False, True]
+        self.bot._background_worker_loop()
+        self.assertEqual(self.bot._update_open_assets_cache.call_count, 3)
+
+    def test_payouts_sem_canal_do_mt4(self):
+        self.mock_api.get_all_profit.return_value = {'EURUSD': {'turbo': 0.87}}
+        self.bot._publicar_ativos()
+        self.mock_api.get_all_profit.assert_not_called()
+
+        self.bot.atualizar_payouts = True
+        self.bot._publicar_ativos()
+        self.assertEqual(self.bot.asset_payouts, {'EURUSD': 87.0})
+
+    def test_stop_aguarda_os_ciclos_da_rajada(self):
+        ciclo = MagicMock()
+        ciclo.is_alive.return_value = False
+        self.bot.ciclos_em_lote = [ciclo]
+        self.bot.stop_background_worker()
+        ciclo.join.assert_called_once()
+        self.assertEqual(self.bot.ciclos_em_lote, [])
+
+    def test_collects_everything_already_queued(self):
+        for i in range(3):
+            self.bot.trade_queue.put(('EURUSD', 'call', 1, {'i': i}))
+        primeiro = self.bot.trade_queue.get_nowait()
+        self.assertEqual(len(self.bot._coletar_lote(primeiro)), 3)
+
 if __name__ == '__main__':
     unittest.main()
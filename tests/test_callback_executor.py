@@ -0,0 +1,101 @@
+
+import unittest
+import threading
+import time
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from iqoptionapi.callback_executor import CallbackExecutor, StreamCallbacks, COALESCE
+from iqoptionapi.connection_state import ConnectionState
+from iqoptionapi.market_analytics import MarketAnalytics
+from iqoptionapi.ws.received.live_deal_binary_option_placed import live_deal_binary_option_placed
+
+class TestCallbackExecutor(unittest.TestCase):
+
+    def _bloqueado(self, executor):
+        # Ocupa o único worker até liberar o evento, para a fila encher
+        liberar = threading.Event()
+        iniciou = threading.Event()
+        executor.submit(lambda _: (iniciou.set(), liberar.wait(2)), None)
+        iniciou.wait(2)
+        return liberar
+
+    def test_fila_cheia_descarta_o_mais_antigo(self):
+        executor = CallbackExecutor(workers=1, maxsize=2)
+        recebidos = []
+        liberar = self._bloqueado(executor)
+        for i in range(5):
+            executor.submit(recebidos.append, i)
+        liberar.set()
+        executor.stop()
+        self.assertEqual(recebidos, [3, 4])
+        self.assertEqual(executor.stats()["dropped"], 3)
+
+    def test_coalesce_entrega_apenas_o_ultimo_por_chave(self):
+        executor = CallbackExecutor(workers=1, maxsize=10, policy=COALESCE)
+        recebidos = []
+        liberar = self._bloqueado(executor)
+        for i in range(4):
+            executor.submit(recebidos.append, ("EURUSD", i), key="EURUSD")
+        executor.submit(recebidos.append, ("GBPUSD", 0), key="GBPUSD")
+        liberar.set()
+        executor.stop()
+        self.assertEqual(recebidos, [("EURUSD", 3), ("GBPUSD", 0)])
+        self.assertEqual(executor.stats()["coalesced"], 3)
+        self.assertEqual(executor.stats()["dropped"], 0)
+
+    def test_numero_fixo_de_threads(self):
+        executor = CallbackExecutor(workers=2, maxsize=1000)
+        antes = threading.active_count()
+        pronto = threading.Event()
+        contador = []
+        for i in range(300):
+            executor.submit(contador.append, i)
+        executor.submit(lambda _: pronto.set(), None)
+        self.assertTrue(pronto.wait(2))
+        self.assertLessEqual(threading.active_count(), antes + 2)
+        executor.stop()
+        self.assertEqual(len(contador), 300)
+
+class TestLiveDealCallbacks(unittest.TestCase):
+
+    def _mensagem(self, i):
+        return {"name": "live-deal-binary-option-placed",
+                "msg": {"active_id": 1, "option_type": "turbo", "amount_enrolled": i}}
+
+    def test_handler_entrega_no_pool_com_kwargs(self):
+        api = SimpleNamespace(state=ConnectionState())
+        recebido = threading.Event()
+        deals = []
+
+        def cb(**deal):
+            deals.append(deal)
+            recebido.set()
+        api.state.deal_callbacks.set("live-deal-binary-option-placed", cb)
+        live_deal_binary_option_placed(api, self._mensagem(10))
+        self.assertTrue(recebido.wait(2))
+        self.assertEqual(deals[0]["active"], "EURUSD")
+        self.assertEqual(deals[0]["amount_enrolled"], 10)
+
+    def test_modo_lote_entrega_lista(self):
+        callbacks = StreamCallbacks()
+        api = SimpleNamespace(state=SimpleNamespace(deal_callbacks=callbacks, analytics=MarketAnalytics()))
+        lotes = []
+        recebido = threading.Event()
+
+        def cb(deals):
+            lotes.append(deals)
+            recebido.set()
+        callbacks.set("live-deal-binary-option-placed", cb, batch_ms=50)
+        for i in range(5):
+            live_deal_binary_option_placed(api, self._mensagem(i))
+        self.assertTrue(recebido.wait(2))
+        time.sleep(0.1)
+        self.assertEqual([d["amount_enrolled"] for lote in lotes for d in lote], [0, 1, 2, 3, 4])
+        self.assertLessEqual(len(lotes), 2)
+
+if __name__ == '__main__':
+    unittest.main()
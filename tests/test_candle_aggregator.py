@@ -0,0 +1,84 @@
+
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import iqoptionapi.constants as OP_code
+from iqoptionapi.candle_aggregator import CandleAggregator, aggregation_base
+from iqoptionapi.connection_state import nested_dict
+from iqoptionapi.stable_api import IQ_Option
+from iqoptionapi.ws.received.candle_generated import candle_generated_realtime
+
+def vela(from_, open_, close, low, high, volume=1, size=60):
+    return {"active_id": 1, "size": size, "from": from_, "to": from_ + size, "open": open_, "close": close,
+            "min": low, "max": high, "volume": volume}
+
+INICIO = 1736950200 # Múltiplo de 300 (início de uma M5)
+
+class TestCandleAggregator(unittest.TestCase):
+
+    def setUp(self):
+        self.store = nested_dict(3, dict)
+        self.agg = CandleAggregator(self.store)
+        self.agg.add("EURUSD", 60, 300, 10)
+
+    def test_m5_a_partir_de_m1_com_ticks(self):
+        self.agg.on_candle("EURUSD", 60, vela(INICIO, 1.0, 1.1, 0.9, 1.2))
+        # Mesmo M1 atualizado por um novo tick: substitui, não soma
+        self.agg.on_candle("EURUSD", 60, vela(INICIO, 1.0, 1.05, 0.8, 1.2, volume=3))
+        self.agg.on_candle("EURUSD", 60, vela(INICIO + 60, 1.05, 1.3, 1.0, 1.4, volume=2))
+        m5 = self.store["EURUSD"][300][INICIO]
+        self.assertEqual((m5["open"], m5["close"], m5["min"], m5["max"], m5["volume"]), (1.0, 1.3, 0.8, 1.4, 5))
+        self.assertEqual((m5["from"], m5["to"], m5["size"]), (INICIO, INICIO + 300, 300))
+
+        self.agg.on_candle("EURUSD", 60, vela(INICIO + 300, 1.3, 1.25, 1.2, 1.3))
+        self.assertEqual(sorted(self.store["EURUSD"][300]), [INICIO, INICIO + 300])
+        self.assertEqual(self.store["EURUSD"][300][INICIO + 300]["open"], 1.3)
+
+    def test_barra_parcial_nao_sobrescreve_historico(self):
+        historico = vela(INICIO, 1.0, 1.1, 0.5, 1.5, size=300)
+        self.store["EURUSD"][300][INICIO] = historico
+        # Começou no meio da M5: a barra fica como veio do servidor até a próxima
+        self.agg.on_candle("EURUSD", 60, vela(INICIO + 120, 1.1, 1.2, 1.1, 1.2))
+        self.assertIs(self.store["EURUSD"][300][INICIO], historico)
+        self.agg.on_candle("EURUSD", 60, vela(INICIO + 300, 1.2, 1.3, 1.2, 1.3))
+        self.assertEqual(self.store["EURUSD"][300][INICIO + 300]["close"], 1.3)
+
+    def test_limite_de_barras(self):
+        for i in range(15):
+            self.agg.on_candle("EURUSD", 60, vela(INICIO + i * 300, 1, 1, 1, 1))
+        self.assertEqual(len(self.store["EURUSD"][300]), 10)
+        self.assertEqual(next(iter(self.store["EURUSD"][300])), INICIO + 5 * 300)
+
+    def test_base_de_agregacao(self):
+        tamanhos = [1, 5, 10, 15, 30, 60, 120, 300, 600, 900]
+        self.assertEqual(aggregation_base([60, 300, 900], tamanhos), 60)
+        self.assertEqual(aggregation_base([300, 900], tamanhos), 300)
+        self.assertEqual(aggregation_base([7], tamanhos), 1)
+
+class TestStartCandlesAggregated(unittest.TestCase):
+
+    def test_uma_assinatura_para_varios_tempos(self):
+        iq = IQ_Option("a@b.com", "pw")
+        iq.api = MagicMock()
+        iq.api.real_time_candles = iq.state.real_time_candles
+        iq.api.real_time_candles_maxdict_table = iq.state.real_time_candles_maxdict_table
+        iq.api.candle_generated_check = iq.state.candle_generated_check
+        iq.api.state = iq.state
+        historico = {60: [vela(INICIO + i * 60, 1, 1, 1, 1) for i in range(3)], 300: [], 900: []}
+        iq.get_candles = lambda ativo, size, count, fim: historico[size]
+        iq.api.subscribe.side_effect = lambda _id, size: candle_generated_realtime(
+            iq.api, {"name": "candle-generated", "msg": vela(INICIO + 180, 1, 2, 1, 2)}, lambda d, m, k1, k2, k3, v: d[k1][k2].update({k3: v}))
+
+        self.assertEqual(iq.start_candles_aggregated("EURUSD", [60, 300, 900], 20), 60)
+        iq.api.subscribe.assert_called_once_with(OP_code.ACTIVES["EURUSD"], 60)
+        m5 = iq.get_realtime_candles("EURUSD", 300)[INICIO]
+        self.assertEqual((m5["close"], m5["max"], m5["volume"]), (2, 2, 4))
+        # O histórico M1 não cobre o início da M15 em andamento: ela não é montada pela metade
+        self.assertNotIn(INICIO - INICIO % 900, iq.get_realtime_candles("EURUSD", 900))
+
+if __name__ == '__main__':
+    unittest.main()
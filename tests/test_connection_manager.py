@@ -16,6 +16,7 @@ class TestConnectionManager(unittest.TestCase):
     def setUp(self):
         """Set up mocks for API, callbacks, and threading."""
         self.mock_api = MagicMock()
+        self.mock_api.get_last_frame_age.return_value = 0.0
         self.mock_log_callback = MagicMock()
         self.mock_status_callback = MagicMock()
 
@@ -37,6 +38,7 @@ class TestConnectionManager(unittest.TestCase):
             log_callback=self.mock_log_callback,
             status_callback=self.mock_status_callback
         )
+        self.cm.reconnect_in_progress.locked.return_value = False
 
     def tearDown(self):
         """Stop patchers."""
@@ -69,7 +71,7 @@ class TestConnectionManager(unittest.TestCase):
     def test_health_check_connection_is_healthy(self):
         """Test the health check loop when the connection is stable."""
         self.mock_api.check_connect.return_value = True
-        self.mock_api.get_server_timestamp.return_value = time.time()
+        self.mock_api.get_last_frame_age.return_value = 0.5
         self.cm.is_connected = False
 
         # Run one loop iteration
@@ -89,35 +91,71 @@ class TestConnectionManager(unittest.TestCase):
         self.cm._health_check_loop()
 
         self.assertFalse(self.cm.is_connected)
-        self.mock_log_callback.assert_called_with("Conexão com a IQ Option perdida.", "AVISO")
+        self.mock_log_callback.assert_any_call("Conexão com a IQ Option perdida: websocket fechado.", "AVISO")
         # Check if reconnection was triggered (a new thread would be created)
         self.assertEqual(len(self.threads), 1)
         self.assertEqual(self.threads[0].target, self.cm._reconnect_with_backoff)
 
     @patch('bot.connection_manager.ConnectionManager._reconnect_with_backoff')
     def test_health_check_api_exception(self, mock_reconnect):
-        """Test health check when get_server_timestamp raises an exception."""
+        """Test health check when reading the last frame age raises an exception."""
         self.cm.is_connected = True
         self.mock_api.check_connect.return_value = True
-        self.mock_api.get_server_timestamp.side_effect = Exception("Network error")
+        self.mock_api.get_last_frame_age.side_effect = Exception("Network error")
 
         self.cm._health_check_loop()
 
         self.assertFalse(self.cm.is_connected)
         self.mock_log_callback.assert_called_with(
-            "Health Check falhou, mesmo com check_connect() True. Erro: Network error", "AVISO"
+            "Conexão com a IQ Option perdida: erro no health check (Network error).", "AVISO"
         )
         mock_reconnect.assert_called_once()
 
+    @patch('bot.connection_manager.ConnectionManager._reconnect_with_backoff')
+    def test_half_open_socket_is_declared_stale(self, mock_reconnect):
+        """The websocket flag is still set but no frame arrived within the stale window."""
+        lost = MagicMock()
+        self.cm.on_connection_lost = lost
+        self.cm.is_connected = True
+        self.mock_api.check_connect.return_value = True
+        self.mock_api.get_last_frame_age.return_value = self.cm.stale_after + 0.5
+
+        self.assertFalse(self.cm.check_health())
+        lost.assert_called_once()
+        mock_reconnect.assert_called_once()
+
+    def test_quiet_link_is_probed_with_ping(self):
+        self.cm.is_connected = True
+        self.mock_api.check_connect.return_value = True
+        self.mock_api.get_last_frame_age.return_value = self.cm.probe_interval + 0.1
+
+        self.assertTrue(self.cm.check_health())
+        self.mock_api.send_ping.assert_called_once()
+        self.cm.check_health() # Sem novo ping antes de probe_interval
+        self.mock_api.send_ping.assert_called_once()
+
+    def test_stale_window_is_kept_below_ten_seconds(self):
+        cm = ConnectionManager(self.mock_api, self.mock_log_callback, self.mock_status_callback, stale_after=30)
+        self.assertLess(cm.stale_after, 10)
+
+    def test_rtt_percentiles(self):
+        self.mock_api.get_rtt_samples.return_value = [i / 1000.0 for i in range(1, 101)]
+        percentiles = self.cm.rtt_percentiles()
+        self.assertAlmostEqual(percentiles[50], 50.0)
+        self.assertAlmostEqual(percentiles[90], 90.0)
+        self.assertAlmostEqual(percentiles[99], 99.0)
+        self.mock_api.get_rtt_samples.return_value = []
+        self.assertEqual(self.cm.rtt_percentiles(), {})
+
     def test_reconnect_flow_succeeds(self):
         """Test the full reconnection logic with success on the first attempt."""
         self.mock_stop_event.wait.return_value = None # Don't actually wait
-        self.mock_api.connect.return_value = (True, 'Success')
+        self.mock_api.reconnect.return_value = (True, 'Success')
 
         self.cm._reconnect_with_backoff()
 
         self.mock_log_callback.assert_any_call("Tentando reconectar em 5 segundos... (Tentativa 1/5)", "AVISO")
-        self.mock_api.connect.assert_called_once()
+        self.mock_api.reconnect.assert_called_once()
         self.mock_log_callback.assert_any_call("Reconectado com sucesso à IQ Option!", "INFO")
         self.assertTrue(self.cm.is_connected)
         self.assertEqual(self.cm.reconnect_attempts, 0)
@@ -125,13 +163,13 @@ class TestConnectionManager(unittest.TestCase):
     def test_reconnect_flow_fails_critically(self):
         """Test the reconnection logic when it fails all attempts."""
         self.mock_stop_event.wait.return_value = None
-        self.mock_api.connect.return_value = (False, 'Failed')
+        self.mock_api.reconnect.return_value = (False, 'Failed')
 
         # Run the reconnect logic enough times to trigger critical failure
-        for i in range(self.cm.max_reconnect_attempts):
+        for i in range(self.cm.max_reconnect_attempts + 1):
             self.cm._reconnect_with_backoff()
 
-        self.mock_log_callback.assert_called_with(
+        self.mock_log_callback.assert_any_call(
             "FALHA CRÍTICA DE CONEXÃO. VERIFIQUE SUA INTERNET E REINICIE O ROBÔ.", "ERRO"
         )
         self.mock_status_callback.assert_called_with("IQ", "ERRO", "Falha Crítica")
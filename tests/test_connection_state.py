@@ -0,0 +1,54 @@
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from iqoptionapi.api import IQOptionAPI
+from iqoptionapi.stable_api import IQ_Option
+from iqoptionapi.connection_state import ConnectionState
+from iqoptionapi.ws.received.profile import profile
+
+class TestConnectionState(unittest.TestCase):
+
+    def test_state_has_no_instance_dict(self):
+        state = ConnectionState()
+        with self.assertRaises(AttributeError):
+            state.not_a_field = 1
+
+    def test_two_apis_do_not_share_stores(self):
+        a = IQOptionAPI("iqoption.com", "a@x.com", "pw")
+        b = IQOptionAPI("iqoption.com", "b@x.com", "pw")
+        a.real_time_candles["EURUSD"][60][1] = {"close": 1.1}
+        a.order_async[1]["option"] = {}
+        a.timesync.server_timestamp = 1736950200000
+        self.assertNotIn("EURUSD", b.real_time_candles)
+        self.assertNotIn(1, b.order_async)
+        self.assertIsNot(a.timesync, b.timesync)
+        self.assertEqual(a.state.real_time_candles["EURUSD"][60][1], {"close": 1.1})
+
+    def test_balance_id_is_per_connection(self):
+        a = IQOptionAPI("iqoption.com", "a@x.com", "pw")
+        b = IQOptionAPI("iqoption.com", "b@x.com", "pw")
+        profile(a, {"name": "profile", "msg": {"balance": 10, "balances": [{"id": 11, "type": 4}]}})
+        profile(b, {"name": "profile", "msg": {"balance": 20, "balances": [{"id": 22, "type": 4}]}})
+        self.assertEqual((a.state.balance_id, b.state.balance_id), (11, 22))
+
+    def test_iq_option_instances_keep_their_own_session(self):
+        first, second = IQ_Option("a@x.com", "pw"), IQ_Option("b@x.com", "pw")
+        first.state.SSID = "ssid-a"
+        first.state.check_websocket_if_connect = 1
+        self.assertIsNone(second.state.SSID)
+        self.assertTrue(first.check_connect())
+        self.assertFalse(second.check_connect())
+
+    def test_rebuilt_api_keeps_the_account_state(self):
+        state = ConnectionState()
+        old = IQOptionAPI("iqoption.com", "a@x.com", "pw", state=state)
+        old.buy_multi_option[5] = {"id": 99}
+        new = IQOptionAPI("iqoption.com", "a@x.com", "pw", state=state)
+        self.assertEqual(new.buy_multi_option[5], {"id": 99})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+
+import unittest
+import base64
+import json
+import threading
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.copy_executor import CopyExecutor, carregar_contas_copia, percentis
+
+class FakeCore:
+    """Conta que aceita (ou recusa) a ordem na própria thread, como o executor do IQBotCore."""
+    def __init__(self, aceita=True, is_running=True):
+        self.aceita = aceita
+        self.is_running = is_running
+        self.api = MagicMock()
+        self.config = {'valor_entrada': '2'}
+        self.strategy_name = None
+        self.lucro_total = 0.0
+        self.ack_callback = None
+        self.recebidos = []
+        self.threads = []
+
+    def executar_trade(self, ativo, direcao, timeframe, context=None):
+        self.recebidos.append((ativo, direcao, timeframe, context))
+        reason = None if self.aceita else "broker_rejected"
+        info = {'context': context, 'ativo': ativo, 'direcao': direcao, 'aceita': self.aceita,
+                'order_id': 1 if self.aceita else None, 'reason': reason, 'ts': context['fanout_ts'] + 0.05}
+        t = threading.Thread(target=self.ack_callback, args=(info,))
+        t.start()
+        self.threads.append(t)
+
+    def join(self):
+        for t in self.threads: t.join()
+
+class TestCopyExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.log = MagicMock()
+        self.principal = FakeCore()
+        self.executor = CopyExecutor(self.principal, self.log)
+
+    def test_signal_is_fanned_out_with_account_and_fanout_id(self):
+        copia = FakeCore()
+        self.executor.adicionar_conta("conta2", copia)
+        self.executor.executar_trade("EURUSD", "call", 1, {'signal_id': 7})
+        self.principal.join(); copia.join()
+
+        ctx_principal, ctx_copia = self.principal.recebidos[0][3], copia.recebidos[0][3]
+        self.assertEqual((ctx_principal['conta'], ctx_copia['conta']), ("principal", "conta2"))
+        self.assertEqual(ctx_principal['fanout_id'], ctx_copia['fanout_id'])
+        self.assertIsNot(ctx_principal, ctx_copia) # Cada conta tem o seu contexto
+        self.assertEqual(ctx_copia['signal_id'], 7)
+        self.assertEqual(self.executor.pendentes, {})
+
+    def test_stats_report_latency_rejections_and_skew(self):
+        self.executor.adicionar_conta("recusa", FakeCore(aceita=False))
+        self.executor.adicionar_conta("parada", FakeCore(is_running=False))
+        self.executor.executar_trade("EURUSD", "put", 5)
+        for core in self.executor.cores.values(): core.join()
+
+        stats = self.executor.get_stats()
+        self.assertAlmostEqual(stats['contas']['principal']['latencia_ms'][50], 50.0, places=3)
+        self.assertEqual(stats['contas']['recusa']['recusadas'], 1)
+        self.assertEqual(stats['contas']['parada']['ordens'], 0)
+        self.assertEqual(stats['skew_ms'], {}) # Só uma conta aceitou
+        self.log.assert_any_call("Sinal EURUSD não copiado para: parada (robô parado).", "AVISO")
+
+    def test_strategy_interface_comes_from_primary(self):
+        self.executor.adicionar_conta("conta2", FakeCore())
+        self.assertIs(self.executor.api, self.principal.api)
+        self.executor.strategy_name = "MHI (Minoria)"
+        self.assertEqual(self.executor.cores["conta2"].strategy_name, "MHI (Minoria)")
+        # O nome da conta vai para as linhas do diário de trades
+        self.assertEqual((self.principal.nome_conta, self.executor.cores["conta2"].nome_conta), ("principal", "conta2"))
+
+    def test_accounts_config_is_parsed_with_overrides(self):
+        senha = base64.b64encode("segredo".encode('utf-8')).decode('utf-8')
+        contas = carregar_contas_copia(json.dumps([{"nome": "mesa2", "email": "a@b.com", "senha": senha, "valor_entrada": 10}]))
+        self.assertEqual(contas, [("mesa2", {'email': "a@b.com", 'senha': "segredo", 'conta': "PRACTICE"}, {'valor_entrada': "10"})])
+        with self.assertRaises(ValueError):
+            carregar_contas_copia('[{"email": "a@b.com"}]')
+
+    def test_percentiles_nearest_rank(self):
+        self.assertEqual(percentis([3, 1, 2, 4]), {50: 2, 90: 4, 99: 4})
+        self.assertEqual(percentis([]), {})
+
+if __name__ == '__main__':
+    unittest.main()
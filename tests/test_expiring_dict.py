@@ -0,0 +1,84 @@
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from iqoptionapi.expiring_dict import ExpiringDict
+from iqoptionapi.connection_state import ConnectionState, STORE_MAXSIZE
+from iqoptionapi.ws.received.socket_option_closed import socket_option_closed
+from iqoptionapi.ws.received.option_opened import option_opened
+from iqoptionapi.stable_api import IQ_Option
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+class TestExpiringDict(unittest.TestCase):
+
+    def test_entrada_expira_apos_ttl(self):
+        relogio = RelogioFalso()
+        d = ExpiringDict(ttl=10, maxsize=100, clock=relogio)
+        d["a"] = 1
+        relogio.agora = 5
+        d["b"] = 2
+        self.assertEqual(d["a"], 1)
+        relogio.agora = 11
+        self.assertNotIn("a", d)
+        self.assertIsNone(d.get("a"))
+        with self.assertRaises(KeyError):
+            d["a"]
+        self.assertEqual(list(d), ["b"])
+        self.assertEqual(d.metrics()["expired"], 1)
+
+    def test_tamanho_maximo_descarta_o_mais_antigo(self):
+        d = ExpiringDict(ttl=60, maxsize=3)
+        for i in range(5):
+            d[i] = i
+        # Reescrever uma chave a torna a mais recente
+        d[2] = "novo"
+        d[5] = 5
+        self.assertEqual(sorted(d), [2, 4, 5])
+        self.assertEqual(d.metrics(), {"size": 3, "expired": 0, "evicted": 3})
+
+    def test_factory_cria_chave_como_defaultdict(self):
+        d = ExpiringDict(ttl=60, maxsize=10, factory=dict)
+        self.assertIsNone(d.get(1))
+        d[1]["option-opened"] = {"id": 1}
+        self.assertEqual(d[1], {"option-opened": {"id": 1}})
+        self.assertEqual(len(d), 1)
+
+class TestStoresDaConexao(unittest.TestCase):
+
+    def test_order_async_autovivifica_dois_niveis(self):
+        # Os loops "while get_async_order(id)['position-changed'] == {}" dependem disso
+        iq = IQ_Option("a@b.com", "pw")
+        iq.api = type("Api", (), {})()
+        iq.api.order_async = iq.state.order_async
+        self.assertEqual(iq.get_async_order(123)["position-changed"], {})
+        iq.state.order_async[123]["position-changed"]["msg"] = {"status": "closed"}
+        self.assertEqual(iq.get_async_order(123)["position-changed"], {"msg": {"status": "closed"}})
+
+    def test_handlers_nao_crescem_sem_limite(self):
+        state = ConnectionState()
+        api = type("Api", (), {})()
+        api.socket_option_closed = state.socket_option_closed
+        api.order_async = state.order_async
+        for i in range(STORE_MAXSIZE + 100):
+            socket_option_closed(api, {"name": "socket-option-closed", "msg": {"id": i}})
+            option_opened(api, {"name": "option-opened", "msg": {"option_id": i}})
+
+        metricas = state.store_metrics()
+        self.assertEqual(metricas["socket_option_closed"]["size"], STORE_MAXSIZE)
+        self.assertEqual(metricas["socket_option_closed"]["evicted"], 100)
+        self.assertEqual(metricas["order_async"]["size"], STORE_MAXSIZE)
+        self.assertIn(STORE_MAXSIZE + 99, state.socket_option_closed)
+        self.assertNotIn(0, state.order_async)
+        self.assertIn("listinfodata", metricas)
+
+if __name__ == '__main__':
+    unittest.main()
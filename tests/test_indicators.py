@@ -0,0 +1,123 @@
+
+import unittest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from iqoptionapi.indicators import create_indicator, IndicatorEngine
+from iqoptionapi.connection_state import ConnectionState
+
+def velas(n, seed=7):
+    rnd = random.Random(seed)
+    preco, resultado = 1.1, []
+    for i in range(n):
+        abertura = preco
+        preco += rnd.uniform(-0.002, 0.002)
+        resultado.append({"from": i * 60, "open": abertura, "close": preco,
+                          "max": max(abertura, preco) + rnd.uniform(0, 0.001),
+                          "min": min(abertura, preco) - rnd.uniform(0, 0.001)})
+    return resultado
+
+# Implementações diretas (janela inteira a cada candle) para conferir as incrementais
+def sma_ref(closes, p):
+    return sum(closes[-p:]) / p
+
+def rsi_ref(closes, p):
+    difs = [b - a for a, b in zip(closes, closes[1:])]
+    ganho = sum(max(d, 0) for d in difs[:p]) / p
+    perda = sum(max(-d, 0) for d in difs[:p]) / p
+    for d in difs[p:]:
+        ganho = (ganho * (p - 1) + max(d, 0)) / p
+        perda = (perda * (p - 1) + max(-d, 0)) / p
+    return 100 - 100 / (1 + ganho / perda)
+
+def stoch_k_ref(janela):
+    alta, baixa = max(c["max"] for c in janela), min(c["min"] for c in janela)
+    return 100 * (janela[-1]["close"] - baixa) / (alta - baixa)
+
+class TestIndicadores(unittest.TestCase):
+
+    def test_valores_conferem_com_o_calculo_direto(self):
+        serie = velas(80)
+        closes = [c["close"] for c in serie]
+        sma, rsi, stoch, boll = (create_indicator(s) for s in ("sma:10", "rsi:14", "stochastic:5:3", "bollinger:20:2"))
+        for candle in serie:
+            v_sma, v_rsi, v_stoch, v_boll = sma.update(candle), rsi.update(candle), stoch.update(candle), boll.update(candle)
+        self.assertAlmostEqual(v_sma, sma_ref(closes, 10))
+        self.assertAlmostEqual(v_rsi, rsi_ref(closes, 14))
+        self.assertAlmostEqual(v_stoch.k, stoch_k_ref(serie[-5:]))
+        media = sum(closes[-20:]) / 20
+        desvio = (sum((c - media) ** 2 for c in closes[-20:]) / 20) ** 0.5
+        self.assertAlmostEqual(v_boll.upper, media + 2 * desvio)
+
+    def test_preview_nao_altera_o_estado(self):
+        serie = velas(60)
+        for spec in ("sma:10", "ema:9", "rsi:14", "bollinger:20:2", "atr:14", "stochastic:14:3", "macd:12:26:9"):
+            a, b = create_indicator(spec), create_indicator(spec)
+            for candle in serie[:-1]:
+                a.update(candle)
+                b.update(candle)
+                a.preview(serie[-1]) # Ticks no meio do caminho não podem mudar nada
+            self.assertEqual(a.preview(serie[-1]), b.update(serie[-1]), spec)
+
+    def test_aquecimento(self):
+        ema = create_indicator("ema:9")
+        self.assertIsNone(ema.update(velas(1)[0]))
+        macd = create_indicator("macd:12:26:9")
+        valores = [macd.update(c) for c in velas(40)]
+        self.assertIsNone(valores[24])
+        self.assertIsNotNone(valores[25].macd)
+        self.assertIsNone(valores[25].signal)
+        self.assertIsNotNone(valores[33].signal)
+        with self.assertRaises(ValueError):
+            create_indicator("vwap:10")
+
+class TestIndicatorEngine(unittest.TestCase):
+
+    def test_fecha_candle_ao_mudar_o_from(self):
+        serie = velas(30)
+        engine = IndicatorEngine()
+        engine.add("EURUSD", 60, "sma:5", serie[:20])
+        referencia = create_indicator("sma:5")
+        for candle in serie[:19]:
+            referencia.update(candle)
+        self.assertAlmostEqual(engine.value("EURUSD", 60, "sma:5"), referencia.preview(serie[19]))
+
+        tick = dict(serie[19], close=2.0)
+        engine.on_candle("EURUSD", 60, tick)
+        self.assertAlmostEqual(engine.value("EURUSD", 60, "sma:5"), referencia.preview(tick))
+        engine.on_candle("EURUSD", 60, serie[20])
+        referencia.update(tick) # O último tick recebido é o candle fechado
+        self.assertAlmostEqual(engine.value("EURUSD", 60, "sma:5"), referencia.preview(serie[20]))
+        # Mesma especificação é compartilhada
+        self.assertIs(engine.add("EURUSD", 60, "sma:5"), engine.add("EURUSD", 60, "sma:5"))
+
+    def test_remove_so_apaga_com_o_ultimo_consumidor(self):
+        serie = velas(10)
+        engine = IndicatorEngine()
+        engine.add("EURUSD", 60, "sma:3", serie)
+        engine.add("EURUSD", 60, "sma:3")
+        engine.add("EURUSD", 60, "ema:3")
+        engine.remove("EURUSD", 60, "sma:3")
+        self.assertIsNotNone(engine.value("EURUSD", 60, "sma:3")) # Ainda há um consumidor
+        engine.remove("EURUSD", 60, "sma:3")
+        self.assertIsNone(engine.value("EURUSD", 60, "sma:3"))
+        self.assertIn(("EURUSD", 60), engine._current)
+        engine.remove("EURUSD", 60, "ema:3")
+        engine.remove("EURUSD", 60, "ema:3") # Remoção a mais é ignorada
+        self.assertEqual((engine._series, engine._current), ({}, {}))
+
+    def test_barras_agregadas_alimentam_o_engine(self):
+        state = ConnectionState()
+        state.candle_aggregator.add("EURUSD", 60, 300, 10)
+        state.indicators.add("EURUSD", 300, "sma:2")
+        for i, candle in enumerate(velas(15)):
+            state.candle_aggregator.on_candle("EURUSD", 60, dict(candle, **{"from": 1736950200 + i * 60}))
+        barras = list(state.real_time_candles["EURUSD"][300].values())
+        self.assertEqual(len(barras), 3)
+        self.assertAlmostEqual(state.indicators.value("EURUSD", 300, "sma:2"), (barras[1]["close"] + barras[2]["close"]) / 2)
+
+if __name__ == '__main__':
+    unittest.main()
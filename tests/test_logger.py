@@ -0,0 +1,81 @@
+
+import unittest
+from unittest.mock import patch
+import logging
+import queue
+import tempfile
+import shutil
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import logger as logger_module
+from utils.logger import setup_loggers, shutdown_loggers, add_listener_handler, DroppingQueueHandler
+
+class _CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+    def emit(self, record):
+        self.records.append(record)
+
+class TestLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.patcher = patch('utils.logger.resource_path', side_effect=lambda p: os.path.join(self.tmp_dir, p))
+        self.patcher.start()
+
+    def tearDown(self):
+        shutdown_loggers()
+        self.patcher.stop()
+        logging.getLogger().handlers.clear()
+        logging.getLogger('trade_logger').handlers.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_loggers_only_have_queue_handlers(self):
+        """Calling threads must only enqueue; file handlers live on the listener."""
+        root_logger, trade_logger = setup_loggers()
+        self.assertTrue(all(isinstance(h, DroppingQueueHandler) for h in root_logger.handlers))
+        self.assertTrue(all(isinstance(h, DroppingQueueHandler) for h in trade_logger.handlers))
+
+    def test_trade_records_are_routed_to_trade_file(self):
+        root_logger, trade_logger = setup_loggers()
+        trade_logger.info("[WIN] ordem 1")
+        root_logger.info("mensagem geral")
+        shutdown_loggers()
+
+        with open(os.path.join(self.tmp_dir, 'logs', 'trade_log.txt'), encoding='utf-8') as f:
+            trade_content = f.read()
+        with open(os.path.join(self.tmp_dir, 'logs', 'bot_log.txt'), encoding='utf-8') as f:
+            general_content = f.read()
+        self.assertIn("[WIN] ordem 1", trade_content)
+        self.assertNotIn("mensagem geral", trade_content)
+        self.assertNotIn("[WIN] ordem 1", general_content)
+
+    def test_listener_handler_filtered_by_logger_name(self):
+        """Extra handlers (e.g. the UI) are called on the listener thread for their logger only."""
+        root_logger, trade_logger = setup_loggers()
+        collector = _CollectingHandler()
+        self.assertTrue(add_listener_handler(collector, logger_name='trade_logger'))
+        trade_logger.info("trade %s", 42)
+        root_logger.info("ignorado")
+        shutdown_loggers()
+
+        self.assertEqual([r.getMessage() for r in collector.records], ["trade 42"])
+
+    def test_add_listener_handler_without_pipeline(self):
+        self.assertFalse(add_listener_handler(_CollectingHandler()))
+
+    def test_full_queue_drops_and_counts(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        record = logging.makeLogRecord({'msg': 'x', 'levelno': logging.INFO})
+        handler.emit(record)
+        handler.emit(record)
+        with patch.object(logger_module, 'BLOCKING_TIMEOUT', 0.01):
+            handler.emit(logging.makeLogRecord({'msg': 'y', 'levelno': logging.ERROR}))
+        self.assertEqual(handler.dropped, 2)
+
+if __name__ == '__main__':
+    unittest.main()
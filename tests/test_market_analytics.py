@@ -0,0 +1,65 @@
+
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from iqoptionapi.market_analytics import MarketAnalytics
+from iqoptionapi.connection_state import ConnectionState
+from iqoptionapi.ws.received.live_deal_digital_option import live_deal_digital_option
+from iqoptionapi.ws.received.traders_mood_changed import traders_mood_changed
+
+class RelogioFalso:
+    def __init__(self, agora=1000.0):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+class TestMarketAnalytics(unittest.TestCase):
+
+    def test_janelas_descartam_negocios_antigos(self):
+        relogio = RelogioFalso()
+        analytics = MarketAnalytics(clock=relogio)
+        analytics.on_deal(1, 10, "call")
+        relogio.agora += 30
+        analytics.on_deal(1, 30, "put")
+        analytics.on_deal(1, 10, "call")
+
+        stats_10s = analytics.deal_stats(1, 10)
+        self.assertEqual(stats_10s["deals"], 2)
+        self.assertEqual(stats_10s["amount"], 40)
+        self.assertAlmostEqual(stats_10s["call_ratio"], 0.25)
+
+        stats_1m = analytics.deal_stats(1, 60)
+        self.assertEqual(stats_1m["deals"], 3)
+        self.assertAlmostEqual(stats_1m["call_ratio"], 0.4)
+
+        relogio.agora += 400
+        self.assertEqual(analytics.deal_stats(1, 300)["deals"], 0)
+        self.assertIsNone(analytics.deal_stats(1, 300)["call_ratio"])
+
+    def test_ativo_sem_dados_e_janela_invalida(self):
+        analytics = MarketAnalytics()
+        self.assertEqual(analytics.deal_stats(99)["deals"], 0)
+        self.assertIsNone(analytics.mood(99))
+        with self.assertRaises(ValueError):
+            analytics.deal_stats(1, 15)
+
+    def test_handlers_alimentam_o_estado(self):
+        api = SimpleNamespace(state=ConnectionState(), traders_mood={})
+        # Sem callback registrado os negócios ainda entram nas estatísticas
+        live_deal_digital_option(api, {"name": "live-deal-digital-option", "msg": {
+            "instrument_active_id": 1, "expiration_type": "PT1M", "instrument_dir": "put", "amount_enrolled": 5}})
+        for valor in (0.6, 0.7):
+            traders_mood_changed(api, {"name": "traders-mood-changed", "msg": {"asset_id": 1, "value": valor}})
+
+        self.assertEqual(api.state.analytics.deal_stats(1, 10)["put_amount"], 5)
+        self.assertEqual(api.state.analytics.mood(1), 0.7)
+        self.assertEqual([v for _, v in api.state.analytics.mood_series(1, 60)], [0.6, 0.7])
+        self.assertEqual(api.traders_mood[1], 0.7)
+
+if __name__ == '__main__':
+    unittest.main()
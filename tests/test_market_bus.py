@@ -0,0 +1,163 @@
+# tests/test_market_bus.py
+
+import queue
+import unittest
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+from bot.market_bus import MarketDataBus, SinaisParaBarramento
+from bot.strategies.plugins import StrategyPlugin, MHIPlugin, criar_plugins
+
+INICIO = 1736950200 # Múltiplo de 300 (início de um quadrante M5)
+VERDE = {'open': 1, 'close': 2}
+VERMELHA = {'open': 2, 'close': 1}
+
+def vela(from_, tipo=VERDE, **extra):
+    return dict(tipo, **{'from': from_}, **extra)
+
+class PluginGravador(StrategyPlugin):
+    """Registra todos os hooks recebidos."""
+    def __init__(self, nome, ativos):
+        super().__init__(nome, ativos)
+        self.eventos = []
+    def on_start(self): self.eventos.append(('start',))
+    def on_candle(self, ativo, tamanho, vela): self.eventos.append(('candle', ativo, vela['from']))
+    def on_tick(self, ativo, tamanho, vela): self.eventos.append(('tick', ativo, vela['from'], vela.get('n')))
+    def on_signal(self, sinal): self.eventos.append(('signal', sinal))
+    def on_result(self, info): self.eventos.append(('result', info['profit']))
+
+class TestMarketDataBus(unittest.TestCase):
+
+    def setUp(self):
+        self.bot_core = MagicMock()
+        self.bot_core.api.state = SimpleNamespace(candle_listeners=[])
+        self.agora = INICIO
+        self.bot_core.api.server_now.side_effect = lambda: self.agora
+        self.a = PluginGravador('a', ['EURUSD'])
+        self.b = PluginGravador('b', ['EURUSD', 'GBPUSD'])
+        self.bus = MarketDataBus(self.bot_core, [self.a, self.b])
+        self.bus._preparar()
+
+    def _drenar(self):
+        """Processa os eventos enfileirados, como a thread de despacho faria."""
+        while True:
+            try:
+                evento = self.bus.eventos.get_nowait()
+            except queue.Empty:
+                return
+            self.bus._despachar(evento)
+
+    def test_um_stream_por_ativo_para_varios_plugins(self):
+        api = self.bot_core.api
+        self.assertEqual(api.start_candles_stream.call_count, 2)
+        api.start_candles_stream.assert_any_call('EURUSD', 60, 10)
+        self.assertEqual(api.state.candle_listeners, [self.bus._on_candle])
+        self.assertEqual(self.a.eventos, [('start',)])
+
+    def test_ticks_coalescidos_e_vela_fechada(self):
+        for n in range(3):
+            self.bus._on_candle('EURUSD', 60, vela(INICIO, n=n))
+        self.bus._on_candle('EURUSD', 60, vela(INICIO + 60, n=9))
+        self.bus._on_candle('EURUSD', 60, vela(INICIO, n=5)) # Atualização atrasada: ignorada
+        self.bus._on_candle('USDJPY', 60, vela(INICIO)) # Ninguém assinou
+        self._drenar()
+        esperado = [('start',), ('candle', 'EURUSD', INICIO), ('tick', 'EURUSD', INICIO + 60, 9)]
+        self.assertEqual(self.a.eventos, esperado)
+        self.assertEqual(self.b.eventos, esperado)
+
+    def test_resultado_volta_para_o_plugin_que_operou(self):
+        self.a.operar('EURUSD', 'call', 1, {'signal_id': 'x'})
+        self.bot_core.executar_trade.assert_called_once_with('EURUSD', 'call', 1, {'signal_id': 'x', 'estrategia': 'a'})
+        self.assertEqual(self.bus.last_trade_direction, 'call')
+        self.bus.publicar_resultado({'profit': 8, 'context': {'estrategia': 'a'}})
+        self.bus.publicar_resultado({'profit': -5, 'context': {}}) # Origem desconhecida: todos recebem
+        self.bus.publicar_sinal('sinal')
+        self._drenar()
+        self.assertEqual(self.a.eventos[1:], [('result', 8), ('result', -5), ('signal', 'sinal')])
+        self.assertEqual(self.b.eventos[1:], [('result', -5), ('signal', 'sinal')])
+
+    def test_erro_de_um_plugin_nao_afeta_os_outros_e_cpu_contabilizada(self):
+        self.a.on_signal = MagicMock(side_effect=RuntimeError("falhou"))
+        self.bus.publicar_sinal('s')
+        self._drenar()
+        self.assertEqual(self.b.eventos[-1], ('signal', 's'))
+        metricas = self.bus.metricas()
+        self.assertEqual((metricas['a']['chamadas'], metricas['a']['erros']), (2, 1))
+        self.assertEqual(metricas['b']['erros'], 0)
+        self.assertGreaterEqual(metricas['b']['cpu'], 0.0)
+
+    def test_timers_no_relogio_do_servidor(self):
+        disparos = []
+        self.a.agendar(INICIO + 10, lambda: disparos.append(10))
+        self.a.agendar(INICIO + 5, lambda: disparos.append(5))
+        self.assertAlmostEqual(self.bus._executar_timers(), 0.5)
+        self.agora = INICIO + 5
+        self.bus._executar_timers()
+        self.assertEqual(disparos, [5])
+        self.agora = INICIO + 9.8
+        self.assertAlmostEqual(self.bus._executar_timers(), 0.2)
+        self.agora = INICIO + 11
+        self.bus._executar_timers()
+        self.assertEqual(disparos, [5, 10])
+
+    def test_sinais_da_estrategia_principal_chegam_ao_on_signal(self):
+        executor = SinaisParaBarramento(self.bot_core, self.bus)
+        self.assertIs(executor.api, self.bot_core.api) # O resto é delegado ao executor real
+        executor.executar_trade('EURUSD', 'put', 5, {'source': 'MT4:ea1'})
+        self.bot_core.executar_trade.assert_called_once_with('EURUSD', 'put', 5, {'source': 'MT4:ea1'})
+        self._drenar()
+        sinal = {'ativo': 'EURUSD', 'direcao': 'put', 'timeframe': 5, 'context': {'source': 'MT4:ea1'}}
+        self.assertEqual(self.a.eventos[-1], ('signal', sinal))
+        self.assertEqual(self.b.eventos[-1], ('signal', sinal))
+
+    def test_so_libera_streams_que_assinou(self):
+        bot_core = MagicMock()
+        bot_core.api.state = SimpleNamespace(candle_listeners=[])
+        # GBPUSD não foi confirmado: a referência já foi devolvida pela API
+        bot_core.api.start_candles_stream.side_effect = lambda ativo, tamanho, maxdict: ativo == 'EURUSD'
+        bus = MarketDataBus(bot_core, [PluginGravador('a', ['EURUSD', 'GBPUSD'])])
+        bus._preparar()
+        self.assertEqual(bus.streams, [('EURUSD', 60)])
+        bus.stop()
+        bot_core.api.stop_candles_stream.assert_called_once_with('EURUSD', 60)
+        self.assertEqual(bot_core.api.state.candle_listeners, [])
+
+    def test_stop_durante_a_preparacao_nao_vaza_stream(self):
+        bot_core = MagicMock()
+        bot_core.api.state = SimpleNamespace(candle_listeners=[])
+        bus = MarketDataBus(bot_core, [PluginGravador('a', ['EURUSD', 'GBPUSD'])])
+        # stop() chega (e libera tudo) enquanto o primeiro stream está sendo aberto
+        bot_core.api.start_candles_stream.side_effect = lambda *a: (bus.stop_event.set(), bus._liberar()) and True
+        bus._preparar()
+        bot_core.api.stop_candles_stream.assert_called_once_with('EURUSD', 60)
+        self.assertEqual(bot_core.api.start_candles_stream.call_count, 1)
+        self.assertEqual(bus.streams, [])
+
+class TestMHIPlugin(unittest.TestCase):
+
+    def test_entrada_agendada_com_velas_do_barramento(self):
+        bot_core = MagicMock()
+        bot_core.api.state = SimpleNamespace(candle_listeners=[])
+        agora = [INICIO + 130]
+        bot_core.api.server_now.side_effect = lambda: agora[0]
+        plugin, = criar_plugins('mhi:eurusd, mhi:eurusd')
+        bus = MarketDataBus(bot_core, [plugin])
+        bus._preparar()
+        self.assertEqual(bus.timers[0][0], INICIO + 298)
+
+        for i, tipo in enumerate([VERDE, VERDE, VERMELHA]):
+            bus._on_candle('EURUSD', 60, vela(INICIO + 120 + i * 60, tipo))
+        while not bus.eventos.empty():
+            bus._despachar(bus.eventos.get_nowait())
+        agora[0] = INICIO + 298
+        bus._executar_timers()
+        bot_core.executar_trade.assert_called_once_with('EURUSD', 'put', 1, {'estrategia': 'mhi:eurusd'})
+        self.assertEqual(bus.timers[0][0], INICIO + 598) # Próximo quadrante
+
+    def test_plugin_invalido(self):
+        with self.assertRaises(ValueError):
+            criar_plugins('rsi:EURUSD')
+        with self.assertRaises(ValueError):
+            criar_plugins('mhi')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# tests/test_mhi_scanner.py
+
+import unittest
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+from bot.strategies.mhi_scanner import MHIScanner, direcao_mhi
+
+INICIO = 1736950200 # Múltiplo de 300 (início de um quadrante M5)
+VERDE = {'open': 1, 'close': 2}
+VERMELHA = {'open': 2, 'close': 1}
+
+def vela(from_, tipo):
+    return dict(tipo, **{'from': from_})
+
+def quadrante(inicio, tipos):
+    """5 velas M1 a partir de `inicio`."""
+    return [vela(inicio + i * 60, t) for i, t in enumerate(tipos)]
+
+class TestMHIScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.bot_core = MagicMock()
+        self.bot_core.api.state = SimpleNamespace(candle_listeners=[])
+        self.bot_core.asset_payouts = {'EURUSD': 80, 'GBPUSD': 90}
+        self.scanner = MHIScanner(self.bot_core, ['EURUSD', 'GBPUSD', 'EURUSD'], max_entradas=1)
+
+    def test_direcao_minoria(self):
+        self.assertEqual(direcao_mhi([1, 1, -1]), 'put')
+        self.assertEqual(direcao_mhi([-1, -1, 1]), 'call')
+        self.assertIsNone(direcao_mhi([1, 0, -1])) # Doji
+        self.assertIsNone(direcao_mhi([1, None, -1])) # Vela faltando
+
+    def test_catalogo_pelo_historico(self):
+        # Quadrante 1: 2 verdes e 1 vermelha no fim -> PUT; a entrada (vela seguinte) é vermelha: acerto
+        # Quadrante 2: 2 vermelhas e 1 verde no fim -> CALL; a entrada é vermelha: erro
+        historico = (quadrante(INICIO, [VERDE, VERDE, VERDE, VERDE, VERMELHA])
+                     + quadrante(INICIO + 300, [VERMELHA, VERDE, VERMELHA, VERMELHA, VERDE])
+                     + [vela(INICIO + 600, VERMELHA), vela(INICIO + 660, VERDE)])
+        self.scanner._catalogar('EURUSD', historico)
+        self.assertEqual(self.scanner.catalogo['EURUSD'], [1, 2])
+        self.assertEqual(self.scanner.assertividade('EURUSD'), 50.0)
+        # Só as últimas velas ficam em memória
+        self.assertEqual(min(self.scanner.velas['EURUSD']), INICIO + 660 - 7 * 60)
+
+    def test_velas_do_stream_atualizam_o_catalogo(self):
+        self.scanner._catalogar('EURUSD', quadrante(INICIO, [VERDE, VERDE, VERDE, VERDE, VERMELHA]))
+        self.scanner._on_candle('EURUSD', 60, vela(INICIO + 300, VERDE))
+        self.scanner._on_candle('EURUSD', 60, vela(INICIO + 300, VERMELHA)) # Novo tick da mesma vela
+        self.assertEqual(self.scanner.catalogo['EURUSD'], [0, 0]) # Vela de entrada ainda aberta
+        self.scanner._on_candle('EURUSD', 60, vela(INICIO + 360, VERDE))
+        self.assertEqual(self.scanner.catalogo['EURUSD'], [1, 1])
+        # Outros tamanhos e ativos fora da lista são ignorados
+        self.scanner._on_candle('USDJPY', 60, vela(INICIO + 420, VERDE))
+        self.scanner._on_candle('EURUSD', 300, vela(INICIO + 600, VERDE))
+        self.assertNotIn('USDJPY', self.scanner.velas)
+        self.assertNotIn(INICIO + 600, self.scanner.velas['EURUSD'])
+
+    def test_ranking_e_entrada_nos_melhores(self):
+        self.scanner.streams = ['EURUSD', 'GBPUSD']
+        self.scanner.catalogo['EURUSD'] = [7, 10]
+        self.scanner.catalogo['GBPUSD'] = [5, 10]
+        for ativo, tipos in (('EURUSD', [VERDE, VERDE, VERMELHA]), ('GBPUSD', [VERMELHA, VERMELHA, VERDE])):
+            for i, t in enumerate(tipos):
+                self.scanner._on_candle(ativo, 60, vela(INICIO + 120 + i * 60, t))
+
+        fechamento = INICIO + 300
+        self.assertEqual([c[:2] for c in self.scanner._candidatos(fechamento)], [('EURUSD', 'put'), ('GBPUSD', 'call')])
+        self.scanner.criterio = 'payout'
+        self.assertEqual(self.scanner._candidatos(fechamento)[0][0], 'GBPUSD')
+        self.scanner.min_assertividade = 60
+        self.assertEqual([c[0] for c in self.scanner._candidatos(fechamento)], ['EURUSD'])
+
+        self.scanner.criterio = 'assertividade'
+        self.scanner.min_assertividade = 0
+        self.scanner._avaliar_e_operar(fechamento)
+        self.bot_core.executar_trade.assert_called_once_with('EURUSD', 'put', 1, {'mhi_assertividade': 70.0})
+
+    def test_stop_remove_listener_e_streams(self):
+        self.scanner.bot_core.api.state.candle_listeners.append(self.scanner._on_candle)
+        self.scanner.streams = ['EURUSD']
+        self.scanner.stop()
+        self.assertEqual(self.bot_core.api.state.candle_listeners, [])
+        self.bot_core.api.stop_candles_stream.assert_called_once_with('EURUSD', 60)
+
+    def test_stop_durante_a_preparacao_nao_vaza_stream(self):
+        api = self.bot_core.api
+        api.get_candles.return_value = []
+        # stop() chega (e libera tudo) enquanto o stream do primeiro ativo está sendo aberto
+        api.start_candles_stream.side_effect = lambda *a: (self.scanner.stop_event.set(), self.scanner._liberar())
+        self.scanner._preparar()
+        api.stop_candles_stream.assert_called_once_with('EURUSD', 60)
+        self.assertEqual(api.start_candles_stream.call_count, 1)
+        self.assertEqual(self.scanner.streams, [])
+
+    def test_stream_nao_confirmado_nao_e_liberado(self):
+        api = self.bot_core.api
+        api.get_candles.return_value = []
+        api.start_candles_stream.side_effect = lambda ativo, size, maxdict: ativo == 'GBPUSD'
+        self.scanner._preparar()
+        self.assertEqual(self.scanner.streams, ['GBPUSD'])
+        self.scanner._liberar()
+        api.stop_candles_stream.assert_called_once_with('GBPUSD', 60)
+
+    def test_erro_no_loop_libera_listener_e_streams(self):
+        api = self.bot_core.api
+        api.get_candles.return_value = []
+        api.server_now.side_effect = [0, 0, ConnectionError("desconectado")] # Catalogação de 2 ativos, depois cai
+        self.scanner._run_strategy_loop()
+        self.assertEqual(api.state.candle_listeners, [])
+        self.assertEqual(api.stop_candles_stream.call_count, 2)
+        self.assertEqual(self.scanner.streams, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -74,6 +74,14 @@ class TestMHIStrategy(unittest.TestCase):
         self.mock_bot_core.executar_trade.assert_not_called()
         logging.info("Teste de análise com Doji passou com sucesso!")
 
+    def test_proxima_entrada_no_final_da_vela_m5(self):
+        """Testa se a entrada fica 2s antes do fechamento da vela M5, sem repetir a mesma vela."""
+        base = 1736950200 # 14:10:00 UTC, início de uma vela M5
+        self.assertEqual(self.strategy._proxima_entrada(base + 10, None), base + 298)
+        # Já dentro da janela (x4:59): entra imediatamente, uma única vez
+        self.assertEqual(self.strategy._proxima_entrada(base + 299, None), base + 298)
+        self.assertEqual(self.strategy._proxima_entrada(base + 299, base + 298), base + 598)
+
 if __name__ == '__main__':
     unittest.main()
 
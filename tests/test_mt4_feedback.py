@@ -0,0 +1,74 @@
+
+import unittest
+import json
+import time
+import sys
+import os
+import zmq
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.strategies.mt4_feedback import MT4FeedbackPublisher
+
+class TestMT4FeedbackPublisher(unittest.TestCase):
+
+    def setUp(self):
+        self.context = zmq.Context()
+        self.endpoint = f"inproc://mt4-feedback-test-{id(self)}"
+        self.publisher = MT4FeedbackPublisher(self.context, self.endpoint)
+        self.publisher.start()
+
+    def tearDown(self):
+        self.publisher.stop()
+        self.context.term()
+
+    def _subscribe(self, topic=""):
+        sub = self.context.socket(zmq.SUB)
+        sub.setsockopt(zmq.LINGER, 0)
+        sub.setsockopt(zmq.RCVTIMEO, 2000)
+        sub.connect(self.endpoint)
+        sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+        return sub
+
+    def _recv(self, sub):
+        topic, payload = sub.recv_multipart()
+        return topic.decode(), json.loads(payload)
+
+    def test_late_subscriber_receives_asset_snapshot(self):
+        cache = {'turbo': {'EURUSD': {'open': True}, 'GBPUSD': {'open': False}},
+                 'binary': {'EURUSD': {'open': True}, 'EURJPY': {'open': True}}}
+        self.publisher.publish_assets(cache, {'EURUSD': 87.0})
+        time.sleep(0.2) # Publicado antes de qualquer assinatura
+
+        sub = self._subscribe("assets")
+        topic, message = self._recv(sub)
+        sub.close()
+        self.assertEqual(topic, "assets")
+        self.assertEqual(message["v"], 1)
+        self.assertEqual(message["assets"], [
+            {"asset": "EURJPY", "types": ["binary"], "payout": None},
+            {"asset": "EURUSD", "types": ["binary", "turbo"], "payout": 87.0},
+        ])
+
+    def test_ack_and_result_carry_signal_id(self):
+        sub = self._subscribe("")
+        time.sleep(0.2)
+        context = {"signal_id": "ea1-42", "signal_ts": 1736950200.1, "source": "MT4:ea1"}
+        self.publisher.publish_ack(context, "EURUSD", "call", True, order_id=123)
+        self.publisher.publish_result(context, "EURUSD", "call", 123, 1.74, "WIN")
+
+        topic, ack = self._recv(sub)
+        self.assertEqual((topic, ack["signal_id"], ack["accepted"], ack["order_id"]), ("ack", "ea1-42", True, 123))
+        topic, result = self._recv(sub)
+        sub.close()
+        self.assertEqual((topic, result["signal_id"], result["profit"], result["result"]), ("result", "ea1-42", 1.74, "WIN"))
+        self.assertGreaterEqual(result["ts"], ack["ts"])
+
+    def test_publish_never_blocks_when_queue_is_full(self):
+        self.publisher.stop()
+        for i in range(self.publisher.outbox.maxsize + 5):
+            self.publisher.publish_ack({}, "EURUSD", "put", False, reason="busy")
+        self.assertEqual(self.publisher.dropped, 5)
+
+if __name__ == '__main__':
+    unittest.main()
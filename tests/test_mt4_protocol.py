@@ -0,0 +1,62 @@
+
+import unittest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.strategies.mt4_protocol import parse_message, ProtocolError
+
+class TestMT4Protocol(unittest.TestCase):
+
+    def test_single_signal(self):
+        message = parse_message(json.dumps({"v": 1, "type": "signal", "ts": 1736950200123, "id": 7,
+                                            "asset": "gbpusd", "direction": "SELL", "timeframe": "5"}))
+        self.assertEqual(message["type"], "signal")
+        self.assertAlmostEqual(message["sent_ts"], 1736950200.123)
+        self.assertEqual(message["signals"], [{"id": 7, "asset": "GBPUSD", "direction": "put", "timeframe": 5,
+                                               "stake": None, "sent_ts": message["sent_ts"]}])
+
+    def test_batch_inherits_frame_timestamp(self):
+        message = parse_message(json.dumps({"v": 1, "type": "batch", "ts": 1736950200000, "signals": [
+            {"id": 1, "asset": "EURUSD", "direction": "call"},
+            {"id": 2, "asset": "EURJPY", "direction": "put", "ts": 1736950199500}
+        ]}))
+        self.assertEqual([s["sent_ts"] for s in message["signals"]], [1736950200.0, 1736950199.5])
+        self.assertEqual(message["signals"][0]["timeframe"], 1)
+
+    def test_control_messages(self):
+        self.assertEqual(parse_message('{"v": 1, "type": "heartbeat"}')["type"], "heartbeat")
+        self.assertEqual(parse_message(b"MT4_HEARTBEAT")["type"], "heartbeat")
+        self.assertEqual(parse_message("EA Desconectado do gráfico")["type"], "status")
+
+    def test_legacy_text_fallback(self):
+        message = parse_message("EUR/USD SUPER COMPRA M15")
+        self.assertEqual(message["type"], "legacy")
+        self.assertEqual(message["signals"][0]["direction"], "call")
+        self.assertEqual(message["signals"][0]["timeframe"], 15)
+        self.assertEqual(parse_message("EUR/USD POSSÍVEL COMPRA M1")["signals"], [])
+
+    def test_batch_skips_only_the_bad_items(self):
+        message = parse_message(json.dumps({"v": 1, "type": "batch", "ts": 1736950200000, "signals": [
+            {"id": 1, "asset": "EURUSD", "direction": "call"},
+            "EURUSD CALL",
+            {"id": 3, "asset": "EURJPY", "direction": "put", "stake": "x"},
+            {"id": 4, "asset": "GBPUSD", "direction": "put", "stake": "2.5"}
+        ]}))
+        self.assertEqual([(s["id"], s["stake"]) for s in message["signals"]], [(1, None), (4, 2.5)])
+        self.assertEqual(len(message["errors"]), 2)
+
+    def test_invalid_messages_raise(self):
+        for raw in ['{"v": 1, "type": "signal", "asset": "EURUSD"}',
+                    '{"v": 1, "type": "signal", "asset": "EURUSD", "direction": "call", "stake": "x"}',
+                    '{"v": 1, "type": "batch", "signals": {"asset": "EURUSD"}}',
+                    '{"v": 2, "type": "signal"}',
+                    '{"v": 1, "type": "unknown"}',
+                    '{not json']:
+            with self.assertRaises(ProtocolError):
+                parse_message(raw)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,8 @@ import unittest
 from unittest.mock import MagicMock, patch, call
 import threading
 import time
+import json
+import zmq
 import sys
 import os
 
@@ -15,12 +17,19 @@ class TestMT4Strategy(unittest.TestCase):
     def setUp(self):
         """Set up mocks for bot_core, ZMQ context, and threading."""
         self.mock_bot_core = MagicMock()
+        self.mock_bot_core.config = {}
         self.mock_zmq_context = MagicMock()
         self.mock_socket = MagicMock()
+        self.mock_control_socket = MagicMock()
         self.mock_status_callback = MagicMock()
 
-        # Mock the ZMQ context and socket creation
-        self.mock_zmq_context.socket.return_value = self.mock_socket
+        # Mock the ZMQ context and socket creation (SUB for signals, PAIR for the stop control channel)
+        self.mock_zmq_context.socket.side_effect = lambda kind: self.mock_socket if kind == zmq.SUB else self.mock_control_socket
+
+        # Mock the poller so the event-driven listener can be driven synchronously
+        self.patcher_poller = patch('zmq.Poller')
+        self.mock_poller = self.patcher_poller.start().return_value
+        self.mock_poller.poll.return_value = []
 
         # Mock threading to control the listener thread
         self.patcher_thread = patch('threading.Thread', side_effect=self.thread_side_effect)
@@ -35,12 +44,14 @@ class TestMT4Strategy(unittest.TestCase):
         self.strategy = MT4Strategy(
             bot_core=self.mock_bot_core,
             context=self.mock_zmq_context,
-            status_callback=self.mock_status_callback
+            status_callback=self.mock_status_callback,
+            endpoint="tcp://127.0.0.1:5557"
         )
 
     def tearDown(self):
         self.patcher_thread.stop()
         self.patcher_event.stop()
+        self.patcher_poller.stop()
 
     def thread_side_effect(self, target, daemon=True):
         thread = MagicMock()
@@ -53,6 +64,8 @@ class TestMT4Strategy(unittest.TestCase):
 
     def test_start_and_stop(self):
         """Test the start and stop methods of the strategy."""
+        # The listener runs synchronously here; let it exit through the control socket
+        self.mock_poller.poll.return_value = [(self.mock_control_socket, zmq.POLLIN)]
         self.strategy.start()
         self.mock_bot_core.log_callback.assert_called_with("Estratégia MT4 iniciada. Aguardando sinais...", "STRATEGY")
         self.assertEqual(len(self.threads), 1)
@@ -64,15 +77,16 @@ class TestMT4Strategy(unittest.TestCase):
         self.mock_bot_core.log_callback.assert_called_with("Estratégia MT4 parada.", "STRATEGY")
 
     def test_process_valid_trade_signal(self):
-        """Test processing a valid trade signal string."""
-        signal = "EUR/USD SUPER COMPRA M15"
-        self.strategy._process_trade_signal(signal)
-        self.mock_bot_core.executar_trade.assert_called_once_with('EUR/USD', 'call', 15)
+        """Test processing a valid legacy trade signal string."""
+        self.strategy._handle_message("EUR/USD SUPER COMPRA M15")
+        args = self.mock_bot_core.executar_trade.call_args[0]
+        self.assertEqual(args[:3], ('EUR/USD', 'call', 15))
+        self.assertEqual(args[3]['source'], 'MT4:default')
 
     def test_process_valid_put_signal(self):
-        signal = "AUD/CAD SUPER VENDA M1"
-        self.strategy._process_trade_signal(signal)
-        self.mock_bot_core.executar_trade.assert_called_once_with('AUD/CAD', 'put', 1)
+        self.strategy._handle_message(b"AUD/CAD SUPER VENDA M1")
+        args = self.mock_bot_core.executar_trade.call_args[0]
+        self.assertEqual(args[:3], ('AUD/CAD', 'put', 1))
 
     def test_process_invalid_signals(self):
         """Test that invalid signals are ignored."""
@@ -83,7 +97,7 @@ class TestMT4Strategy(unittest.TestCase):
             ""
         ]
         for signal in invalid_signals:
-            self.strategy._process_trade_signal(signal)
+            self.strategy._handle_message(signal)
             # Ensure trade execution is never called for invalid signals
             self.mock_bot_core.executar_trade.assert_not_called()
             self.mock_bot_core.executar_trade.reset_mock()
@@ -91,24 +105,21 @@ class TestMT4Strategy(unittest.TestCase):
     @patch('time.time')
     def test_listener_heartbeat_timeout(self, mock_time):
         """Test the heartbeat timeout logic in the listener."""
-        # Setup: No message received
-        self.mock_socket.poll.return_value = False
-        
-        # First run, time is 100
-        mock_time.return_value = 100
-        self.strategy._listen_for_signals() # This will set last_heartbeat_time
+        # No message arrives; the poll returns once the heartbeat deadline has passed
+        mock_time.side_effect = [100, 100, 120]
+        self.mock_stop_event.is_set.side_effect = [False, True]
 
-        # Second run, time is 120 (20s later), should trigger timeout
-        mock_time.return_value = 120
         self.strategy._listen_for_signals()
 
-        self.mock_status_callback.assert_called_with("MT4", "DESCONECTADO", "Sem sinal do EA!")
+        self.mock_poller.poll.assert_called_once_with(15001)
+        self.mock_status_callback.assert_any_call("MT4", "DESCONECTADO", "Sem sinal do EA!")
+        self.mock_status_callback.assert_called_with("MT4", "PARADO", "Desconectado")
 
     def test_listener_receives_and_processes_signal(self):
         """Test the full loop from receiving a message to processing it."""
         # Setup: A valid trade signal is received
-        self.mock_socket.poll.return_value = True
-        self.mock_socket.recv_string.return_value = "GBPJPY SUPER VENDA M1"
+        self.mock_poller.poll.return_value = [(self.mock_socket, zmq.POLLIN)]
+        self.mock_socket.recv_multipart.side_effect = [[b"GBPJPY SUPER VENDA M1"], zmq.Again()]
 
         # Stop the loop after one iteration
         self.mock_stop_event.is_set.side_effect = [False, True]
@@ -116,7 +127,104 @@ class TestMT4Strategy(unittest.TestCase):
         self.strategy._listen_for_signals()
 
         # Verify that the signal was processed and trade was executed
-        self.mock_bot_core.executar_trade.assert_called_once_with('GBPJPY', 'put', 1)
+        self.mock_socket.connect.assert_called_once_with("tcp://127.0.0.1:5557")
+        self.mock_bot_core.executar_trade.assert_called_once()
+        args = self.mock_bot_core.executar_trade.call_args.args
+        self.assertEqual(args[:3], ('GBPJPY', 'put', 1))
+        self.assertEqual(args[3]['source'], 'MT4:default') # Texto legado também leva a fonte no contexto
+
+    def test_listener_stops_on_control_message(self):
+        """stop() wakes the blocked poll through the control socket."""
+        self.mock_poller.poll.return_value = [(self.mock_control_socket, zmq.POLLIN)]
+        self.mock_stop_event.is_set.return_value = False
+
+        self.strategy._listen_for_signals()
+
+        self.mock_socket.close.assert_called_once()
+        self.mock_status_callback.assert_called_with("MT4", "PARADO", "Desconectado")
+
+    @patch('time.time', return_value=1736950200.373)
+    def test_structured_batch_is_dispatched_with_context(self, mock_time):
+        """A JSON batch frame yields one executor call per signal, carrying id and send timestamp."""
+        frame = json.dumps({"v": 1, "type": "batch", "ts": 1736950200123, "signals": [
+            {"id": "a1", "asset": "eurusd", "direction": "buy", "timeframe": 5},
+            {"id": "a2", "asset": "USDJPY", "direction": "put", "timeframe": 1, "stake": 3}
+        ]})
+        self.strategy._handle_message(frame)
+
+        self.assertEqual(self.mock_bot_core.executar_trade.call_count, 2)
+        first = self.mock_bot_core.executar_trade.call_args_list[0]
+        self.assertEqual(first.args[:3], ('EURUSD', 'call', 5))
+        self.assertEqual(first.args[3]['signal_id'], 'a1')
+        self.assertAlmostEqual(first.args[3]['signal_ts'], 1736950200.123)
+        self.assertEqual(self.mock_bot_core.executar_trade.call_args_list[1].args[3]['stake'], 3.0)
+        self.assertAlmostEqual(self.strategy.last_signal_latency, 0.25)
+
+    def test_invalid_structured_message_is_rejected(self):
+        self.strategy._handle_message('{"v": 9, "type": "signal"}')
+        self.mock_bot_core.executar_trade.assert_not_called()
+        self.mock_bot_core.log_callback.assert_called_with("Mensagem do MT4 rejeitada: Versão de protocolo não suportada: 9", "ERRO")
+
+    def test_bad_batch_item_does_not_drop_the_frame(self):
+        """An invalid item (non-dict or bad stake) is skipped and logged; the rest of the batch is dispatched."""
+        frame = json.dumps({"v": 1, "type": "batch", "signals": [
+            ["not", "a", "signal"],
+            {"id": "b1", "asset": "EURUSD", "direction": "call", "stake": "x"},
+            {"id": "b2", "asset": "EURJPY", "direction": "put"}
+        ]})
+        self.strategy._handle_message(frame)
+        self.mock_bot_core.executar_trade.assert_called_once()
+        self.assertEqual(self.mock_bot_core.executar_trade.call_args.args[3]['signal_id'], 'b2')
+        avisos = [c for c in self.mock_bot_core.log_callback.call_args_list if c.args[1] == "AVISO"]
+        self.assertEqual(len(avisos), 2)
+        self.mock_status_callback.assert_not_called()
+
+    @patch('time.time', return_value=1736950200.0)
+    def test_legacy_text_keeps_source_and_arrival_time(self, mock_time):
+        self.strategy._handle_message("EUR/USD SUPER VENDA M5", "ea-legado")
+        self.mock_bot_core.executar_trade.assert_called_once()
+        args = self.mock_bot_core.executar_trade.call_args.args
+        self.assertEqual(args[:3], ('EUR/USD', 'put', 5))
+        self.assertEqual(args[3]['source'], 'MT4:ea-legado')
+        self.assertEqual(args[3]['received_ts'], 1736950200.0)
+        self.mock_bot_core.log_callback.assert_any_call("Sinal recebido do MT4: 'EUR/USD SUPER VENDA M5'", "INFO")
+        self.assertIn('ea-legado', self.strategy.sources_online)
+
+    def test_multiple_endpoints_and_topics(self):
+        """One SUB socket connects to every configured terminal and subscribes to each topic."""
+        self.mock_bot_core.config = {'mt4_endpoint': 'tcp://127.0.0.1:5557, tcp://127.0.0.1:5560', 'mt4_topics': 'ea1,ea2'}
+        strategy = MT4Strategy(self.mock_bot_core, self.mock_zmq_context, self.mock_status_callback)
+        self.mock_poller.poll.return_value = [(self.mock_control_socket, zmq.POLLIN)]
+
+        strategy._listen_for_signals()
+
+        self.assertEqual([c.args[0] for c in self.mock_socket.connect.call_args_list], ['tcp://127.0.0.1:5557', 'tcp://127.0.0.1:5560'])
+        self.mock_socket.setsockopt_string.assert_any_call(zmq.SUBSCRIBE, 'ea1')
+        self.mock_socket.setsockopt_string.assert_any_call(zmq.SUBSCRIBE, 'ea2')
+
+    def test_signals_are_tagged_with_source(self):
+        """The source comes from the message, else from the ZMQ topic."""
+        payload = json.dumps({"v": 1, "type": "signal", "asset": "EURUSD", "direction": "call"})
+        topic, raw = MT4Strategy._split_frame([b"ea1", payload.encode()])
+        self.strategy._handle_message(raw, topic)
+        topic, raw = MT4Strategy._split_frame([f"ea2 {payload}".encode()])
+        self.strategy._handle_message(raw, topic)
+        self.strategy._handle_message(json.dumps({"v": 1, "type": "heartbeat", "source": "ea3"}))
+
+        sources = [c.args[3]['source'] for c in self.mock_bot_core.executar_trade.call_args_list]
+        self.assertEqual(sources, ['MT4:ea1', 'MT4:ea2'])
+        self.assertEqual(set(self.strategy.get_source_status()), {'ea1', 'ea2', 'ea3'})
+
+    @patch('time.time')
+    def test_per_source_heartbeat_expiry(self, mock_time):
+        mock_time.return_value = 100
+        self.strategy._handle_message('{"v": 1, "type": "heartbeat", "source": "ea1"}')
+        mock_time.return_value = 110
+        self.strategy._handle_message('{"v": 1, "type": "heartbeat", "source": "ea2"}')
+
+        self.strategy._expire_sources(120)
+        self.assertEqual(self.strategy.sources_online, {'ea2'})
+        self.mock_bot_core.log_callback.assert_called_with("EA 'ea1' sem sinal há mais de 15s.", "AVISO")
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,78 @@
+
+import unittest
+from unittest.mock import MagicMock, patch
+import tempfile
+import shutil
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.news_service import NewsService
+from ui.components.news_scraper import parse_news_html
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'investing_calendar.html')
+
+class TestNewsService(unittest.TestCase):
+
+    def setUp(self):
+        with open(FIXTURE, 'rb') as f:
+            self.html = f.read()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.downloader = MagicMock(return_value=self.html)
+        with patch('bot.news_service.resource_path', return_value=self.tmp_dir):
+            self.service = NewsService(minutos_antes=15, minutos_depois=15, downloader=self.downloader)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_parse_fixture_keeps_only_high_impact(self):
+        """Parsing works offline and drops 1-bull and malformed rows."""
+        news = parse_news_html(self.html)
+        self.assertEqual([n['currency'] for n in news], ['USD', 'USD', 'GBP'])
+        self.assertEqual(news[0]['time'], '10:30')
+        self.assertEqual(news[0]['datetime'], '2025-01-15T10:30:00')
+        self.assertEqual(news[0]['impact'], 3)
+
+    def test_get_news_downloads_once_and_caches_on_disk(self):
+        first = self.service.get_news()
+        second = self.service.get_news()
+        self.assertEqual(first, second)
+        self.downloader.assert_called_once()
+        self.assertEqual(len(os.listdir(self.tmp_dir)), 1)
+
+        # A fresh service on the same day reads the disk cache instead of the network
+        other_downloader = MagicMock()
+        with patch('bot.news_service.resource_path', return_value=self.tmp_dir):
+            other = NewsService(downloader=other_downloader)
+        self.assertEqual(other.get_news(), first)
+        other_downloader.assert_not_called()
+
+    def test_download_failure_returns_empty_list(self):
+        self.downloader.side_effect = OSError("sem rede")
+        self.assertEqual(self.service.get_news(), [])
+
+    def test_blocked_windows_are_merged_per_currency(self):
+        self.service.load_news(parse_news_html(self.html))
+        # USD 10:30 and 10:40 windows overlap -> a single 10:15-10:55 window
+        self.assertEqual(len(self.service.blocked_index['USD'][0]), 1)
+
+        self.assertTrue(self.service.is_blocked('EURUSD', datetime(2025, 1, 15, 10, 15)))
+        self.assertTrue(self.service.is_blocked('EUR/USD-OTC', datetime(2025, 1, 15, 10, 50)))
+        self.assertFalse(self.service.is_blocked('EURUSD', datetime(2025, 1, 15, 10, 56)))
+        self.assertFalse(self.service.is_blocked('EURUSD', datetime(2025, 1, 15, 10, 14)))
+        self.assertFalse(self.service.is_blocked('AUDCAD', datetime(2025, 1, 15, 10, 30)))
+
+        event = self.service.blocking_event('GBPJPY', datetime(2025, 1, 15, 16, 5))
+        self.assertEqual(event['currency'], 'GBP')
+
+    def test_set_windows_rebuilds_index(self):
+        self.service.load_news(parse_news_html(self.html))
+        at = datetime(2025, 1, 15, 16, 20)
+        self.assertFalse(self.service.is_blocked('GBPUSD', at))
+        self.service.set_windows(5, 30)
+        self.assertTrue(self.service.is_blocked('GBPUSD', at))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+
+import unittest
+import threading
+import random
+import time
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from iqoptionapi.stable_api import IQ_Option
+from iqoptionapi.order_gateway import OrderGateway
+from iqoptionapi.ws.received.option import option
+from iqoptionapi.ws.received.result import result
+
+class TestOrderGateway(unittest.TestCase):
+
+    def test_request_ids_are_unique_and_monotonic(self):
+        gateway = OrderGateway()
+        ids = [gateway.open().request_id for _ in range(3)]
+        self.assertEqual(ids, ["buy-1", "buy-2", "buy-3"])
+        self.assertEqual(gateway.in_flight(), 3)
+
+    def test_unknown_request_ids_are_left_to_the_legacy_fields(self):
+        gateway = OrderGateway()
+        self.assertFalse(gateway.on_option("7", {"id": 1}))
+        self.assertFalse(gateway.on_result("7", {"success": True}))
+
+    def test_failed_result_completes_the_order(self):
+        gateway = OrderGateway()
+        order = gateway.open()
+        gateway.on_result(order.request_id, {"success": False, "message": "active is suspended"})
+        self.assertTrue(gateway.wait(order, 0))
+        self.assertFalse(order.accepted)
+        self.assertEqual(order.message, "active is suspended")
+        self.assertEqual(gateway.in_flight(), 0)
+
+class TestConcurrentBuy(unittest.TestCase):
+
+    def setUp(self):
+        self.iq = IQ_Option("a@b.com", "pw")
+        self.api = MagicMock()
+        self.api.state = self.iq.state
+        self.api.buy_multi_option = {}
+        self.iq.api = self.api
+        self.api.buyv3.side_effect = self._server
+
+    def _server(self, price, active, direction, duration, request_id):
+        """Responde fora de ordem, como a corretora com várias ordens em voo."""
+        def reply():
+            time.sleep(random.uniform(0, 0.02))
+            result(self.api, {"name": "result", "request_id": request_id, "msg": {"success": True}})
+            if price < 0:
+                option(self.api, {"name": "option", "request_id": request_id, "msg": {"message": "invalid amount"}})
+            else:
+                option(self.api, {"name": "option", "request_id": request_id, "msg": {"id": int(price * 100)}})
+        threading.Thread(target=reply).start()
+
+    def test_many_concurrent_buys_get_their_own_answers(self):
+        prices = [round(1 + i / 100.0, 2) for i in range(50)] + [-1.0]
+        answers = {}
+        def place(price):
+            answers[price] = self.iq.buy(price, "EURUSD", "call", 1)
+        threads = [threading.Thread(target=place, args=(p,)) for p in prices]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        for price in prices[:-1]:
+            self.assertEqual(answers[price], (True, int(price * 100)))
+        self.assertEqual(answers[-1.0], (False, "invalid amount"))
+        self.assertEqual(self.iq.state.orders.in_flight(), 0)
+        self.assertEqual(self.api.buy_multi_option, {})
+
+    def test_buy_batch_pipelines_sends_before_waiting(self):
+        orders = [(1.0, "EURUSD", "call", 1), (-1.0, "GBPUSD", "put", 1), (3.0, "EURJPY", "call", 5)]
+        results = self.iq.buy_batch(orders)
+        self.assertEqual([r[:2] for r in results], [(True, 100), (False, "invalid amount"), (True, 300)])
+        sent = [r[2] for r in results]
+        self.assertEqual(sent, sorted(sent))
+        self.assertLess(sent[-1] - sent[0], 0.01) # Todas enviadas antes da primeira resposta
+        self.assertTrue(all(r[3] >= r[2] for r in results))
+        self.assertEqual(self.iq.buy_multi([1.0, 2.0], ["EURUSD", "EURUSD"], ["call", "put"], [1, 1]), [100, 200])
+
+    def test_buy_timeout(self):
+        self.api.buyv3.side_effect = None
+        self.assertEqual(self.iq.buy(1, "EURUSD", "call", 1, timeout=0.05), (False, "Timeout"))
+        self.assertEqual(self.iq.state.orders.in_flight(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+
+import unittest
+import threading
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from iqoptionapi.server_clock import ServerClock
+
+SERVER_EPOCH = 1736950200.0
+
+class FakeMonotonic:
+    def __init__(self):
+        self.now = 100.0
+    def __call__(self):
+        return self.now
+
+class TestServerClock(unittest.TestCase):
+
+    def setUp(self):
+        self.mono = FakeMonotonic()
+        self.clock = ServerClock(monotonic=self.mono)
+
+    def test_interpolates_between_frames(self):
+        self.assertFalse(self.clock.synced)
+        self.clock.add_sample(SERVER_EPOCH * 1000)
+        self.mono.now += 0.7371
+        self.assertTrue(self.clock.synced)
+        self.assertAlmostEqual(self.clock.server_now(), SERVER_EPOCH + 0.7371, places=6)
+        self.assertEqual(self.clock.server_now_ms(), int(SERVER_EPOCH * 1000) + 737)
+
+    def test_least_delayed_frame_is_the_anchor(self):
+        # Frames sent every second, delivered with 80 ms, 10 ms and 150 ms of network delay
+        for i, delay in enumerate((0.08, 0.01, 0.15)):
+            self.mono.now = 100.0 + i + delay
+            self.clock.add_sample((SERVER_EPOCH + i) * 1000)
+        # True offset is SERVER_EPOCH - 100; the 10 ms frame sets the estimate
+        self.assertAlmostEqual(self.clock.server_now() - self.mono.now, SERVER_EPOCH - 100.0 - 0.01, places=6)
+
+    def test_estimates_drift(self):
+        drift = 200e-6 # Servidor adianta 200 ppm em relação ao relógio local
+        for i in range(30):
+            self.mono.now = 100.0 + i
+            self.clock.add_sample((SERVER_EPOCH + i * (1 + drift)) * 1000)
+        self.assertAlmostEqual(self.clock.drift, drift, places=8)
+        self.mono.now += 10
+        self.assertAlmostEqual(self.clock.server_now(), SERVER_EPOCH + 39 * (1 + drift), places=5)
+
+    def test_sleep_until(self):
+        clock = ServerClock() # Relógio monotônico real
+        clock.add_sample(SERVER_EPOCH * 1000)
+        target = clock.server_now() + 0.12
+        self.assertTrue(clock.sleep_until(target))
+        self.assertLess(clock.server_now() - target, 0.01)
+        self.assertTrue(clock.sleep_until(target - 1)) # Já passou: retorna na hora
+
+        stop = threading.Event()
+        stop.set()
+        self.assertFalse(clock.sleep_until(clock.server_now() + 5, stop))
+
+if __name__ == '__main__':
+    unittest.main()
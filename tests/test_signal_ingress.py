@@ -0,0 +1,68 @@
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.signal_ingress import SignalIngress
+
+NOW = 1736950200.0 # 14:10:00 UTC
+
+class TestSignalIngress(unittest.TestCase):
+
+    def test_drop_policy_rejects_repeats_and_counts_per_source(self):
+        ingress = SignalIngress(janela=30, politica='drop')
+        self.assertEqual(ingress.admit('EURUSD', 'call', 5, {'source': 'MT4:ea1'}, now=NOW)[0], 'enqueue')
+        self.assertEqual(ingress.admit('eurusd', 'CALL', 5, {'source': 'MT4:ea2'}, now=NOW + 3)[0], 'dropped')
+        self.assertEqual(ingress.admit('EURUSD', 'call', 5, {'source': 'MT4:ea2'}, now=NOW + 4)[0], 'dropped')
+        self.assertEqual(ingress.drops_by_source(), {'MT4:ea2': 2})
+
+        # Outra direção, timeframe ou vela de expiração não são duplicatas
+        self.assertEqual(ingress.admit('EURUSD', 'put', 5, {}, now=NOW + 5)[0], 'enqueue')
+        self.assertEqual(ingress.admit('EURUSD', 'call', 1, {}, now=NOW + 5)[0], 'enqueue')
+        self.assertEqual(ingress.admit('EURUSD', 'call', 5, {}, now=NOW + 300)[0], 'enqueue')
+
+    def test_window_expiry_allows_the_signal_again(self):
+        ingress = SignalIngress(janela=10, politica='drop')
+        self.assertEqual(ingress.admit('EURUSD', 'call', 15, {}, now=NOW)[0], 'enqueue')
+        self.assertEqual(ingress.admit('EURUSD', 'call', 15, {}, now=NOW + 11)[0], 'enqueue')
+        self.assertEqual(len(ingress.index), 1)
+
+    def test_merge_annotates_the_pending_request(self):
+        ingress = SignalIngress(janela=30, politica='merge')
+        pending = {'signal_id': 1, 'source': 'MT4:ea1'}
+        ingress.admit('GBPUSD', 'put', 1, pending, now=NOW)
+        novo = {'signal_id': 2, 'source': 'MT4:ea2'}
+        self.assertEqual(ingress.admit('GBPUSD', 'put', 1, novo, now=NOW + 1), ('merged', novo))
+        self.assertEqual(pending['signal_id'], 1)
+        self.assertEqual(pending['merged_signals'], [{'signal_id': 2, 'source': 'MT4:ea2'}])
+
+    def test_last_wins_replaces_context_in_place(self):
+        ingress = SignalIngress(janela=30, politica='last_wins')
+        pending = {'signal_id': 1, 'stake': 2.0}
+        ingress.admit('GBPUSD', 'put', 1, pending, now=NOW)
+        destino, superado = ingress.admit('GBPUSD', 'put', 1, {'signal_id': 2, 'stake': 5.0}, now=NOW + 1)
+        self.assertEqual(destino, 'replaced')
+        self.assertEqual(pending, {'signal_id': 2, 'stake': 5.0})
+        self.assertEqual(superado, {'signal_id': 1, 'stake': 2.0}) # Recebe o ack de duplicata
+
+    def test_repeats_after_dispatch_are_always_dropped(self):
+        ingress = SignalIngress(janela=30, politica='last_wins')
+        pending = {'signal_id': 1}
+        ingress.admit('GBPUSD', 'put', 1, pending, now=NOW)
+        ingress.mark_dispatched(pending)
+        self.assertEqual(ingress.admit('GBPUSD', 'put', 1, {'signal_id': 2}, now=NOW + 1)[0], 'dropped')
+        self.assertEqual(pending, {'signal_id': 1})
+
+    def test_zero_window_disables_dedup(self):
+        ingress = SignalIngress(janela=0)
+        self.assertEqual(ingress.admit('EURUSD', 'call', 1, {}, now=NOW)[0], 'enqueue')
+        self.assertEqual(ingress.admit('EURUSD', 'call', 1, {}, now=NOW)[0], 'enqueue')
+
+    def test_invalid_policy_raises(self):
+        with self.assertRaises(ValueError):
+            SignalIngress(politica='random')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -57,11 +57,10 @@ class TestSignalListStrategy(unittest.TestCase):
         self.threads.append(thread)
         return thread
 
-    @patch('bot.strategies.signal_list_strategy.datetime')
-    def test_execute_timely_signal(self, mock_datetime):
+    def test_execute_timely_signal(self):
         """Test executing a signal that is on time (<= 3 seconds)."""
-        # Set current time to 10:30:02
-        mock_datetime.now.return_value = datetime(2023, 1, 1, 10, 30, 2)
+        # Set current server time to 10:30:02
+        self.mock_bot_core.api.server_now.return_value = datetime(2023, 1, 1, 10, 30, 2).timestamp()
         
         # Stop the loop after one iteration
         self.mock_stop_event.is_set.side_effect = [False, True]
@@ -74,11 +73,10 @@ class TestSignalListStrategy(unittest.TestCase):
         # Verify status was updated
         self.assertEqual(self.signals[0]['status'], 'executing')
 
-    @patch('bot.strategies.signal_list_strategy.datetime')
-    def test_skip_expired_signal(self, mock_datetime):
+    def test_skip_expired_signal(self):
         """Test skipping a signal that is late (> 3 seconds)."""
-        # Set current time to 10:30:04
-        mock_datetime.now.return_value = datetime(2023, 1, 1, 10, 30, 4)
+        # Set current server time to 10:30:04
+        self.mock_bot_core.api.server_now.return_value = datetime(2023, 1, 1, 10, 30, 4).timestamp()
 
         self.mock_stop_event.is_set.side_effect = [False, True]
         self.strategy._run_loop()
@@ -92,23 +90,21 @@ class TestSignalListStrategy(unittest.TestCase):
         # Verify status was updated
         self.assertEqual(self.signals[0]['status'], 'expired')
 
-    @patch('bot.strategies.signal_list_strategy.datetime')
-    def test_no_action_if_no_pending_signal_for_current_time(self, mock_datetime):
+    def test_no_action_if_no_pending_signal_for_current_time(self):
         """Test that nothing happens if no signal matches the current time."""
-        # Set current time to 10:31:01
-        mock_datetime.now.return_value = datetime(2023, 1, 1, 10, 31, 1)
+        # Set current server time to 10:31:01
+        self.mock_bot_core.api.server_now.return_value = datetime(2023, 1, 1, 10, 31, 1).timestamp()
 
         self.mock_stop_event.is_set.side_effect = [False, True]
         self.strategy._run_loop()
 
         self.mock_bot_core.executar_trade.assert_not_called()
 
-    @patch('bot.strategies.signal_list_strategy.datetime')
-    def test_no_action_if_signal_is_not_pending(self, mock_datetime):
+    def test_no_action_if_signal_is_not_pending(self):
         """Test that it ignores signals with status other than 'pending'."""
         self.signals[0]['status'] = 'executed'
-        # Set current time to 10:30:01
-        mock_datetime.now.return_value = datetime(2023, 1, 1, 10, 30, 1)
+        # Set current server time to 10:30:01
+        self.mock_bot_core.api.server_now.return_value = datetime(2023, 1, 1, 10, 30, 1).timestamp()
 
         self.mock_stop_event.is_set.side_effect = [False, True]
         self.strategy._run_loop()
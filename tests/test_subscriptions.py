@@ -0,0 +1,100 @@
+
+import unittest
+import sys
+import os
+import itertools
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import iqoptionapi.constants as OP_code
+from iqoptionapi.subscriptions import SubscriptionManager
+from iqoptionapi.stable_api import IQ_Option
+
+class TestSubscriptionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.canceladas = []
+        self.manager = SubscriptionManager(self.canceladas.append, max_streams=2)
+
+    def test_stream_compartilhado_so_cancela_no_ultimo_consumidor(self):
+        chave = ("candles", "EURUSD", 60)
+        self.assertTrue(self.manager.acquire(chave))
+        self.assertFalse(self.manager.acquire(chave))
+        self.assertFalse(self.manager.release(chave))
+        self.assertEqual(self.canceladas, [])
+        self.assertTrue(self.manager.release(chave))
+        self.assertEqual(self.canceladas, [chave])
+        self.assertFalse(self.manager.release(chave))
+
+    def test_limite_despeja_o_ocioso_mais_antigo(self):
+        a, b, c = ("price-splitter", 1, None), ("price-splitter", 2, None), ("price-splitter", 3, None)
+        self.manager.acquire(a)
+        self.manager.acquire(b)
+        self.manager.release(a, keep_idle=True)
+        self.manager.release(b, keep_idle=True)
+        # Reusar "a" o torna o mais recente; "b" é o ocioso mais antigo
+        self.assertFalse(self.manager.acquire(a))
+        self.manager.release(a, keep_idle=True)
+        self.assertTrue(self.manager.acquire(c))
+        self.assertEqual(self.canceladas, [b])
+        self.assertEqual(self.manager.stats()["evicted"], 1)
+
+    def test_limite_sem_ociosos_recusa(self):
+        self.manager.acquire(("candles", "EURUSD", 60))
+        self.manager.acquire(("candles", "GBPUSD", 60))
+        self.assertIsNone(self.manager.acquire(("candles", "USDJPY", 60)))
+        self.assertEqual(self.canceladas, [])
+
+class TestIQOptionSubscriptions(unittest.TestCase):
+
+    def setUp(self):
+        self.iq = IQ_Option("a@b.com", "pw")
+        self.iq.api = MagicMock()
+        self.iq.api.candle_generated_check = {"EURUSD": {}}
+        # O servidor confirma a assinatura de velas
+        self.iq.api.subscribe.side_effect = lambda _id, size: self.iq.api.candle_generated_check["EURUSD"].update({size: True})
+
+    def test_dois_consumidores_do_mesmo_stream_de_velas(self):
+        self.assertTrue(self.iq.start_candles_one_stream("EURUSD", 60))
+        self.iq.get_candles = lambda ativo, size, count, fim: []
+        self.assertIs(self.iq.start_candles_stream("EURUSD", 60, 10), True)
+        self.iq.stop_candles_one_stream("EURUSD", 60)
+        self.iq.api.unsubscribe.assert_not_called()
+        self.assertEqual(self.iq.subscribe_candle, ["EURUSD,60"])
+        self.iq.stop_candles_one_stream("EURUSD", 60)
+        self.iq.api.unsubscribe.assert_called_once_with(OP_code.ACTIVES["EURUSD"], 60)
+        self.assertEqual(self.iq.subscribe_candle, [])
+
+    @patch('iqoptionapi.stable_api.time.sleep')
+    @patch('iqoptionapi.stable_api.time.time', side_effect=itertools.count(0, 15))
+    def test_stream_sem_confirmacao_libera_a_referencia(self, mock_time, mock_sleep):
+        self.iq.api.subscribe.side_effect = None # O servidor nunca confirma
+        self.iq.api.subscribe_all_size.side_effect = None
+        self.assertFalse(self.iq.start_candles_one_stream("EURUSD", 60))
+        self.assertFalse(self.iq.start_candles_all_size_stream("EURUSD"))
+        self.assertEqual(self.iq.subscriptions.stats()["streams"], 0)
+        self.assertEqual(self.iq.subscribe_candle, [])
+
+        self.iq.get_candles = lambda ativo, size, count, fim: []
+        self.assertIs(self.iq.start_candles_stream("EURUSD", 60, 10), False)
+        self.assertFalse(self.iq.start_candles_aggregated("EURUSD", [60, 300], 10))
+        self.assertEqual(self.iq.state.candle_aggregator.sizes("EURUSD", 60), [])
+
+    def test_payout_reusa_a_assinatura(self):
+        asset_id = OP_code.ACTIVES["EURUSD"]
+        self.iq.api.subscribe_digital_price_splitter.side_effect = lambda _id: self.iq.state.digital_payouts.update({_id: 88})
+        self.assertEqual(self.iq.get_digital_payout("EURUSD", 1), 88)
+        self.assertEqual(self.iq.get_digital_payout("EURUSD", 1), 88)
+        self.iq.api.subscribe_digital_price_splitter.assert_called_once_with(asset_id)
+        self.iq.api.unsubscribe_digital_price_splitter.assert_not_called()
+
+    def test_reconexao_reassina_pelo_gerenciador(self):
+        self.iq.subscriptions.acquire(("traders-mood", "EURUSD", "turbo-option"))
+        self.iq.subscriptions.acquire(("price-splitter", 1, None))
+        self.assertEqual(self.iq.re_subscribe_stream(timeout=0), (0, 0))
+        self.iq.api.subscribe_Traders_mood.assert_called_once_with(OP_code.ACTIVES["EURUSD"], "turbo-option")
+        self.iq.api.subscribe_digital_price_splitter.assert_called_once_with(1)
+
+if __name__ == '__main__':
+    unittest.main()
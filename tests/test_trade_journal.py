@@ -0,0 +1,104 @@
+
+import unittest
+from unittest.mock import patch
+import tempfile
+import shutil
+import sqlite3
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.trade_journal import TradeJournal
+
+class TestTradeJournal(unittest.TestCase):
+
+    def setUp(self):
+        """Create a journal backed by a temporary SQLite file."""
+        self.tmp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(self.tmp_dir, 'journal.db')
+        with patch('utils.trade_journal.resource_path', return_value=db_path):
+            self.journal = TradeJournal(db_path='journal.db', flush_interval=0.05)
+
+    def tearDown(self):
+        self.journal.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _ts(self, day, hour):
+        return datetime(2025, 1, day, hour, 30).timestamp()
+
+    def test_record_trade_does_not_write_until_flushed(self):
+        """Records are only queued on the caller's thread."""
+        self.journal.record_trade(ativo='EURUSD', lucro=1.5, valor_entrada=2.0)
+        self.assertEqual(self.journal.write_queue.qsize(), 1)
+        self.assertEqual(self.journal.recent_trades(), [])
+
+        self.journal.flush()
+        trades = self.journal.recent_trades()
+        self.assertEqual(len(trades), 1)
+        self.assertEqual(trades[0]['ativo'], 'EURUSD')
+
+    def test_background_writer_persists_batches(self):
+        """The writer thread drains the queue and stores martingale levels and latency stamps."""
+        self.journal.start()
+        for nivel in range(3):
+            self.journal.record_trade(ativo='GBPUSD', nivel_martingale=nivel, valor_entrada=2.0 * (nivel + 1),
+                                      lucro=-2.0 if nivel < 2 else 3.4, order_sent_ts=100.0, order_ack_ts=100.2,
+                                      context={'signal_id': 7})
+        self.journal.flush()
+
+        trades = self.journal.recent_trades()
+        self.assertEqual(sorted(t['nivel_martingale'] for t in trades), [0, 1, 2])
+        self.assertAlmostEqual(trades[0]['order_ack_ts'] - trades[0]['order_sent_ts'], 0.2)
+        self.assertIn('"signal_id": 7', trades[0]['context'])
+
+    def test_win_rate_by_asset_and_hour(self):
+        self.journal.record_trade(timestamp=self._ts(1, 10), ativo='EURUSD', lucro=1.0)
+        self.journal.record_trade(timestamp=self._ts(1, 10), ativo='EURUSD', lucro=-1.0)
+        self.journal.record_trade(timestamp=self._ts(1, 14), ativo='USDJPY', lucro=2.0)
+        self.journal.record_trade(timestamp=self._ts(1, 14), ativo='USDJPY', resultado='REJEITADA')
+        self.journal.flush()
+
+        by_asset = self.journal.win_rate_by('ativo')
+        self.assertEqual(by_asset['EURUSD']['winrate'], 50)
+        self.assertEqual(by_asset['USDJPY']['total'], 1)
+
+        by_hour = self.journal.win_rate_by('hora')
+        self.assertEqual(set(by_hour.keys()), {10, 14})
+
+        with self.assertRaises(ValueError):
+            self.journal.win_rate_by('lucro; DROP TABLE trades')
+
+    def test_pnl_by_day(self):
+        self.journal.record_trade(timestamp=self._ts(2, 9), lucro=5.0)
+        self.journal.record_trade(timestamp=self._ts(1, 9), lucro=-2.0)
+        self.journal.record_trade(timestamp=self._ts(2, 11), lucro=1.25)
+        self.journal.flush()
+
+        self.assertEqual(self.journal.pnl_by_day(), [('2025-01-01', -2.0), ('2025-01-02', 6.25)])
+        self.assertEqual(self.journal.pnl_by_day(days=1), [('2025-01-02', 6.25)])
+
+    def test_conta_separa_a_principal_das_copias(self):
+        self.journal.record_trade(conta='principal', ativo='EURUSD', lucro=1.0)
+        self.journal.record_trade(conta='mesa2', ativo='EURUSD', lucro=-1.0)
+        self.journal.flush()
+        by_account = self.journal.win_rate_by('conta')
+        self.assertEqual((by_account['principal']['wins'], by_account['mesa2']['losses']), (1, 1))
+
+    def test_diario_antigo_ganha_a_coluna_conta(self):
+        db_path = os.path.join(self.tmp_dir, 'antigo.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE trades (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL NOT NULL, dia TEXT NOT NULL, "
+                     "hora INTEGER NOT NULL, ativo TEXT, direcao TEXT, timeframe INTEGER, estrategia TEXT, gerenciador TEXT, "
+                     "nivel_martingale INTEGER DEFAULT 0, valor_entrada REAL, lucro REAL, resultado TEXT, trade_id TEXT, "
+                     "signal_ts REAL, order_sent_ts REAL, order_ack_ts REAL, result_ts REAL, context TEXT)")
+        conn.close()
+        with patch('utils.trade_journal.resource_path', return_value=db_path):
+            journal = TradeJournal(db_path='antigo.db')
+        journal.record_trade(conta='mesa2', lucro=2.0)
+        journal.flush()
+        self.assertEqual(journal.recent_trades()[0]['conta'], 'mesa2')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ui.update_bus import UIUpdateBus
+
+class TestUIUpdateBus(unittest.TestCase):
+
+    def test_coalescidas_ficam_so_com_a_ultima_de_cada_chave(self):
+        bus = UIUpdateBus()
+        metricas, status = object(), object()
+        bus.post_coalesced('metricas', metricas, 1)
+        bus.post_coalesced('status', status, 'IQ')
+        bus.post_coalesced('metricas', metricas, 2)
+        _, coalescidas, _ = bus.drain()
+        # A chave republicada vai para o fim, com os argumentos mais recentes
+        self.assertEqual(coalescidas, [(status, ('IQ',)), (metricas, (2,))])
+        self.assertEqual(bus.drain(), ([], [], []))
+
+    def test_eventos_na_ordem_de_chegada_sem_descarte(self):
+        bus = UIUpdateBus()
+        for i in range(5000):
+            bus.post_event(print, i)
+        _, _, eventos = bus.drain()
+        self.assertEqual([args[0] for _, args in eventos], list(range(5000)))
+
+    def test_linhas_de_log_excedentes_sao_contadas(self):
+        bus = UIUpdateBus(max_log_lines=3)
+        for i in range(5):
+            bus.post_log(f"linha {i}\n")
+        linhas, _, _ = bus.drain()
+        self.assertEqual(linhas, ["linha 2\n", "linha 3\n", "linha 4\n"]) # Ficam as mais recentes
+        self.assertEqual(bus.dropped_log_lines, 2)
+
+if __name__ == '__main__':
+    unittest.main()
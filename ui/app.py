@@ -4,6 +4,7 @@ import logging
 import threading
 from utils.path_resolver import resource_path
 from utils.config_manager import ConfigManager
+from utils.trade_journal import TradeJournal
 from bot.app_controller import AppController
 from .login_frame import LoginFrame
 from .dashboard_frame import ModernDashboardFrame
@@ -14,6 +15,7 @@ class App(ctk.CTk):
         
         self.controller = None
         self.config_manager = ConfigManager()
+        self.trade_journal = TradeJournal()
         self.trade_logger = trade_logger
 
         # Configuração de fontes
@@ -81,7 +83,7 @@ class App(ctk.CTk):
                 self.title("Quantum Booster | Dashboard")
                 
                 # Cria o controller e o passa para o Dashboard
-                self.controller = AppController(credentials, self.config_manager, trade_logger=self.trade_logger)
+                self.controller = AppController(credentials, self.config_manager, trade_logger=self.trade_logger, trade_journal=self.trade_journal)
                 frame_to_show = ModernDashboardFrame(self.container, controller=self.controller, font_family=self.font_family)
                 self.frames[ModernDashboardFrame] = frame_to_show
                 frame_to_show.grid(row=0, column=0, sticky="nsew")
@@ -6,43 +6,51 @@ from datetime import datetime
 from tabulate import tabulate
 import logging
 
-def fetch_structured_news():
-    """Busca as notícias e retorna uma lista de dicionários estruturados."""
-    url = 'https://br.investing.com/economic-calendar/'
+NEWS_URL = 'https://br.investing.com/economic-calendar/'
+
+def download_calendar_html(url=NEWS_URL, timeout=20):
+    """Baixa o HTML bruto do calendário econômico."""
     req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.read()
+
+def parse_news_html(html, min_impact=2):
+    """Extrai as notícias do HTML do calendário (sem acesso à rede)."""
     news_list = []
-    
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find('table', {"id": "economicCalendarData"})
+    if not table or not table.find("tbody"):
+        logging.warning("Tabela de notícias não encontrada no site Investing.com.")
+        return []
+
+    for tr in table.find("tbody").find_all('tr', {"class": "js-event-item"}):
+        try:
+            event_dt = datetime.strptime(tr.attrs.get('data-event-datetime', ''), '%Y/%m/%d %H:%M:%S')
+            currency = tr.find('td', {"class": "flagCur"}).text.strip()
+            impact_tag = tr.find('td', {"class": "sentiment"})
+            impact = len(impact_tag.find_all("i", {"class": "grayFullBullishIcon"})) if impact_tag else 0
+            event_name = tr.find('td', class_="event").text.strip()
+
+            if impact >= min_impact: # Apenas notícias de 2 ou 3 touros
+                news_list.append({
+                    "time": event_dt.strftime("%H:%M"),
+                    "datetime": event_dt.isoformat(),
+                    "currency": currency,
+                    "impact": impact,
+                    "event": event_name
+                })
+        except Exception:
+            # Ignora linhas mal formatadas ou sem todos os dados
+            continue
+    return news_list
+
+def fetch_structured_news():
+    """Busca as notícias e retorna uma lista de dicionários estruturados."""
     try:
-        with urllib.request.urlopen(req) as response:
-            soup = BeautifulSoup(response.read(), "html.parser")
-            table = soup.find('table', {"id": "economicCalendarData"})
-            if not table:
-                logging.warning("Tabela de notícias não encontrada no site Investing.com.")
-                return []
-            
-            for tr in table.find("tbody").findAll('tr', {"class": "js-event-item"}):
-                try:
-                    time_str = datetime.strptime(tr.attrs.get('data-event-datetime', ''), '%Y/%m/%d %H:%M:%S').strftime("%H:%M")
-                    currency = tr.find('td', {"class": "flagCur"}).text.strip()
-                    impact_tag = tr.find('td', {"class": "sentiment"})
-                    impact = len(impact_tag.findAll("i", {"class": "grayFullBullishIcon"})) if impact_tag else 0
-                    event_name = tr.find('td', class_="event").text.strip()
-                    
-                    if impact >= 2: # Apenas notícias de 2 ou 3 touros
-                        news_list.append({
-                            "time": time_str,
-                            "currency": currency,
-                            "impact": impact,
-                            "event": event_name
-                        })
-                except Exception:
-                    # Ignora linhas mal formatadas ou sem todos os dados
-                    continue 
+        return parse_news_html(download_calendar_html())
     except Exception as e:
         logging.error(f"Ocorreu um erro ao buscar notícias estruturadas: {e}")
         return []
-        
-    return news_list
 
 def get_formatted_news():
     """Usa os dados estruturados para criar uma tabela de texto formatada para a UI."""
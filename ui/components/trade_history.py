@@ -3,6 +3,7 @@
 import customtkinter as ctk
 from ..styles.theme import ModernTheme
 from ..styles.fonts import AppFonts
+from .virtual_list import VirtualListView
 from datetime import datetime
 import logging
 
@@ -13,7 +14,7 @@ class TradeHistoryCard(ctk.CTkFrame):
         
         # Configuração Centralizada das Colunas
         self.column_config = {
-            "status":   {"weight": 0, "minsize": 30, "stretch": False},
+            "status":   {"weight": 0, "minsize": 30, "stretch": False, "font": ("Arial", 16)},
             "hora":     {"weight": 1, "minsize": 60, "stretch": True,  "text": "HORA"},
             "ativo":    {"weight": 2, "minsize": 80, "stretch": True,  "text": "ATIVO"},
             "direcao":  {"weight": 1, "minsize": 60, "stretch": True,  "text": "DIREÇÃO"},
@@ -30,10 +31,12 @@ class TradeHistoryCard(ctk.CTkFrame):
         header_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=(0, 5))
         self._create_headers(header_frame)
 
-        self.scrollable_frame = ctk.CTkScrollableFrame(self, fg_color="transparent")
-        self.scrollable_frame.grid(row=2, column=0, sticky="nsew", padx=5, pady=(0, 5))
-        
-        self.trade_rows = []
+        # Lista virtualizada: só as linhas visíveis têm widgets, reaproveitados na rolagem
+        self.trade_list = VirtualListView(self, self.column_config, self._render_trade_row, row_height=34,
+                                          font=self.fonts.BODY_SMALL, follow_tail=True)
+        self.trade_list.grid(row=2, column=0, sticky="nsew", padx=5, pady=(0, 5))
+
+        self._next_trade_id = 0
 
     def _apply_column_config(self, parent_frame):
         """Aplica a configuração de colunas a um frame (header ou row)."""
@@ -55,41 +58,35 @@ class TradeHistoryCard(ctk.CTkFrame):
                 ctk.CTkLabel(parent, text=config["text"], font=header_font, text_color=text_color).grid(row=0, column=i, sticky="ew")
 
     def add_trade(self, trade_data):
-        """Adiciona uma nova linha de trade ao histórico."""
-        # Cria o frame da linha com altura fixa de 30px
-        row_frame = ctk.CTkFrame(self.scrollable_frame, fg_color=ModernTheme.BG_SECONDARY, height=30, corner_radius=8)
-        row_frame.pack_propagate(False) 
-        row_frame.pack(fill="x", padx=5, pady=2)
-        
-        self._apply_column_config(row_frame)
-        
-        # --- ESTA É A PARTE QUE ESTAVA FALTANDO ---
-        # Criação dos widgets com os dados do trade
-        status_color = ModernTheme.ACCENT_GREEN if trade_data['resultado'] == 'WIN' else ModernTheme.ACCENT_RED
-        ctk.CTkLabel(row_frame, text="●", font=("Arial", 16), text_color=status_color).grid(row=0, column=0, sticky="ew", pady=0)
-        
-        hora = datetime.now().strftime('%H:%M:%S')
-        ctk.CTkLabel(row_frame, text=hora, font=self.fonts.BODY_SMALL).grid(row=0, column=1, sticky="ew", pady=0)
+        """Adiciona um novo trade ao modelo do histórico (O(1)); apenas as linhas visíveis são redesenhadas."""
+        trade_id = trade_data.get('id', self._next_trade_id)
+        self._next_trade_id += 1
+        row = dict(trade_data)
+        row.setdefault('hora', datetime.now().strftime('%H:%M:%S'))
+        self.trade_list.append(trade_id, row)
+        return trade_id
 
-        ctk.CTkLabel(row_frame, text=trade_data['ativo'], font=self.fonts.BODY_SMALL).grid(row=0, column=2, sticky="ew", pady=0)
+    def update_trade(self, trade_id, trade_data):
+        """Atualiza um trade existente pelo id (O(1))."""
+        row = self.trade_list.get_item(trade_id)
+        if row is None:
+            return False
+        row = dict(row, **trade_data)
+        return self.trade_list.update_item(trade_id, row)
 
+    def _render_trade_row(self, trade_data):
+        status_color = ModernTheme.ACCENT_GREEN if trade_data['resultado'] == 'WIN' else ModernTheme.ACCENT_RED
         direcao_img = "🔼 CALL" if trade_data['direcao'] == 'call' else "🔽 PUT"
-        ctk.CTkLabel(row_frame, text=direcao_img, font=self.fonts.BODY_SMALL).grid(row=0, column=3, sticky="ew", pady=0)
-        
-        valor_text = f"{trade_data['cifrao']} {trade_data['valor']:.2f}"
-        ctk.CTkLabel(row_frame, text=valor_text, font=self.fonts.BODY_SMALL, text_color=ModernTheme.TEXT_MUTED).grid(row=0, column=4, sticky="ew", pady=0)
-
-        lucro_text = f"{trade_data['cifrao']} {trade_data['lucro']:+.2f}"
-        ctk.CTkLabel(row_frame, text=lucro_text, font=self.fonts.BODY_SMALL).grid(row=0, column=5, sticky="ew", pady=0)
-        # --- FIM DA PARTE QUE FALTAVA ---
-
-        self.trade_rows.append(row_frame)
-        self.scrollable_frame._parent_canvas.yview_moveto(1.0)
+        return [
+            ("●", status_color),
+            (trade_data['hora'], None),
+            (trade_data['ativo'], None),
+            (direcao_img, None),
+            (f"{trade_data['cifrao']} {trade_data['valor']:.2f}", ModernTheme.TEXT_MUTED),
+            (f"{trade_data['cifrao']} {trade_data['lucro']:+.2f}", None),
+        ]
 
     def clear_list(self):
         """Remove todas as linhas de trade da interface."""
-        # Este método deve estar no nível da classe, não dentro de outro método.
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        self.trade_rows.clear()
-        logging.info("Histórico de trades da UI foi limpo.")
\ No newline at end of file
+        self.trade_list.clear()
+        logging.info("Histórico de trades da UI foi limpo.")
@@ -0,0 +1,241 @@
+# ui/components/virtual_list.py
+
+import customtkinter as ctk
+from ..styles.theme import ModernTheme
+
+class VirtualListView(ctk.CTkFrame):
+    """
+    Lista virtualizada: mantém os dados num modelo (lista + índice por id) e desenha apenas
+    as linhas visíveis, reaproveitando um conjunto fixo de widgets de linha.
+
+    column_config segue o formato dos cards ({"weight", "minsize", ...}); colunas com
+    "action": True viram um botão que chama on_row_action(item_id).
+    row_renderer(item) retorna, para cada coluna sem ação, uma tupla (texto, cor_do_texto ou None).
+    """
+    MAX_POOL_ROWS = 60
+
+    def __init__(self, master, column_config, row_renderer, row_height=30, font=None,
+                 on_row_action=None, action_text="✕", empty_text="", follow_tail=False, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self.column_config = column_config
+        self.row_renderer = row_renderer
+        self.row_height = row_height
+        self.font = font
+        self.on_row_action = on_row_action
+        self.action_text = action_text
+        self.follow_tail = follow_tail
+        self._pinned_to_tail = True
+
+        self._items = []
+        self._ids = []
+        self._index = {} # id -> posição em _items
+        self._offset = 0
+        self._row_pool = []
+        self._render_pending = False
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.rows_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.rows_frame.grid(row=0, column=0, sticky="nsew")
+        self.rows_frame.grid_columnconfigure(0, weight=1)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.empty_label = ctk.CTkLabel(self.rows_frame, text=empty_text, text_color=ModernTheme.TEXT_MUTED)
+
+        self.rows_frame.bind("<Configure>", self._on_resize)
+        self._bind_mousewheel(self.rows_frame)
+        self._schedule_render()
+
+    # --- Modelo de dados ---
+    def __len__(self):
+        return len(self._items)
+
+    def append(self, item_id, item):
+        """Adiciona um item ao final em O(1)."""
+        if item_id in self._index:
+            self.update_item(item_id, item)
+            return
+        self._index[item_id] = len(self._items)
+        self._items.append(item)
+        self._ids.append(item_id)
+        if self.follow_tail and self._pinned_to_tail:
+            self._offset = max(0, len(self._items) - self._visible_count())
+        self._schedule_render()
+
+    def set_items(self, items_with_ids):
+        """Substitui todo o modelo por uma sequência de (id, item)."""
+        self._items = []
+        self._ids = []
+        self._index = {}
+        for item_id, item in items_with_ids:
+            self._index[item_id] = len(self._items)
+            self._items.append(item)
+            self._ids.append(item_id)
+        self._offset = 0
+        self._schedule_render()
+
+    def get_item(self, item_id):
+        pos = self._index.get(item_id)
+        return self._items[pos] if pos is not None else None
+
+    def update_item(self, item_id, item):
+        """Atualiza um item pelo id em O(1); só redesenha se a linha estiver visível."""
+        pos = self._index.get(item_id)
+        if pos is None:
+            return False
+        self._items[pos] = item
+        if self._offset <= pos < self._offset + len(self._row_pool):
+            self._schedule_render()
+        return True
+
+    def remove_item(self, item_id):
+        pos = self._index.pop(item_id, None)
+        if pos is None:
+            return False
+        del self._items[pos]
+        del self._ids[pos]
+        for i in range(pos, len(self._ids)):
+            self._index[self._ids[i]] = i
+        self._clamp_offset()
+        self._schedule_render()
+        return True
+
+    def clear(self, empty_text=None):
+        if empty_text is not None:
+            self.empty_label.configure(text=empty_text)
+        self.set_items([])
+
+    # --- Renderização ---
+    def _visible_count(self):
+        height = self.rows_frame.winfo_height()
+        if height <= 1:
+            return max(len(self._row_pool), 10)
+        return max(1, min(self.MAX_POOL_ROWS, height // self.row_height))
+
+    def _clamp_offset(self):
+        max_offset = max(0, len(self._items) - self._visible_count())
+        self._offset = max(0, min(self._offset, max_offset))
+
+    def _schedule_render(self):
+        # Várias alterações seguidas geram um único redesenho
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _create_row(self):
+        row_frame = ctk.CTkFrame(self.rows_frame, fg_color=ModernTheme.BG_SECONDARY, height=self.row_height - 4, corner_radius=8)
+        row_frame.grid_propagate(False)
+        for i, config in enumerate(self.column_config.values()):
+            row_frame.grid_columnconfigure(i, weight=config.get("weight", 0), minsize=config.get("minsize", 0))
+        row_frame.grid_rowconfigure(0, weight=1)
+        cells = []
+        for i, config in enumerate(self.column_config.values()):
+            if config.get("action"):
+                cell = ctk.CTkButton(row_frame, text=self.action_text, font=("Arial", 14), width=20, height=20,
+                                     fg_color="transparent", text_color=ModernTheme.TEXT_MUTED, hover_color="#52525b")
+                cell.grid(row=0, column=i, padx=5)
+            else:
+                cell = ctk.CTkLabel(row_frame, text="", font=config.get("font", self.font))
+                cell.grid(row=0, column=i, sticky="ew")
+            cells.append(cell)
+        self._bind_mousewheel(row_frame)
+        for cell in cells:
+            self._bind_mousewheel(cell)
+        row = {"frame": row_frame, "cells": cells, "item_id": None}
+        self._row_pool.append(row)
+        return row
+
+    def _render(self):
+        self._render_pending = False
+        visible = self._visible_count()
+        while len(self._row_pool) < visible:
+            self._create_row()
+        self._clamp_offset()
+
+        if self._items:
+            self.empty_label.place_forget()
+        else:
+            self.empty_label.place(relx=0.5, rely=0.1, anchor="n")
+
+        for slot, row in enumerate(self._row_pool):
+            pos = self._offset + slot
+            if slot >= visible or pos >= len(self._items):
+                if row["item_id"] is not None or row["frame"].winfo_manager():
+                    row["frame"].grid_forget()
+                    row["item_id"] = None
+                continue
+            self._fill_row(row, self._ids[pos], self._items[pos])
+            if not row["frame"].winfo_manager():
+                row["frame"].grid(row=slot, column=0, sticky="ew", padx=5, pady=2)
+
+        self._update_scrollbar(visible)
+
+    def _fill_row(self, row, item_id, item):
+        row["item_id"] = item_id
+        values = iter(self.row_renderer(item))
+        for cell, config in zip(row["cells"], self.column_config.values()):
+            if config.get("action"):
+                cell.configure(command=lambda iid=item_id: self._on_action(iid))
+                continue
+            text, color = next(values, ("", None))
+            cell.configure(text=text, text_color=color or ModernTheme.TEXT_PRIMARY)
+
+    def _on_action(self, item_id):
+        if self.on_row_action:
+            self.on_row_action(item_id)
+
+    def _update_scrollbar(self, visible):
+        total = len(self._items)
+        if total <= visible:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._offset / total, (self._offset + visible) / total)
+
+    # --- Rolagem ---
+    def scroll_to_end(self):
+        self._offset = max(0, len(self._items) - self._visible_count())
+        self._pinned_to_tail = True
+        self._schedule_render()
+
+    def _scroll_by(self, rows):
+        self._offset += rows
+        self._clamp_offset()
+        self._update_pinned()
+        self._schedule_render()
+
+    def _update_pinned(self):
+        self._pinned_to_tail = self._offset >= len(self._items) - self._visible_count()
+
+    def _on_scrollbar(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._offset = int(float(args[1]) * len(self._items))
+            self._clamp_offset()
+            self._update_pinned()
+            self._schedule_render()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= self._visible_count()
+            self._scroll_by(step)
+
+    def _on_mousewheel(self, event):
+        if getattr(event, "num", None) == 4:
+            self._scroll_by(-3)
+        elif getattr(event, "num", None) == 5:
+            self._scroll_by(3)
+        elif event.delta:
+            self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _bind_mousewheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel, add="+")
+        widget.bind("<Button-4>", self._on_mousewheel, add="+")
+        widget.bind("<Button-5>", self._on_mousewheel, add="+")
+
+    def _on_resize(self, event=None):
+        self._schedule_render()
@@ -3,13 +3,14 @@
 import customtkinter as ctk
 import datetime
 import logging
+from collections import deque
 
 # --- Imports da Aplicação ---
 from utils.config_manager import ConfigManager
 from .styles.theme import ModernTheme
 from .styles.fonts import AppFonts
-from .components.news_scraper import fetch_structured_news
 from utils.path_resolver import resource_path
+from .update_bus import UIUpdateBus
 
 # --- Imports dos Componentes de UI ---
 from .components.financial_summary_card import FinancialSummaryCard
@@ -19,6 +20,10 @@ from .signal_list_frame import SignalListFrame
 from .management_frame import ManagementFrame
 
 class ModernDashboardFrame(ctk.CTkFrame):
+    UI_REFRESH_MS = 50 # Taxa de drenagem do barramento de UI (20 Hz)
+    MAX_CONSOLE_LINES = 1000
+    MAX_LOG_HISTORY = 5000
+
     def __init__(self, master, controller, font_family="Arial"):
         super().__init__(master)
         self.controller = controller
@@ -27,7 +32,8 @@ class ModernDashboardFrame(ctk.CTkFrame):
         self.fonts = AppFonts(font_family=self.font_family)
         
         self.sub_frames = {} # Renamed from self.frames
-        self.log_history = []
+        self.log_history = deque(maxlen=self.MAX_LOG_HISTORY)
+        self.ui_bus = UIUpdateBus()
         self.all_pairs = []
         self.normal_pairs = []
         self.otc_pairs = []
@@ -35,16 +41,21 @@ class ModernDashboardFrame(ctk.CTkFrame):
         self._setup_ui_layout() # This will now also create and stack sub-frames
         self._register_callbacks()
         self._show_frame("dashboard")
+        self.after(self.UI_REFRESH_MS, self._drain_ui_bus)
 
     def _register_callbacks(self):
-        """Informa ao controller quais métodos da UI ele deve chamar para atualizações."""
+        """
+        Informa ao controller quais métodos da UI ele deve chamar para atualizações.
+        As atualizações passam pelo barramento de UI, pois o controller as chama a partir de threads de trabalho.
+        """
+        bus = self.ui_bus
         self.controller.set_ui_callbacks({
             'log_message': self.add_log_message,
-            'on_trade_result': self.on_trade_result,
-            'on_pair_list_update': self.on_pair_list_update,
-            'update_connection_status': self.update_connection_status,
-            'update_robot_status': self.update_robot_status,
-            'update_metric_cards': self.update_metric_cards,
+            'on_trade_result': lambda details: bus.post_event(self.on_trade_result, details),
+            'on_pair_list_update': lambda pairs: bus.post_coalesced('pair_list', self.on_pair_list_update, pairs),
+            'update_connection_status': lambda comp, status, msg: bus.post_coalesced(('status', comp), self.update_connection_status, comp, status, msg),
+            'update_robot_status': lambda active, paused: bus.post_coalesced('robot_status', self.update_robot_status, active, paused),
+            'update_metric_cards': lambda data: bus.post_coalesced('metric_cards', self.update_metric_cards, data),
             'get_masaniello_configs': self.get_masaniello_configs,
             'show_popup': self._show_popup,
             'clear_trade_history': lambda: self.history_card.clear_list() if hasattr(self, 'history_card') else None,
@@ -98,11 +109,11 @@ class ModernDashboardFrame(ctk.CTkFrame):
         if "masaniello_status" in trade_details:
             management_frame = self.sub_frames.get("management")
             if management_frame and hasattr(management_frame, 'update_masaniello_status'):
-                self.after(0, management_frame.update_masaniello_status, trade_details["masaniello_status"])
+                management_frame.update_masaniello_status(trade_details["masaniello_status"])
 
     def on_pair_list_update(self, pairs):
         self.all_pairs, self.normal_pairs, self.otc_pairs = pairs
-        self.after(0, self._update_pair_menu)
+        self._update_pair_menu()
 
     def update_robot_status(self, is_active, is_paused):
         if is_active:
@@ -150,17 +161,44 @@ class ModernDashboardFrame(ctk.CTkFrame):
             self.summary_card.update_summary(summary_data)
 
     def add_log_message(self, message, tag=None):
+        """Pode ser chamado de qualquer thread: apenas formata e publica no barramento de UI."""
         timestamp = datetime.datetime.now().strftime('%H:%M:%S')
         tag_text = f"[{tag}]" if tag else "[*]"
         formatted_message = f"[{timestamp}] {tag_text.ljust(12)} {message}\n"
         self.log_history.append(formatted_message)
-        if hasattr(self, 'dashboard_console') and self.dashboard_console.winfo_exists():
-            self.after(0, self._update_console, formatted_message)
-
-    def _update_console(self, message):
+        self.ui_bus.post_log(formatted_message)
+
+    def _drain_ui_bus(self):
+        """Executado na thread do Tk a cada UI_REFRESH_MS: aplica em lote tudo o que foi publicado."""
+        try:
+            log_lines, coalesced, events = self.ui_bus.drain()
+            for callback, args in coalesced:
+                self._safe_ui_call(callback, *args)
+            for callback, args in events:
+                self._safe_ui_call(callback, *args)
+            if log_lines:
+                self._update_console("".join(log_lines))
+        finally:
+            try:
+                if self.winfo_exists():
+                    self.after(self.UI_REFRESH_MS, self._drain_ui_bus)
+            except Exception:
+                pass # Janela já destruída
+
+    def _safe_ui_call(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            logging.error(f"Erro ao aplicar atualização da UI ({getattr(callback, '__name__', callback)}): {e}")
+
+    def _update_console(self, text):
         if hasattr(self, 'dashboard_console') and self.dashboard_console.winfo_exists():
             self.dashboard_console.configure(state="normal")
-            self.dashboard_console.insert("end", message)
+            self.dashboard_console.insert("end", text)
+            # Mantém o console limitado às últimas MAX_CONSOLE_LINES linhas
+            line_count = int(self.dashboard_console.index("end-1c").split('.')[0])
+            if line_count > self.MAX_CONSOLE_LINES:
+                self.dashboard_console.delete("1.0", f"{line_count - self.MAX_CONSOLE_LINES + 1}.0")
             self.dashboard_console.see("end")
             self.dashboard_console.configure(state="disabled")
 
@@ -308,7 +346,7 @@ class ModernDashboardFrame(ctk.CTkFrame):
         config_frame = ctk.CTkFrame(content_area, fg_color=self.colors.BG_CARD, corner_radius=10)
         config_frame.grid(row=0, column=0, columnspan=3, padx=0, pady=0, sticky="ew")
         ctk.CTkLabel(config_frame, text="Estratégia Principal:", font=self.fonts.CARD_TITLE).grid(row=0, column=0, padx=10, pady=(10,5), sticky="w")
-        self.strategy_option_menu = ctk.CTkOptionMenu(config_frame, values=["Sinal MT4", "MHI (Minoria)", "Lista de Sinais"])
+        self.strategy_option_menu = ctk.CTkOptionMenu(config_frame, values=["Sinal MT4", "MHI (Minoria)", "MHI Multi-Ativos", "Plugins (Barramento)", "Lista de Sinais"])
         self.strategy_option_menu.grid(row=1, column=0, padx=10, pady=(0,10), sticky="ew")
         ctk.CTkLabel(config_frame, text="Tipo de Ativo:", font=self.fonts.CARD_TITLE).grid(row=0, column=1, padx=10, pady=(10,5), sticky="w")
         self.pair_filter_button = ctk.CTkSegmentedButton(config_frame, values=["Normal", "OTC"], command=self._update_pair_menu)
@@ -342,15 +380,16 @@ class ModernDashboardFrame(ctk.CTkFrame):
     def _create_news_frame(self):
         frame = ctk.CTkFrame(self.main_content_frame, fg_color="transparent")
         header = self._create_page_header(frame, "📰 Central de Notícias")
-        ctk.CTkButton(header, text="🔄 Atualizar", command=self._fetch_news_data, fg_color=self.colors.ACCENT_BLUE, width=140, height=30, corner_radius=8, font=self.fonts.BUTTON).pack(side="right", padx=20, pady=15)
+        ctk.CTkButton(header, text="🔄 Atualizar", command=lambda: self._fetch_news_data(force_refresh=True), fg_color=self.colors.ACCENT_BLUE, width=140, height=30, corner_radius=8, font=self.fonts.BUTTON).pack(side="right", padx=20, pady=15)
         self.news_card = NewsCard(frame, font_family=self.font_family)
         self.news_card.pack(fill="both", expand=True, pady=10)
         self._fetch_news_data() # Fetch initial news
         return frame
 
-    def _fetch_news_data(self):
+    def _fetch_news_data(self, force_refresh=False):
         if hasattr(self, 'news_card') and self.news_card.winfo_exists():
-            self.after(100, lambda: self.controller.fetch_news(callback=self.news_card.populate_news))
+            callback = lambda news: self.ui_bus.post_coalesced('news', self.news_card.populate_news, news)
+            self.after(100, lambda: self.controller.fetch_news(callback=callback, force_refresh=force_refresh))
 
     def _update_pair_menu(self, *args):
         if hasattr(self, 'pair_filter_button') and self.pair_filter_button.winfo_exists():
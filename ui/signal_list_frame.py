@@ -84,10 +84,8 @@ class SignalListFrame(ctk.CTkFrame):
     def _clear_signal_list(self):
         """Limpa a lista de dados e a interface."""
         self.signals.clear()
-        self.signal_card.clear_list()
+        self.signal_card.clear_list(empty_text="Carregue um novo arquivo de sinais.")
         self.file_label.configure(text="Lista de sinais limpa.")
-        # Adiciona uma mensagem na lista vazia
-        ctk.CTkLabel(self.signal_card.scrollable_frame, text="Carregue um novo arquivo de sinais.").pack(pady=20)
         if self.log_callback:
             self.log_callback("Lista de sinais foi limpa.", "INFO")
 
@@ -0,0 +1,48 @@
+# ui/update_bus.py
+
+import threading
+from collections import deque, OrderedDict
+
+class UIUpdateBus:
+    """
+    Fila de atualizações da UI. Threads de trabalho publicam sem bloquear;
+    a thread do Tk drena tudo de uma vez em intervalos fixos (ver ModernDashboardFrame).
+
+    - Linhas de log: acumuladas e inseridas em lote (limitadas a max_log_lines por drenagem).
+    - Atualizações com chave (métricas, status): apenas a última de cada chave é aplicada.
+    - Eventos (resultados de trade): aplicados todos, na ordem de chegada. Sem limite: perder um
+      resultado deixaria as estatísticas erradas, e a drenagem a cada intervalo esvazia a fila.
+    """
+    def __init__(self, max_log_lines=500):
+        self._lock = threading.Lock()
+        self._log_lines = deque(maxlen=max_log_lines)
+        self._coalesced = OrderedDict()
+        self._events = deque()
+        self.dropped_log_lines = 0
+
+    def post_log(self, line):
+        with self._lock:
+            if len(self._log_lines) == self._log_lines.maxlen:
+                self.dropped_log_lines += 1
+            self._log_lines.append(line)
+
+    def post_coalesced(self, key, callback, *args):
+        """Agenda callback(*args); publicações repetidas com a mesma chave substituem a anterior."""
+        with self._lock:
+            self._coalesced.pop(key, None)
+            self._coalesced[key] = (callback, args)
+
+    def post_event(self, callback, *args):
+        with self._lock:
+            self._events.append((callback, args))
+
+    def drain(self):
+        """Retorna (linhas_de_log, atualizações_coalescidas, eventos) e esvazia o barramento."""
+        with self._lock:
+            log_lines = list(self._log_lines)
+            self._log_lines.clear()
+            coalesced = list(self._coalesced.values())
+            self._coalesced.clear()
+            events = list(self._events)
+            self._events.clear()
+        return log_lines, coalesced, events
@@ -40,7 +40,21 @@ class ConfigManager:
             'tipo': 'binary', 
             'valor_entrada': '5', 
             'stop_win': '100', 
-            'stop_loss': '100'
+            'stop_loss': '100',
+            'mt4_endpoint': 'tcp://127.0.0.1:5557',
+            'mt4_topics': '',
+            'mt4_proxy_bind': '',
+            'mt4_feedback_endpoint': 'tcp://127.0.0.1:5558',
+            'dedup_janela': '60',
+            'dedup_politica': 'drop',
+            'liveness_janela_segundos': '6',
+            'contas_copia': '[]',
+            'cliente_async': 'N',
+            'mhi_scanner_ativos': '',
+            'mhi_scanner_entradas': '1',
+            'mhi_scanner_criterio': 'assertividade',
+            'mhi_scanner_min_assertividade': '0',
+            'estrategias_plugins': ''
         }
         for key, value in new_keys.items():
             cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)", (key, value))
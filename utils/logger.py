@@ -1,39 +1,101 @@
 # utils/logger.py
 
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import os
+import queue
+import atexit
+import threading
 from .path_resolver import resource_path
 
+TRADE_LOGGER_NAME = 'trade_logger'
+LOG_QUEUE_SIZE = 10000
+# Registros WARNING ou mais graves esperam até este tempo por espaço na fila antes de serem descartados.
+BLOCKING_TIMEOUT = 0.05
+
+_listener = None
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler com fila limitada. As threads de trade apenas enfileiram o registro;
+    formatação e I/O acontecem na thread do QueueListener.
+    Com a fila cheia, registros abaixo de WARNING são descartados e contabilizados.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Fila em memória (mesmo processo): não é preciso formatar nem copiar o registro aqui.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=BLOCKING_TIMEOUT)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+
+class _LoggerNameFilter(logging.Filter):
+    """Deixa passar apenas registros do logger de trades (ou apenas os demais, se invert=True)."""
+    def __init__(self, logger_name, invert=False):
+        super().__init__()
+        self.logger_name = logger_name
+        self.invert = invert
+
+    def filter(self, record):
+        return (record.name == self.logger_name) != self.invert
+
 def setup_loggers():
     """
     Configura o logger principal da aplicação.
-    Saída: console e 'logs/bot_log.txt'.
+    Saída: console e 'logs/bot_log.txt' (trades em 'logs/trade_log.txt'), gravados por uma única
+    thread de QueueListener. Os loggers só recebem um QueueHandler.
     """
+    global _listener
+    shutdown_loggers()
+
     # --- Formatação e Criação da Pasta de Log ---
     log_formatter = logging.Formatter('[%(asctime)s] [%(levelname)-8s] %(message)s', datefmt='%H:%M:%S')
-    
+
     log_dir = resource_path('logs')
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
-    # --- Handlers --- 
+    # --- Handlers (executados na thread do listener) ---
     # Handler para o arquivo de atividade geral (bot_log.txt)
     general_log_file = os.path.join(log_dir, 'bot_log.txt')
     general_handler = RotatingFileHandler(general_log_file, maxBytes=5*1024*1024, backupCount=5, encoding='utf-8')
     general_handler.setFormatter(log_formatter)
     general_handler.setLevel(logging.DEBUG) # Definir nível DEBUG para o arquivo de log
+    general_handler.addFilter(_LoggerNameFilter(TRADE_LOGGER_NAME, invert=True))
 
     # Handler para o arquivo de trades (trade_log.txt)
     trade_log_file = os.path.join(log_dir, 'trade_log.txt')
     trade_handler = RotatingFileHandler(trade_log_file, maxBytes=5*1024*1024, backupCount=5, encoding='utf-8')
     trade_handler.setFormatter(log_formatter)
     trade_handler.setLevel(logging.INFO) # Definir nível INFO para o arquivo de trades
+    trade_handler.addFilter(_LoggerNameFilter(TRADE_LOGGER_NAME))
 
-    # Handler para o console (será usado pelo logger raiz)
+    # Handler para o console
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(log_formatter)
     console_handler.setLevel(logging.INFO) # Manter INFO para o console para evitar poluição visual
+    console_handler.addFilter(_LoggerNameFilter(TRADE_LOGGER_NAME, invert=True))
+
+    # --- Fila e Listener ---
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, general_handler, trade_handler, console_handler, respect_handler_level=True)
+    _listener.queue_handler = queue_handler
+    _listener.start()
 
     # --- Configuração do Logger Raiz ---
     root_logger = logging.getLogger()
@@ -43,13 +105,13 @@ def setup_loggers():
     logging.getLogger('iqoptionapi').setLevel(logging.INFO)
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
-    root_logger.addHandler(general_handler)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(queue_handler)
 
     # --- Configuração do Logger de Trades ---
-    trade_logger = logging.getLogger('trade_logger')
+    trade_logger = logging.getLogger(TRADE_LOGGER_NAME)
     trade_logger.setLevel(logging.INFO)
-    trade_logger.addHandler(trade_handler)
+    trade_logger.handlers.clear()
+    trade_logger.addHandler(queue_handler)
     trade_logger.propagate = False # Evitar que os logs de trade sejam enviados para o logger raiz
 
     root_logger.info("="*50)
@@ -57,3 +119,45 @@ def setup_loggers():
     root_logger.info("="*50)
 
     return root_logger, trade_logger
+
+def add_listener_handler(handler, logger_name=None):
+    """
+    Registra um handler extra (ex.: encaminhamento para a UI) na thread do listener.
+    Se logger_name for informado, o handler só recebe registros desse logger.
+    Retorna False se o pipeline de logs não estiver ativo.
+    """
+    if _listener is None:
+        return False
+    if logger_name is not None:
+        handler.addFilter(_LoggerNameFilter(logger_name))
+    _listener.handlers = _listener.handlers + (handler,)
+    return True
+
+def remove_listener_handler(handler):
+    if _listener is not None:
+        _listener.handlers = tuple(h for h in _listener.handlers if h is not handler)
+
+def get_dropped_count():
+    """Quantidade de registros descartados por fila cheia desde a configuração."""
+    if _listener is None:
+        return 0
+    return _listener.queue_handler.dropped
+
+def shutdown_loggers():
+    """Esvazia a fila e para a thread do listener."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    if listener.queue_handler.dropped:
+        for handler in listener.handlers:
+            if isinstance(handler, logging.StreamHandler):
+                handler.handle(logging.makeLogRecord({
+                    'msg': f"{listener.queue_handler.dropped} registros de log descartados (fila cheia).",
+                    'levelno': logging.WARNING, 'levelname': 'WARNING', 'name': 'root'
+                }))
+    for handler in listener.handlers:
+        handler.close()
+
+atexit.register(shutdown_loggers)
@@ -0,0 +1,207 @@
+# utils/trade_journal.py
+
+import sqlite3
+import threading
+import queue
+import logging
+import json
+import time
+from datetime import datetime
+from .path_resolver import resource_path
+
+class TradeJournal:
+    """
+    Diário de trades persistente em SQLite.
+    O caminho de trade apenas enfileira registros; uma thread de escrita grava em lotes.
+    """
+    _COLUNAS = (
+        'timestamp', 'dia', 'hora', 'conta', 'ativo', 'direcao', 'timeframe', 'estrategia', 'gerenciador',
+        'nivel_martingale', 'valor_entrada', 'lucro', 'resultado', 'trade_id',
+        'signal_ts', 'order_sent_ts', 'order_ack_ts', 'result_ts', 'context'
+    )
+    _AGRUPAMENTOS = {'conta': 'conta', 'ativo': 'ativo', 'hora': 'hora', 'estrategia': 'estrategia', 'gerenciador': 'gerenciador', 'dia': 'dia'}
+
+    def __init__(self, db_path='trade_journal.db', batch_size=100, flush_interval=0.5):
+        self.db_path = resource_path(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.write_queue = queue.Queue()
+        self.writer_thread = None
+        self.stop_event = threading.Event()
+        self._setup_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _setup_database(self):
+        """Cria a tabela de trades e os índices de consulta."""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                dia TEXT NOT NULL,
+                hora INTEGER NOT NULL,
+                conta TEXT,
+                ativo TEXT,
+                direcao TEXT,
+                timeframe INTEGER,
+                estrategia TEXT,
+                gerenciador TEXT,
+                nivel_martingale INTEGER DEFAULT 0,
+                valor_entrada REAL,
+                lucro REAL,
+                resultado TEXT,
+                trade_id TEXT,
+                signal_ts REAL,
+                order_sent_ts REAL,
+                order_ack_ts REAL,
+                result_ts REAL,
+                context TEXT
+            )
+        ''')
+        # Diários criados antes da cópia multi-conta não têm a coluna da conta
+        colunas = {row[1] for row in cursor.execute("PRAGMA table_info(trades)")}
+        if 'conta' not in colunas:
+            cursor.execute("ALTER TABLE trades ADD COLUMN conta TEXT")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_dia ON trades (dia)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_ativo ON trades (ativo, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_estrategia ON trades (estrategia, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_gerenciador ON trades (gerenciador, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_conta ON trades (conta, timestamp)")
+        conn.commit()
+        conn.close()
+
+    # --- Escrita assíncrona ---
+    def start(self):
+        if self.writer_thread and self.writer_thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer_thread.start()
+        logging.info("TradeJournal: thread de escrita iniciada.")
+
+    def stop(self):
+        """Para a thread de escrita após gravar tudo o que ainda está na fila."""
+        self.stop_event.set()
+        if self.writer_thread:
+            self.writer_thread.join(timeout=5)
+            self.writer_thread = None
+        self._drain_pending()
+
+    def record_trade(self, **fields):
+        """Enfileira um registro de trade (uma linha por ordem/nível de martingale). Não toca o disco."""
+        now = fields.get('timestamp') or time.time()
+        dt = datetime.fromtimestamp(now)
+        fields['timestamp'] = now
+        fields['dia'] = dt.strftime('%Y-%m-%d')
+        fields['hora'] = dt.hour
+        if isinstance(fields.get('context'), dict):
+            fields['context'] = json.dumps(fields['context'], default=str)
+        self.write_queue.put(tuple(fields.get(col) for col in self._COLUNAS))
+
+    def flush(self):
+        """Bloqueia até que todos os registros enfileirados tenham sido gravados."""
+        if self.writer_thread and self.writer_thread.is_alive():
+            self.write_queue.join()
+        else:
+            self._drain_pending()
+
+    def _writer_loop(self):
+        conn = self._connect()
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    first = self.write_queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                batch = [first]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.write_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                self._write_batch(conn, batch)
+        finally:
+            conn.close()
+
+    def _drain_pending(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self.write_queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            conn = self._connect()
+            try:
+                self._write_batch(conn, batch)
+            finally:
+                conn.close()
+
+    def _write_batch(self, conn, batch):
+        placeholders = ", ".join("?" for _ in self._COLUNAS)
+        try:
+            conn.executemany(f"INSERT INTO trades ({', '.join(self._COLUNAS)}) VALUES ({placeholders})", batch)
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"TradeJournal: falha ao gravar lote de {len(batch)} trades: {e}")
+        finally:
+            for _ in batch:
+                self.write_queue.task_done()
+
+    # --- Consultas agregadas (chamadas pelo dashboard) ---
+    def win_rate_by(self, group_by, since=None):
+        """Retorna {grupo: {'wins', 'losses', 'total', 'winrate', 'lucro'}} agrupado por conta, ativo, hora, estrategia, gerenciador ou dia."""
+        column = self._AGRUPAMENTOS.get(group_by)
+        if column is None:
+            raise ValueError(f"Agrupamento inválido: {group_by}")
+        query = f'''
+            SELECT {column},
+                   SUM(CASE WHEN lucro > 0 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN lucro < 0 THEN 1 ELSE 0 END),
+                   COUNT(lucro),
+                   COALESCE(SUM(lucro), 0)
+            FROM trades WHERE lucro IS NOT NULL
+        '''
+        params = ()
+        if since is not None:
+            query += " AND timestamp >= ?"
+            params = (since,)
+        query += f" GROUP BY {column}"
+
+        conn = self._connect()
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+
+        result = {}
+        for key, wins, losses, total, lucro in rows:
+            decididos = wins + losses
+            result[key] = {
+                'wins': wins, 'losses': losses, 'total': total,
+                'winrate': (wins / decididos) * 100 if decididos > 0 else 0,
+                'lucro': round(lucro, 2)
+            }
+        return result
+
+    def pnl_by_day(self, days=None):
+        """Retorna uma lista [(dia, lucro)] em ordem cronológica."""
+        query = "SELECT dia, COALESCE(SUM(lucro), 0) FROM trades WHERE lucro IS NOT NULL GROUP BY dia ORDER BY dia"
+        conn = self._connect()
+        rows = conn.execute(query).fetchall()
+        conn.close()
+        rows = [(dia, round(lucro, 2)) for dia, lucro in rows]
+        return rows[-days:] if days else rows
+
+    def recent_trades(self, limit=50):
+        """Retorna os últimos trades gravados como dicionários."""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute("SELECT * FROM trades ORDER BY timestamp DESC LIMIT ?", (limit,)).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]